@@ -14,7 +14,7 @@
         - Inactivity alerts when no updates for X days
         - Progress inconsistency alerts
         - Configurable severity levels
-        - Automatic email notifications
+        - Automatic email notifications (daily digest per recipient)
         - Alert dashboard and management
     """,
     'author': 'ExecutionPM',
@@ -29,6 +29,7 @@
         'security/ir.model.access.csv',
         'data/alert_config_data.xml',
         'data/mail_template_data.xml',
+        'data/mail_digest_templates.xml',
         'data/alert_cron_data.xml',
         'views/execution_alert_views.xml',
         'views/execution_alert_config_views.xml',
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
 from . import execution_alert
 from . import execution_alert_config
+from . import execution_alert_event
 from . import project_alert
+from . import kpi_snapshot
+from . import execution_project_report
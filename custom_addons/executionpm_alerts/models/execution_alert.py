@@ -5,10 +5,16 @@ Execution Alert Model
 Manages alerts for execution projects with severity levels, 
 automatic status tracking, and notification capabilities.
 """
+import logging
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from odoo.tools import SQL
 from datetime import date, timedelta
 
+_logger = logging.getLogger(__name__)
+
 
 class ExecutionAlert(models.Model):
     """
@@ -297,16 +303,8 @@ class ExecutionAlert(models.Model):
         return True
 
     def action_send_notification(self):
-        """Send notification email for this alert."""
-        self.ensure_one()
-        template = self.env.ref('executionpm_alerts.mail_template_execution_alert', raise_if_not_found=False)
-        if template:
-            template.send_mail(self.id, force_send=True)
-            self.write({
-                'notification_sent': True,
-                'reminder_count': self.reminder_count + 1,
-                'last_reminder_date': date.today(),
-            })
+        """Queue a notification for these alerts and dispatch it through the mail queue."""
+        self._dispatch_alert_digests(self._queue_notification())
         return True
 
     def action_view_project(self):
@@ -345,31 +343,27 @@ class ExecutionAlert(models.Model):
         config = self.env['execution.alert.config'].get_config()
         if not config.delay_alert_enabled:
             return
-        
-        threshold_days = config.delay_threshold_days
+
+        query_start = self.env.cr.sql_log_count
         today = date.today()
-        
-        # Find tasks that should have ended but haven't reached 100%
-        tasks = self.env['execution.planning.task'].search([
-            ('planning_id.state', '=', 'approved'),
-            ('date_end', '<', today),
-            ('validated_progress', '<', 100),
-        ])
-        
-        for task in tasks:
-            delay_days = (today - task.date_end).days
-            
-            if delay_days >= threshold_days:
-                # Check if alert already exists for this task
-                existing = self.search([
-                    ('task_id', '=', task.id),
-                    ('alert_type', '=', 'delay'),
-                    ('state', 'not in', ['resolved', 'dismissed']),
-                ], limit=1)
-                
-                if not existing:
-                    severity = self._get_delay_severity(delay_days, config)
-                    self._create_delay_alert(task, delay_days, severity, config)
+        delay_days = SQL("(%s - t.date_end)", today)
+
+        # Tasks that should have ended but haven't reached 100%
+        rows = self._fetch_task_alert_candidates(
+            'delay',
+            condition=SQL(
+                "t.date_end < %s AND COALESCE(t.validated_progress, 0) < 100 AND %s >= %s",
+                today, delay_days, config.delay_threshold_days,
+            ),
+            metric=delay_days,
+            severity=self._severity_case_sql(delay_days, [
+                (config.critical_delay_days, '4_critical'),
+                (config.high_delay_days, '3_high'),
+                (config.medium_delay_days, '2_medium'),
+            ], '1_low'),
+        )
+        alerts = self._create_alerts([self._prepare_delay_alert_vals(row, config) for row in rows], config)
+        self._log_alert_run('delay', alerts, query_start)
 
     @api.model
     def _cron_check_not_started(self):
@@ -379,30 +373,23 @@ class ExecutionAlert(models.Model):
         config = self.env['execution.alert.config'].get_config()
         if not config.not_started_alert_enabled:
             return
-            
-        threshold_days = config.not_started_threshold_days
+
+        query_start = self.env.cr.sql_log_count
         today = date.today()
-        
-        # Find tasks that should have started but have 0% progress
-        tasks = self.env['execution.planning.task'].search([
-            ('planning_id.state', '=', 'approved'),
-            ('date_start', '<', today),
-            ('validated_progress', '=', 0),
-        ])
-        
-        for task in tasks:
-            days_after_start = (today - task.date_start).days
-            
-            if days_after_start >= threshold_days:
-                # Check if alert already exists
-                existing = self.search([
-                    ('task_id', '=', task.id),
-                    ('alert_type', '=', 'not_started_delay'),
-                    ('state', 'not in', ['resolved', 'dismissed']),
-                ], limit=1)
-                
-                if not existing:
-                    self._create_not_started_alert(task, days_after_start, config)
+        days_after_start = SQL("(%s - t.date_start)", today)
+
+        # Tasks that should have started but have 0% progress
+        rows = self._fetch_task_alert_candidates(
+            'not_started_delay',
+            condition=SQL(
+                "t.date_start < %s AND COALESCE(t.validated_progress, 0) = 0 AND %s >= %s",
+                today, days_after_start, config.not_started_threshold_days,
+            ),
+            metric=days_after_start,
+            severity=self._severity_case_sql(days_after_start, [(7, '3_high')], '2_medium'),
+        )
+        alerts = self._create_alerts([self._prepare_not_started_alert_vals(row, config) for row in rows], config)
+        self._log_alert_run('not_started_delay', alerts, query_start)
 
     @api.model
     def _cron_check_overdue(self):
@@ -422,35 +409,15 @@ class ExecutionAlert(models.Model):
         config = self.env['execution.alert.config'].get_config()
         if not config.inactivity_alert_enabled:
             return
-        
-        inactivity_days = config.inactivity_threshold_days
-        threshold_date = date.today() - timedelta(days=inactivity_days)
-        
-        # Find running projects
-        projects = self.env['project.project'].search([
-            ('is_execution_project', '=', True),
-            ('execution_state', '=', 'running'),
-        ])
-        
-        for project in projects:
-            # Check last progress declaration date
-            last_progress = self.env['execution.progress'].search([
-                ('project_id', '=', project.id),
-            ], order='execution_date desc', limit=1)
-            
-            last_activity_date = last_progress.execution_date if last_progress else project.execution_actual_start
-            
-            if last_activity_date and last_activity_date < threshold_date:
-                # Check if alert already exists
-                existing = self.search([
-                    ('project_id', '=', project.id),
-                    ('alert_type', '=', 'inactivity'),
-                    ('state', 'not in', ['resolved', 'dismissed']),
-                ], limit=1)
-                
-                if not existing:
-                    days_inactive = (date.today() - last_activity_date).days
-                    self._create_inactivity_alert(project, days_inactive, last_activity_date, config)
+
+        query_start = self.env.cr.sql_log_count
+        rows = self._fetch_inactive_projects(date.today() - timedelta(days=config.inactivity_threshold_days))
+        projects = self.env['project.project'].browse([row['project_id'] for row in rows])
+        alerts = self._create_alerts([
+            self._prepare_inactivity_alert_vals(project, row, config)
+            for project, row in zip(projects, rows)
+        ], config)
+        self._log_alert_run('inactivity', alerts, query_start)
 
     @api.model
     def _cron_check_progress_inconsistency(self):
@@ -460,120 +427,354 @@ class ExecutionAlert(models.Model):
         config = self.env['execution.alert.config'].get_config()
         if not config.inconsistency_alert_enabled:
             return
-        
-        threshold_percent = config.inconsistency_threshold_percent
-        
-        # Find tasks with significant deviation
-        tasks = self.env['execution.planning.task'].search([
-            ('planning_id.state', '=', 'approved'),
-            ('validated_progress', '>', 0),  # Has some progress
-        ])
-        
-        for task in tasks:
-            # Check deviation
-            deviation = abs(task.progress_deviation)
-            
-            if deviation >= threshold_percent:
-                # Check if alert already exists
-                existing = self.search([
-                    ('task_id', '=', task.id),
-                    ('alert_type', '=', 'inconsistency'),
-                    ('state', 'not in', ['resolved', 'dismissed']),
-                ], limit=1)
-                
-                if not existing:
-                    severity = self._get_inconsistency_severity(deviation, config)
-                    self._create_inconsistency_alert(task, deviation, severity, config)
+
+        query_start = self.env.cr.sql_log_count
+        deviation = SQL("ABS(COALESCE(t.progress_deviation, 0))")
+
+        # Tasks with some progress and a significant deviation
+        rows = self._fetch_task_alert_candidates(
+            'inconsistency',
+            condition=SQL(
+                "COALESCE(t.validated_progress, 0) > 0 AND %s >= %s",
+                deviation, config.inconsistency_threshold_percent,
+            ),
+            metric=deviation,
+            severity=self._severity_case_sql(deviation, [
+                (config.critical_inconsistency_percent, '4_critical'),
+                (config.high_inconsistency_percent, '3_high'),
+                (config.medium_inconsistency_percent, '2_medium'),
+            ], '1_low'),
+        )
+        alerts = self._create_alerts([self._prepare_inconsistency_alert_vals(row, config) for row in rows], config)
+        self._log_alert_run('inconsistency', alerts, query_start)
 
     @api.model
     def _cron_send_alert_reminders(self):
         """
-        Cron job: Send reminders for unresolved alerts.
+        Cron job: Queue reminders for unresolved alerts, then send the daily
+        digest of all pending notification events.
+        """
+        config = self.env['execution.alert.config'].get_config()
+        if config.reminder_enabled:
+            threshold_date = date.today() - timedelta(days=config.reminder_interval_days)
+            alerts = self.search([
+                ('state', 'in', ['open', 'acknowledged', 'in_progress']),
+                '|',
+                ('last_reminder_date', '=', False),
+                ('last_reminder_date', '<=', threshold_date),
+                ('reminder_count', '<', config.max_reminders),
+            ])
+            alerts._queue_notification()
+
+        self._dispatch_alert_digests()
+
+    # -------------------------------------------------------------------------
+    # SET-BASED DETECTION
+    # -------------------------------------------------------------------------
+    @api.model
+    def _fetch_task_alert_candidates(self, alert_type, condition, metric, severity):
+        """
+        Return the tasks of active approved plannings matching ``condition``
+        that do not already carry an open alert of ``alert_type``.
+
+        Candidate selection, severity and the "already alerted" anti-join are
+        resolved in a single statement, so the cost does not depend on the
+        number of tasks. Each row is a dict with the task, planning and
+        project data needed to build the alert.
+        """
+        self.env['execution.planning.task'].flush_model([
+            'name', 'planning_id', 'date_start', 'date_end', 'validated_progress', 'progress_deviation',
+        ])
+        self.env['execution.planning'].flush_model(['name', 'state', 'active', 'project_id'])
+        self.env['project.project'].flush_model(['user_id'])
+        self.flush_model(['task_id', 'alert_type', 'state'])
+
+        today = date.today()
+        self.env.cr.execute(SQL(
+            """
+            SELECT t.id AS task_id,
+                   t.name AS task_name,
+                   t.date_start,
+                   t.date_end,
+                   COALESCE(t.validated_progress, 0) AS validated_progress,
+                   COALESCE(t.progress_deviation, 0) AS progress_deviation,
+                   CASE
+                       WHEN t.date_start IS NULL OR t.date_end IS NULL OR %(today)s < t.date_start THEN 0.0
+                       WHEN %(today)s >= t.date_end THEN 100.0
+                       ELSE LEAST(100.0, (%(today)s - t.date_start) * 100.0 / GREATEST(t.date_end - t.date_start, 1))
+                   END AS planned_progress,
+                   pl.id AS planning_id,
+                   pl.name AS planning_name,
+                   pl.project_id,
+                   pr.user_id AS manager_id,
+                   %(metric)s AS metric,
+                   %(severity)s AS severity
+              FROM execution_planning_task t
+              JOIN execution_planning pl ON pl.id = t.planning_id
+              JOIN project_project pr ON pr.id = pl.project_id
+             WHERE pl.state = 'approved'
+               AND pl.active
+               AND %(condition)s
+               AND NOT EXISTS (
+                       SELECT 1
+                         FROM execution_alert a
+                        WHERE a.task_id = t.id
+                          AND a.alert_type = %(alert_type)s
+                          AND a.state NOT IN ('resolved', 'dismissed')
+                   )
+          ORDER BY t.id
+            """,
+            today=today,
+            metric=metric,
+            severity=severity,
+            condition=condition,
+            alert_type=alert_type,
+        ))
+        return self.env.cr.dictfetchall()
+
+    @api.model
+    def _fetch_inactive_projects(self, threshold_date):
+        """
+        Return the running execution projects whose last declaration (or actual
+        start when nothing was declared) is older than ``threshold_date`` and
+        which have no open inactivity alert.
+
+        The last activity of every project comes from a single MAX() aggregate
+        over the declarations, left-joined to the open inactivity alerts.
+        """
+        self.env['execution.progress'].flush_model(['project_id', 'execution_date'])
+        self.env['project.project'].flush_model([
+            'active', 'is_execution_project', 'execution_state', 'execution_actual_start', 'user_id',
+        ])
+        self.flush_model(['project_id', 'alert_type', 'state'])
+
+        self.env.cr.execute(SQL(
+            """
+            WITH running AS (
+                SELECT id, user_id, execution_actual_start
+                  FROM project_project
+                 WHERE active
+                   AND is_execution_project
+                   AND execution_state = 'running'
+            ), last_activity AS (
+                SELECT ep.project_id, MAX(ep.execution_date) AS last_date
+                  FROM execution_progress ep
+                  JOIN running r ON r.id = ep.project_id
+              GROUP BY ep.project_id
+            )
+            SELECT r.id AS project_id,
+                   r.user_id AS manager_id,
+                   COALESCE(la.last_date, r.execution_actual_start) AS last_activity_date,
+                   %(today)s - COALESCE(la.last_date, r.execution_actual_start) AS days_inactive
+              FROM running r
+         LEFT JOIN last_activity la ON la.project_id = r.id
+         LEFT JOIN execution_alert a ON a.project_id = r.id
+                                    AND a.alert_type = 'inactivity'
+                                    AND a.state NOT IN ('resolved', 'dismissed')
+             WHERE a.id IS NULL
+               AND COALESCE(la.last_date, r.execution_actual_start) < %(threshold_date)s
+          ORDER BY r.id
+            """,
+            today=date.today(),
+            threshold_date=threshold_date,
+        ))
+        return self.env.cr.dictfetchall()
+
+    @api.model
+    def _severity_case_sql(self, metric, thresholds, default):
+        """
+        Build a CASE expression mapping ``metric`` to a severity level.
+        ``thresholds`` is a list of (minimum value, severity), most severe first.
+        """
+        return SQL("CASE %s ELSE %s END", SQL(" ").join(
+            SQL("WHEN %s >= %s THEN %s", metric, minimum, severity)
+            for minimum, severity in thresholds
+        ), default)
+
+    @api.model
+    def _next_alert_references(self, count):
+        """
+        Reserve ``count`` alert references in a single round trip.
+        Falls back to one call per reference for gapless or date-range sequences.
+        """
+        sequence = self.env['ir.sequence'].sudo().search([
+            ('code', '=', 'execution.alert'),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence or sequence.implementation != 'standard' or sequence.use_date_range:
+            return [self.env['ir.sequence'].next_by_code('execution.alert') or 'New' for _i in range(count)]
+
+        self.env.cr.execute(SQL(
+            "SELECT nextval(%s) FROM generate_series(1, %s)",
+            'ir_sequence_%03d' % sequence.id, count,
+        ))
+        return [sequence.get_next_char(number) for (number,) in self.env.cr.fetchall()]
+
+    @api.model
+    def _create_alerts(self, vals_list, config):
+        """Create all alerts of a detection run with a single create() call."""
+        if not vals_list:
+            return self.browse()
+
+        for vals, reference in zip(vals_list, self._next_alert_references(len(vals_list))):
+            vals['name'] = reference
+        alerts = self.with_context(
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_create_nosubscribe=True,
+        ).create(vals_list)
+
+        alerts = self.browse(alerts.ids)
+        if config.auto_notify:
+            alerts._queue_notification()
+        return alerts
+
+    @api.model
+    def _log_alert_run(self, alert_type, alerts, query_start):
+        _logger.info(
+            "Execution alerts (%s): %d alert(s) created in %d queries.",
+            alert_type, len(alerts), self.env.cr.sql_log_count - query_start,
+        )
+
+    # -------------------------------------------------------------------------
+    # NOTIFICATION DIGESTS
+    # -------------------------------------------------------------------------
+    def _queue_notification(self):
+        """
+        Queue a notification event for each alert: a 'new' event for alerts
+        never notified, a 'reminder' otherwise. Alerts that already have a
+        pending event are not queued twice. Returns the pending events.
         """
+        Event = self.env['execution.alert.event'].sudo()
+        if not self:
+            return Event
+        pending = Event.search([('alert_id', 'in', self.ids), ('state', '=', 'pending')])
+        to_queue = self - pending.alert_id
+        return pending | Event.create([
+            {'alert_id': alert.id, 'event_type': 'reminder' if alert.notification_sent else 'new'}
+            for alert in to_queue
+        ])
+
+    @api.model
+    def _dispatch_alert_digests(self, events=None):
+        """
+        Group pending notification events by recipient and queue one digest
+        email per recipient. Mails are left to the mail queue, so no SMTP
+        round trip happens inside the calling transaction.
+        """
+        Event = self.env['execution.alert.event'].sudo()
+        if events is None:
+            events = Event.search([('state', '=', 'pending')])
+        events = events.filtered(lambda e: e.state == 'pending')
+        if not events:
+            return
+
         config = self.env['execution.alert.config'].get_config()
-        if not config.reminder_enabled:
+        events_by_user = defaultdict(list)
+        for event in events:
+            for user in event.alert_id._get_notification_recipients(config):
+                events_by_user[user].append(event)
+
+        company = config.company_id or self.env.company
+        email_from = company.email_formatted or self.env.user.email_formatted
+        severity_labels = dict(self._fields['severity']._description_selection(self.env))
+        mail_values = []
+        for user, user_events in events_by_user.items():
+            if not user.email:
+                continue
+            body = self.env['ir.qweb']._render('executionpm_alerts.alert_digest_email', {
+                'user': user,
+                'company': company,
+                'events': user_events,
+                'base_url': self.env['ir.config_parameter'].sudo().get_param('web.base.url'),
+                'severity_labels': severity_labels,
+            })
+            mail_values.append({
+                'subject': _('[Execution Alerts] %s notification(s) requiring your attention', len(user_events)),
+                'body_html': body,
+                'email_from': email_from,
+                'recipient_ids': [(4, user.partner_id.id)],
+                'auto_delete': True,
+            })
+        self.env['mail.mail'].sudo().create(mail_values)
+
+        events.write({'state': 'sent', 'sent_date': fields.Datetime.now()})
+        events.alert_id._mark_notified()
+
+    def _get_notification_recipients(self, config):
+        """Users to notify about these alerts according to the configuration."""
+        recipients = config.notify_users | config.notify_groups.users | self.assigned_to
+        if config.notify_project_manager:
+            recipients |= self.project_id.user_id
+        return recipients.filtered('active')
+
+    def _mark_notified(self):
+        """Update the notification bookkeeping of all alerts in one statement."""
+        if not self:
             return
-        
-        reminder_interval = config.reminder_interval_days
-        threshold_date = date.today() - timedelta(days=reminder_interval)
-        
-        alerts = self.search([
-            ('state', 'in', ['open', 'acknowledged', 'in_progress']),
-            '|',
-            ('last_reminder_date', '=', False),
-            ('last_reminder_date', '<=', threshold_date),
-            ('reminder_count', '<', config.max_reminders),
+        self.flush_recordset(['notification_sent', 'reminder_count', 'last_reminder_date'])
+        self.env.cr.execute(SQL(
+            """
+            UPDATE execution_alert
+               SET notification_sent = TRUE,
+                   reminder_count = COALESCE(reminder_count, 0) + 1,
+                   last_reminder_date = %s,
+                   write_uid = %s,
+                   write_date = (now() AT TIME ZONE 'UTC')
+             WHERE id = ANY(%s)
+            """,
+            date.today(), self.env.uid, self.ids,
+        ))
+        self.invalidate_recordset([
+            'notification_sent', 'reminder_count', 'last_reminder_date', 'write_uid', 'write_date',
         ])
-        
-        for alert in alerts:
-            alert.action_send_notification()
 
     # -------------------------------------------------------------------------
     # HELPER METHODS
     # -------------------------------------------------------------------------
-    def _get_delay_severity(self, delay_days, config):
-        """Determine severity based on delay days."""
-        if delay_days >= config.critical_delay_days:
-            return '4_critical'
-        elif delay_days >= config.high_delay_days:
-            return '3_high'
-        elif delay_days >= config.medium_delay_days:
-            return '2_medium'
-        return '1_low'
-
-    def _get_inconsistency_severity(self, deviation, config):
-        """Determine severity based on progress deviation."""
-        if deviation >= config.critical_inconsistency_percent:
-            return '4_critical'
-        elif deviation >= config.high_inconsistency_percent:
-            return '3_high'
-        elif deviation >= config.medium_inconsistency_percent:
-            return '2_medium'
-        return '1_low'
-
-    def _create_delay_alert(self, task, delay_days, severity, config):
-        """Create a task delay alert."""
-        project = task.planning_id.project_id
-        
+    def _prepare_task_alert_vals(self, row, config, **vals):
+        """Common values for an alert raised on a planning task."""
+        return dict({
+            'project_id': row['project_id'],
+            'planning_id': row['planning_id'],
+            'task_id': row['task_id'],
+            'severity': row['severity'],
+            'assigned_to': row['manager_id'] or False,
+            'due_date': date.today() + timedelta(days=config.default_due_days),
+        }, **vals)
+
+    def _prepare_delay_alert_vals(self, row, config):
+        """Values for a task delay alert."""
+        delay_days = row['metric']
         description = f"""
         <p><strong>Task Delay Alert</strong></p>
         <ul>
-            <li><strong>Task:</strong> {task.name}</li>
-            <li><strong>Planning:</strong> {task.planning_id.name}</li>
-            <li><strong>Planned End Date:</strong> {task.date_end}</li>
+            <li><strong>Task:</strong> {row['task_name']}</li>
+            <li><strong>Planning:</strong> {row['planning_name']}</li>
+            <li><strong>Planned End Date:</strong> {row['date_end']}</li>
             <li><strong>Days Delayed:</strong> {delay_days} days</li>
-            <li><strong>Current Progress:</strong> {task.validated_progress:.1f}%</li>
+            <li><strong>Current Progress:</strong> {row['validated_progress']:.1f}%</li>
         </ul>
         <p>This task has exceeded the acceptable delay threshold of {config.delay_threshold_days} days.</p>
         """
-        
-        alert = self.create({
-            'alert_type': 'delay',
-            'severity': severity,
-            'project_id': project.id,
-            'planning_id': task.planning_id.id,
-            'task_id': task.id,
-            'title': f"Task Delay: {task.name}",
-            'description': description,
-            'threshold_value': config.delay_threshold_days,
-            'actual_value': delay_days,
-            'unit': 'days',
-            'assigned_to': project.user_id.id if project.user_id else False,
-            'due_date': date.today() + timedelta(days=config.default_due_days),
-        })
-        
-        if config.auto_notify:
-            alert.action_send_notification()
-        
-        return alert
-
-    def _create_inactivity_alert(self, project, days_inactive, last_activity_date, config):
-        """Create an inactivity alert."""
+        return self._prepare_task_alert_vals(
+            row, config,
+            alert_type='delay',
+            title=f"Task Delay: {row['task_name']}",
+            description=description,
+            threshold_value=config.delay_threshold_days,
+            actual_value=delay_days,
+            unit='days',
+        )
+
+    def _prepare_inactivity_alert_vals(self, project, row, config):
+        """Values for a project inactivity alert."""
+        days_inactive = row['days_inactive']
         description = f"""
         <p><strong>Project Inactivity Alert</strong></p>
         <ul>
             <li><strong>Project:</strong> {project.name}</li>
-            <li><strong>Last Activity:</strong> {last_activity_date}</li>
+            <li><strong>Last Activity:</strong> {row['last_activity_date']}</li>
             <li><strong>Days Inactive:</strong> {days_inactive} days</li>
             <li><strong>Current Progress:</strong> {project.execution_physical_progress:.1f}%</li>
         </ul>
@@ -582,7 +783,7 @@ class ExecutionAlert(models.Model):
         
         severity = '3_high' if days_inactive > config.inactivity_threshold_days * 2 else '2_medium'
         
-        alert = self.create({
+        return {
             'alert_type': 'inactivity',
             'severity': severity,
             'project_id': project.id,
@@ -591,86 +792,54 @@ class ExecutionAlert(models.Model):
             'threshold_value': config.inactivity_threshold_days,
             'actual_value': days_inactive,
             'unit': 'days',
-            'assigned_to': project.user_id.id if project.user_id else False,
+            'assigned_to': row['manager_id'] or False,
             'due_date': date.today() + timedelta(days=config.default_due_days),
-        })
-        
-        if config.auto_notify:
-            alert.action_send_notification()
-        
-        return alert
+        }
 
-    def _create_inconsistency_alert(self, task, deviation, severity, config):
-        """Create a progress inconsistency alert."""
-        project = task.planning_id.project_id
-        
-        status = "behind" if task.progress_deviation < 0 else "ahead of"
-        
+    def _prepare_inconsistency_alert_vals(self, row, config):
+        """Values for a progress inconsistency alert."""
+        deviation = row['metric']
+        status = "behind" if row['progress_deviation'] < 0 else "ahead of"
         description = f"""
         <p><strong>Progress Inconsistency Alert</strong></p>
         <ul>
-            <li><strong>Task:</strong> {task.name}</li>
-            <li><strong>Planning:</strong> {task.planning_id.name}</li>
-            <li><strong>Planned Progress:</strong> {task.planned_progress_to_date:.1f}%</li>
-            <li><strong>Actual Progress:</strong> {task.validated_progress:.1f}%</li>
-            <li><strong>Deviation:</strong> {task.progress_deviation:+.1f}%</li>
+            <li><strong>Task:</strong> {row['task_name']}</li>
+            <li><strong>Planning:</strong> {row['planning_name']}</li>
+            <li><strong>Planned Progress:</strong> {row['planned_progress']:.1f}%</li>
+            <li><strong>Actual Progress:</strong> {row['validated_progress']:.1f}%</li>
+            <li><strong>Deviation:</strong> {row['progress_deviation']:+.1f}%</li>
         </ul>
-        <p>This task is {abs(deviation):.1f}% {status} schedule, exceeding the threshold of {config.inconsistency_threshold_percent}%.</p>
+        <p>This task is {deviation:.1f}% {status} schedule, exceeding the threshold of {config.inconsistency_threshold_percent}%.</p>
         """
-        
-        alert = self.create({
-            'alert_type': 'inconsistency',
-            'severity': severity,
-            'project_id': project.id,
-            'planning_id': task.planning_id.id,
-            'task_id': task.id,
-            'title': f"Progress Deviation: {task.name}",
-            'description': description,
-            'threshold_value': config.inconsistency_threshold_percent,
-            'actual_value': deviation,
-            'unit': '%',
-            'assigned_to': project.user_id.id if project.user_id else False,
-            'due_date': date.today() + timedelta(days=config.default_due_days),
-        })
-        
-        if config.auto_notify:
-            alert.action_send_notification()
-        
-        return alert
-
-    def _create_not_started_alert(self, task, days_after_start, config):
-        """Create a 'Task Not Started' alert."""
-        project = task.planning_id.project_id
-        
+        return self._prepare_task_alert_vals(
+            row, config,
+            alert_type='inconsistency',
+            title=f"Progress Deviation: {row['task_name']}",
+            description=description,
+            threshold_value=config.inconsistency_threshold_percent,
+            actual_value=deviation,
+            unit='%',
+        )
+
+    def _prepare_not_started_alert_vals(self, row, config):
+        """Values for a 'Task Not Started' alert."""
+        days_after_start = row['metric']
         description = f"""
         <p><strong>Task Not Started Alert</strong></p>
         <ul>
-            <li><strong>Task:</strong> {task.name}</li>
-            <li><strong>Planning:</strong> {task.planning_id.name}</li>
-            <li><strong>Planned Start Date:</strong> {task.date_start}</li>
+            <li><strong>Task:</strong> {row['task_name']}</li>
+            <li><strong>Planning:</strong> {row['planning_name']}</li>
+            <li><strong>Planned Start Date:</strong> {row['date_start']}</li>
             <li><strong>Days Overdue for Start:</strong> {days_after_start} days</li>
         </ul>
         <p>This task has not recorded any progress despite being {days_after_start} days past its planned start date.</p>
         """
-        
-        severity = '2_medium' if days_after_start < 7 else '3_high'
-        
-        alert = self.create({
-            'alert_type': 'not_started_delay',
-            'severity': severity,
-            'project_id': project.id,
-            'planning_id': task.planning_id.id,
-            'task_id': task.id,
-            'title': f"Not Started: {task.name}",
-            'description': description,
-            'threshold_value': config.not_started_threshold_days,
-            'actual_value': days_after_start,
-            'unit': 'days',
-            'assigned_to': project.user_id.id if project.user_id else False,
-            'due_date': date.today() + timedelta(days=config.default_due_days),
-        })
-        
-        if config.auto_notify:
-            alert.action_send_notification()
-            
-        return alert
+        return self._prepare_task_alert_vals(
+            row, config,
+            alert_type='not_started_delay',
+            title=f"Not Started: {row['task_name']}",
+            description=description,
+            threshold_value=config.not_started_threshold_days,
+            actual_value=days_after_start,
+            unit='days',
+        )
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Alert Notification Queue
+
+Alert notifications are not sent one by one. Each notification is queued as
+an event, and pending events are later grouped into one digest per recipient.
+"""
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+
+class ExecutionAlertEvent(models.Model):
+    """
+    Pending or sent notification event for an alert.
+    """
+    _name = 'execution.alert.event'
+    _description = 'Execution Alert Notification Event'
+    _order = 'id'
+
+    alert_id = fields.Many2one(
+        comodel_name='execution.alert',
+        string='Alert',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    event_type = fields.Selection([
+        ('new', 'New Alert'),
+        ('reminder', 'Reminder'),
+    ], string='Event', required=True, default='new')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+    ], string='Status', required=True, default='pending', index=True)
+    sent_date = fields.Datetime(
+        string='Sent Date',
+        readonly=True,
+    )
+
+    @api.autovacuum
+    def _gc_sent_events(self):
+        """Remove events that were dispatched more than 30 days ago."""
+        self.search([
+            ('state', '=', 'sent'),
+            ('sent_date', '<', fields.Datetime.now() - timedelta(days=30)),
+        ]).unlink()
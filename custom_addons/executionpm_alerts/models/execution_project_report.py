@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class ExecutionProjectReport(models.Model):
+    """
+    Add open alert counts to the portfolio analysis.
+    """
+    _inherit = 'execution.project.report'
+
+    open_alert_count = fields.Integer(
+        string='Open Alerts',
+        readonly=True,
+    )
+    critical_alert_count = fields.Integer(
+        string='Critical Alerts',
+        readonly=True,
+    )
+
+    def _select(self):
+        return SQL(
+            """%s,
+            COALESCE(al.open_alert_count, 0) AS open_alert_count,
+            COALESCE(al.critical_alert_count, 0) AS critical_alert_count""",
+            super()._select(),
+        )
+
+    def _from(self):
+        return SQL(
+            """%s
+            LEFT JOIN (
+                SELECT project_id,
+                       COUNT(*) AS open_alert_count,
+                       COUNT(*) FILTER (WHERE severity = '4_critical') AS critical_alert_count
+                  FROM execution_alert
+                 WHERE state NOT IN ('resolved', 'dismissed')
+                 GROUP BY project_id
+            ) al ON al.project_id = p.id""",
+            super()._from(),
+        )
+
+    @api.model
+    def _get_refresh_sources(self):
+        return super()._get_refresh_sources() + ['execution.alert']
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class ExecutionKpiSnapshotAlerts(models.Model):
+    """
+    Add open alert counts to the daily KPI snapshots.
+    """
+    _inherit = 'execution.kpi.snapshot'
+
+    open_alert_count = fields.Integer(
+        string='Open Alerts',
+        readonly=True,
+        aggregator='max',
+    )
+    critical_alert_count = fields.Integer(
+        string='Critical Alerts',
+        readonly=True,
+        aggregator='max',
+    )
+
+    @api.model
+    def _get_alert_count_columns(self, condition):
+        return {
+            'open_alert_count': SQL(
+                """(SELECT COUNT(*) FROM execution_alert a
+                     WHERE %s AND a.state NOT IN ('resolved', 'dismissed'))""",
+                condition,
+            ),
+            'critical_alert_count': SQL(
+                """(SELECT COUNT(*) FROM execution_alert a
+                     WHERE %s AND a.state NOT IN ('resolved', 'dismissed')
+                       AND a.severity = '4_critical')""",
+                condition,
+            ),
+        }
+
+    @api.model
+    def _get_project_snapshot_columns(self):
+        columns = super()._get_project_snapshot_columns()
+        columns.update(self._get_alert_count_columns(SQL('a.project_id = p.id')))
+        return columns
+
+    @api.model
+    def _get_task_snapshot_columns(self):
+        columns = super()._get_task_snapshot_columns()
+        columns.update(self._get_alert_count_columns(SQL('a.task_id = t.id')))
+        return columns
+
+    @api.model
+    def _take_snapshot(self, snapshot_date):
+        self.env['execution.alert'].flush_model(['project_id', 'task_id', 'state', 'severity'])
+        return super()._take_snapshot(snapshot_date)
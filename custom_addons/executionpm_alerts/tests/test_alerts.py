@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+from datetime import date, timedelta
+
+from odoo.tests.common import TransactionCase
+
+
+class TestExecutionAlerts(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestExecutionAlerts, cls).setUpClass()
+        today = date.today()
+        cls.config = cls.env['execution.alert.config'].get_config()
+        cls.config.write({'auto_notify': False})
+
+        cls.project = cls.env['project.project'].create({
+            'name': 'Alert Test Project',
+            'is_execution_project': True,
+        })
+        cls.planning = cls.env['execution.planning'].create({
+            'name': 'Alert Planning',
+            'project_id': cls.project.id,
+        })
+        cls.lot = cls.env['execution.planning.lot'].create({
+            'name': 'Lot 1',
+            'planning_id': cls.planning.id,
+            'start_date': today - timedelta(days=60),
+            'end_date': today + timedelta(days=60),
+        })
+        # Ended 10 days ago without progress: delayed (high) and not started
+        cls.late_task = cls.env['execution.planning.task'].create({
+            'name': 'Late Task',
+            'lot_id': cls.lot.id,
+            'date_start': today - timedelta(days=40),
+            'date_end': today - timedelta(days=10),
+            'weight': 50.0,
+        })
+        # Still in its window and not due yet
+        cls.future_task = cls.env['execution.planning.task'].create({
+            'name': 'Future Task',
+            'lot_id': cls.lot.id,
+            'date_start': today + timedelta(days=5),
+            'date_end': today + timedelta(days=30),
+            'weight': 50.0,
+        })
+        cls.planning.action_submit()
+        cls.planning.action_approve()
+
+    def test_01_delay_alerts_are_created_once(self):
+        """Delay check raises one alert per late task and does not duplicate it"""
+        Alert = self.env['execution.alert']
+        Alert._cron_check_task_delays()
+
+        alerts = Alert.search([('project_id', '=', self.project.id), ('alert_type', '=', 'delay')])
+        self.assertEqual(alerts.task_id, self.late_task)
+        self.assertEqual(alerts.severity, '3_high')
+        self.assertEqual(alerts.actual_value, 10)
+        self.assertTrue(alerts.name.startswith('ALT-'))
+
+        # A second run must not create another open alert for the same task
+        Alert._cron_check_task_delays()
+        self.assertEqual(
+            Alert.search_count([('project_id', '=', self.project.id), ('alert_type', '=', 'delay')]), 1)
+
+        # Once resolved, a new alert may be raised again
+        alerts.action_resolve()
+        Alert._cron_check_task_delays()
+        self.assertEqual(
+            Alert.search_count([('project_id', '=', self.project.id), ('alert_type', '=', 'delay')]), 2)
+
+    def test_02_not_started_alerts(self):
+        """Tasks past their start date with no progress raise a not-started alert"""
+        Alert = self.env['execution.alert']
+        Alert._cron_check_not_started()
+
+        alerts = Alert.search([('project_id', '=', self.project.id), ('alert_type', '=', 'not_started_delay')])
+        self.assertEqual(alerts.task_id, self.late_task)
+        self.assertEqual(alerts.severity, '3_high')
+
+    def test_03_inactivity_alerts(self):
+        """Running projects without recent declarations raise one inactivity alert"""
+        Alert = self.env['execution.alert']
+        self.project.write({
+            'execution_state': 'running',
+            'execution_actual_start': date.today() - timedelta(days=20),
+        })
+        Alert._cron_check_inactivity()
+
+        alerts = Alert.search([('project_id', '=', self.project.id), ('alert_type', '=', 'inactivity')])
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts.actual_value, 20)
+        self.assertEqual(alerts.severity, '3_high')
+
+        Alert._cron_check_inactivity()
+        self.assertEqual(
+            Alert.search_count([('project_id', '=', self.project.id), ('alert_type', '=', 'inactivity')]), 1)
+
+    def test_04_notification_digest(self):
+        """Notifications are grouped in one queued digest per recipient"""
+        Alert = self.env['execution.alert']
+        recipient = self.env['res.users'].create({
+            'name': 'Alert Recipient',
+            'login': 'alert_recipient',
+            'email': 'recipient@example.com',
+        })
+        self.config.write({'notify_users': [(6, 0, recipient.ids)]})
+        Alert._cron_check_task_delays()
+        Alert._cron_check_not_started()
+        alerts = Alert.search([('project_id', '=', self.project.id)])
+        self.assertEqual(len(alerts), 2)
+
+        alerts.action_send_notification()
+
+        mails = self.env['mail.mail'].search([('recipient_ids', 'in', recipient.partner_id.ids)])
+        self.assertEqual(len(mails), 1)
+        self.assertEqual(mails.state, 'outgoing')
+        self.assertEqual(alerts.mapped('reminder_count'), [1, 1])
+        self.assertTrue(all(alerts.mapped('notification_sent')))
+        self.assertFalse(self.env['execution.alert.event'].search_count([
+            ('alert_id', 'in', alerts.ids), ('state', '=', 'pending'),
+        ]))
+
+    def test_05_kpi_snapshot(self):
+        """Daily snapshot stores one project row and one row per task with alert counts"""
+        Snapshot = self.env['execution.kpi.snapshot']
+        self.env['execution.alert']._cron_check_task_delays()
+        today = date.today()
+
+        # Only running projects are snapshotted
+        Snapshot._take_snapshot(today)
+        self.assertFalse(Snapshot.search_count([('project_id', '=', self.project.id)]))
+
+        self.project.execution_state = 'running'
+        Snapshot._take_snapshot(today)
+        # Taking the snapshot again keeps the rows of the day
+        self.env.cr.execute("UPDATE project_project SET execution_delay_days = 99 WHERE id = %s", [self.project.id])
+        Snapshot._take_snapshot(today)
+
+        snapshots = Snapshot.search([('project_id', '=', self.project.id)])
+        self.assertEqual(len(snapshots), 3)
+        project_row = snapshots.filtered(lambda s: not s.task_id)
+        self.assertEqual(project_row.snapshot_date, today)
+        self.assertNotEqual(project_row.delay_days, 99)
+        self.assertEqual(project_row.open_alert_count, 1)
+        late_row = snapshots.filtered(lambda s: s.task_id == self.late_task)
+        self.assertEqual(late_row.open_alert_count, 1)
+        self.assertEqual(late_row.critical_alert_count, 0)
+
+        self.assertEqual(Snapshot._get_progress_at_date(self.project, today), {self.project.id: 0.0})
+        self.assertEqual(Snapshot._get_progress_at_date(self.project, today - timedelta(days=1)), {})
+
+    def test_06_portfolio_report(self):
+        """Portfolio analysis is refreshed from projects, plannings and alerts"""
+        Report = self.env['execution.project.report']
+        self.env['execution.alert']._cron_check_task_delays()
+        Report._cron_refresh_report()
+
+        row = Report.search([('project_id', '=', self.project.id)])
+        self.assertEqual(row.active_planning_id, self.planning)
+        self.assertEqual(row.open_alert_count, 1)
+        self.assertEqual(row.project_count, 1)
@@ -40,6 +40,7 @@ This is the foundation module for the Execution PM suite.
         'data/execution_project_type_data.xml',
         'data/execution_sector_data.xml',
         'data/ir_sequence_data.xml',
+        'data/time_advance_cron.xml',
         # Views (Order matters: Menus first so they can be referenced as parents)
         'views/menu_views.xml',
         'wizards/execution_project_state_wizard_views.xml',
@@ -47,8 +48,10 @@ This is the foundation module for the Execution PM suite.
         'views/execution_project_type_views.xml',
         'views/execution_sector_views.xml',
         'views/execution_funding_source_views.xml',
+        'report/execution_project_report_views.xml',
         'views/dashboard_authority_views.xml',
         'views/res_users_views.xml',
+        'wizards/execution_role_assignment_wizard_views.xml',
     ],
     'demo': [],
     'installable': True,
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
 
@@ -93,20 +95,35 @@ class ExecutionFundingSource(models.Model):
 
     @api.depends('name')
     def _compute_project_count(self):
-        """Compute the number of projects using each funding source."""
+        """Compute the number of projects using each funding source, in one grouped query."""
+        counts = {
+            source.id: count
+            for source, count in self.env['project.project']._read_group(
+                [('execution_funding_source_id', 'in', self._origin.ids)],
+                ['execution_funding_source_id'], ['__count'],
+            )
+        }
         for record in self:
-            record.project_count = self.env['project.project'].search_count([
-                ('execution_funding_source_id', '=', record.id)
-            ])
+            record.project_count = counts.get(record._origin.id, 0)
 
-    @api.depends('name')
+    @api.depends('name', 'currency_id')
     def _compute_total_funded_amount(self):
-        """Compute total amount funded across all projects."""
+        """
+        Compute total amount funded across all projects.
+        Budgets are summed per project currency in one grouped query, then
+        converted to the currency of the funding source.
+        """
+        totals = defaultdict(float)
+        today = fields.Date.context_today(self)
+        for source, currency, budget in self.env['project.project']._read_group(
+            [('execution_funding_source_id', 'in', self._origin.ids)],
+            ['execution_funding_source_id', 'execution_currency_id'], ['execution_budget:sum'],
+        ):
+            if currency and source.currency_id and currency != source.currency_id:
+                budget = currency._convert(budget, source.currency_id, self.env.company, today)
+            totals[source.id] += budget
         for record in self:
-            projects = self.env['project.project'].search([
-                ('execution_funding_source_id', '=', record.id)
-            ])
-            record.total_funded_amount = sum(projects.mapped('execution_budget'))
+            record.total_funded_amount = totals[record._origin.id]
 
     @api.model_create_multi
     def create(self, vals_list):
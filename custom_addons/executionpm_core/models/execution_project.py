@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
+import logging
+
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools import SQL
 from datetime import date
 
+_logger = logging.getLogger(__name__)
+
 
 class ProjectProject(models.Model):
     """
@@ -364,6 +369,74 @@ class ProjectProject(models.Model):
                 else:
                     project.execution_delay_days = 0
 
+    # -------------------------------------------------------------------------
+    # TIME ADVANCE (date-dependent stored fields)
+    # -------------------------------------------------------------------------
+    @api.model
+    def _cron_time_advance(self):
+        """Daily update of the stored fields computed from today's date."""
+        self._time_advance(date.today())
+
+    @api.model
+    def _time_advance(self, today):
+        """
+        Update the stored fields depending on ``today``, only on the rows whose
+        value changes. Extended by modules with other date-dependent fields.
+        """
+        self._time_advance_projects(today)
+
+    @api.model
+    def _time_advance_projects(self, today):
+        """
+        Actual duration of the started and unfinished projects, and delay of
+        the unfinished projects past their planned end, as the computes do.
+        """
+        self.flush_model([
+            'execution_actual_start', 'execution_actual_end', 'execution_planned_end',
+            'execution_progress', 'execution_duration_actual', 'execution_delay_days',
+        ])
+        self.env.cr.execute(SQL(
+            """
+            UPDATE project_project
+               SET execution_duration_actual = %(today)s - execution_actual_start,
+                   write_date = NOW() AT TIME ZONE 'UTC'
+             WHERE execution_actual_start IS NOT NULL
+               AND execution_actual_end IS NULL
+               AND execution_duration_actual IS DISTINCT FROM %(today)s - execution_actual_start
+            RETURNING id
+            """,
+            today=today,
+        ))
+        duration_ids = [row[0] for row in self.env.cr.fetchall()]
+        self.env.cr.execute(SQL(
+            """
+            UPDATE project_project
+               SET execution_delay_days = CASE
+                       WHEN execution_planned_end < %(today)s THEN %(today)s - execution_planned_end
+                       ELSE 0
+                   END,
+                   write_date = NOW() AT TIME ZONE 'UTC'
+             WHERE COALESCE(execution_progress, 0) < 100
+               AND execution_planned_end IS NOT NULL
+               AND execution_delay_days IS DISTINCT FROM CASE
+                       WHEN execution_planned_end < %(today)s THEN %(today)s - execution_planned_end
+                       ELSE 0
+                   END
+            RETURNING id
+            """,
+            today=today,
+        ))
+        delay_ids = [row[0] for row in self.env.cr.fetchall()]
+
+        # write_date moves too, so the portfolio view is refreshed with the new delays
+        self.invalidate_model(['execution_duration_actual', 'execution_delay_days', 'write_date'])
+        self.browse(duration_ids).modified(['execution_duration_actual'])
+        self.browse(delay_ids).modified(['execution_delay_days'])
+        _logger.info(
+            "Time advance to %s: %s project durations, %s project delays updated",
+            today, len(duration_ids), len(delay_ids),
+        )
+
     # -------------------------------------------------------------------------
     # CONSTRAINT METHODS
     # -------------------------------------------------------------------------
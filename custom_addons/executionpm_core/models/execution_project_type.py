@@ -66,11 +66,16 @@ class ExecutionProjectType(models.Model):
 
     @api.depends('name')
     def _compute_project_count(self):
-        """Compute the number of projects for each type."""
+        """Compute the number of projects for each type, in one grouped query."""
+        counts = {
+            project_type.id: count
+            for project_type, count in self.env['project.project']._read_group(
+                [('execution_project_type_id', 'in', self._origin.ids)],
+                ['execution_project_type_id'], ['__count'],
+            )
+        }
         for record in self:
-            record.project_count = self.env['project.project'].search_count([
-                ('execution_project_type_id', '=', record.id)
-            ])
+            record.project_count = counts.get(record._origin.id, 0)
 
     @api.constrains('code')
     def _check_code_format(self):
@@ -90,11 +90,20 @@ class ExecutionSector(models.Model):
 
     @api.depends('name')
     def _compute_project_count(self):
-        """Compute the number of projects in each sector."""
+        """
+        Compute the number of projects in each sector and its sub-sectors,
+        with one grouped query for the whole batch rolled up through parent_path.
+        """
+        counts = dict.fromkeys(self._origin.ids, 0)
+        for sector, count in self.env['project.project']._read_group(
+            [('execution_sector_id', 'child_of', self._origin.ids)],
+            ['execution_sector_id'], ['__count'],
+        ):
+            for ancestor_id in sector.parent_path.split('/')[:-1]:
+                if int(ancestor_id) in counts:
+                    counts[int(ancestor_id)] += count
         for record in self:
-            record.project_count = self.env['project.project'].search_count([
-                ('execution_sector_id', '=', record.id)
-            ])
+            record.project_count = counts.get(record._origin.id, 0)
 
     @api.constrains('parent_id')
     def _check_hierarchy(self):
@@ -1,4 +1,5 @@
-from odoo import models, fields, api
+from odoo import Command, api, fields, models
+from odoo.tools import SQL
 
 class ResUsers(models.Model):
     _inherit = 'res.users'
@@ -41,13 +42,56 @@ class ResUsers(models.Model):
         help="Read-only access across the board."
     )
 
+    # Checkbox field -> group
+    _EXECUTIONPM_GROUP_FIELDS = {
+        'group_executionpm_admin': 'executionpm_core.group_executionpm_admin',
+        'group_executionpm_pmo': 'executionpm_core.group_executionpm_pmo',
+        'group_executionpm_control_office': 'executionpm_core.group_executionpm_control_office',
+        'group_executionpm_contractor': 'executionpm_core.group_executionpm_contractor',
+        'group_executionpm_authority': 'executionpm_core.group_executionpm_authority',
+    }
+
     def _compute_executionpm_groups(self):
+        """
+        Read the memberships of the whole recordset in one query. A user has
+        a group directly or through any group implying it, as in has_group.
+        """
+        field_by_group = {}
+        for field_name, xml_id in self._EXECUTIONPM_GROUP_FIELDS.items():
+            group = self.env.ref(xml_id, raise_if_not_found=False)
+            if group:
+                field_by_group[group.id] = field_name
+
+        memberships = set()
+        user_ids = [user_id for user_id in self._origin.ids if user_id]
+        if user_ids and field_by_group:
+            self.flush_model(['groups_id'])
+            self.env['res.groups'].flush_model(['implied_ids'])
+            self.env.cr.execute(SQL(
+                """
+                WITH RECURSIVE implying(group_id, target_id) AS (
+                    SELECT id, id FROM res_groups WHERE id = ANY(%(group_ids)s)
+                     UNION
+                    SELECT rel.gid, implying.target_id
+                      FROM res_groups_implied_rel rel
+                      JOIN implying ON rel.hid = implying.group_id
+                )
+                SELECT DISTINCT rel.uid, implying.target_id
+                  FROM res_groups_users_rel rel
+                  JOIN implying ON implying.group_id = rel.gid
+                 WHERE rel.uid = ANY(%(user_ids)s)
+                """,
+                group_ids=list(field_by_group),
+                user_ids=user_ids,
+            ))
+            memberships = set(self.env.cr.fetchall())
+
         for user in self:
-            user.group_executionpm_admin = user.has_group('executionpm_core.group_executionpm_admin')
-            user.group_executionpm_pmo = user.has_group('executionpm_core.group_executionpm_pmo')
-            user.group_executionpm_control_office = user.has_group('executionpm_core.group_executionpm_control_office')
-            user.group_executionpm_contractor = user.has_group('executionpm_core.group_executionpm_contractor')
-            user.group_executionpm_authority = user.has_group('executionpm_core.group_executionpm_authority')
+            for field_name in self._EXECUTIONPM_GROUP_FIELDS:
+                user[field_name] = False
+            for group_id, field_name in field_by_group.items():
+                if (user._origin.id, group_id) in memberships:
+                    user[field_name] = True
 
     def _inverse_executionpm_admin(self):
         self._set_group('executionpm_core.group_executionpm_admin', 'group_executionpm_admin')
@@ -65,9 +109,13 @@ class ResUsers(models.Model):
         self._set_group('executionpm_core.group_executionpm_authority', 'group_executionpm_authority')
 
     def _set_group(self, group_xml_id, field_name):
-        group = self.env.ref(group_xml_id)
-        for user in self:
-            if user[field_name]:
-                user.write({'groups_id': [(4, group.id)]})
-            else:
-                user.write({'groups_id': [(3, group.id)]})
+        """Add the group to the checked users and remove it from the others, one write each."""
+        to_add = self.filtered(field_name)
+        self._set_executionpm_group(self.env.ref(group_xml_id), to_add, self - to_add)
+
+    @api.model
+    def _set_executionpm_group(self, group, to_add, to_remove):
+        if to_add:
+            to_add.write({'groups_id': [Command.link(group.id)]})
+        if to_remove:
+            to_remove.write({'groups_id': [Command.unlink(group.id)]})
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Portfolio Reporting Model
+
+Materialized view with one row per execution project, joined with its
+classification and KPIs. The authority dashboard tiles read this view, so
+each tile is a single aggregate query over an indexed table instead of a
+search on project.project through the record rules.
+
+Other modules add columns by extending ``_select``/``_from`` and declare the
+tables whose changes require a refresh in ``_get_refresh_sources``.
+"""
+import logging
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+
+class ExecutionProjectReport(models.Model):
+    _name = 'execution.project.report'
+    _description = 'Execution Portfolio Analysis'
+    _auto = False
+    _rec_name = 'project_id'
+    _order = 'project_id'
+
+    project_id = fields.Many2one(
+        comodel_name='project.project',
+        string='Project',
+        readonly=True,
+    )
+    company_id = fields.Many2one(
+        comodel_name='res.company',
+        string='Company',
+        readonly=True,
+    )
+    execution_state = fields.Selection(
+        selection=[
+            ('draft', 'Draft'),
+            ('planned', 'Planned'),
+            ('running', 'Running'),
+            ('at_risk', 'At Risk'),
+            ('suspended', 'Suspended'),
+            ('closed', 'Closed'),
+        ],
+        string='Execution State',
+        readonly=True,
+    )
+    execution_sector_id = fields.Many2one(
+        comodel_name='execution.sector',
+        string='Sector',
+        readonly=True,
+    )
+    execution_project_type_id = fields.Many2one(
+        comodel_name='execution.project.type',
+        string='Project Type',
+        readonly=True,
+    )
+    execution_funding_source_id = fields.Many2one(
+        comodel_name='execution.funding.source',
+        string='Funding Source',
+        readonly=True,
+    )
+    currency_id = fields.Many2one(
+        comodel_name='res.currency',
+        string='Currency',
+        readonly=True,
+    )
+    execution_budget = fields.Monetary(
+        string='Budget',
+        currency_field='currency_id',
+        readonly=True,
+    )
+    execution_spent_amount = fields.Monetary(
+        string='Spent Amount',
+        currency_field='currency_id',
+        readonly=True,
+    )
+    execution_progress = fields.Float(
+        string='Overall Progress (%)',
+        digits=(5, 2),
+        readonly=True,
+        aggregator='avg',
+    )
+    execution_physical_progress = fields.Float(
+        string='Physical Progress (%)',
+        digits=(5, 2),
+        readonly=True,
+        aggregator='avg',
+    )
+    execution_financial_progress = fields.Float(
+        string='Financial Progress (%)',
+        digits=(5, 2),
+        readonly=True,
+        aggregator='avg',
+    )
+    execution_delay_days = fields.Integer(
+        string='Delay (Days)',
+        readonly=True,
+        aggregator='avg',
+    )
+    project_count = fields.Integer(
+        string='# Projects',
+        readonly=True,
+    )
+
+    # -------------------------------------------------------------------------
+    # VIEW DEFINITION
+    # -------------------------------------------------------------------------
+    def _select(self):
+        return SQL(
+            """
+            p.id AS id,
+            p.id AS project_id,
+            p.company_id,
+            p.execution_state,
+            p.execution_sector_id,
+            p.execution_project_type_id,
+            p.execution_funding_source_id,
+            p.execution_currency_id AS currency_id,
+            p.execution_budget,
+            p.execution_spent_amount,
+            p.execution_progress,
+            p.execution_physical_progress,
+            p.execution_financial_progress,
+            p.execution_delay_days,
+            1 AS project_count
+            """
+        )
+
+    def _from(self):
+        return SQL("project_project p")
+
+    def _where(self):
+        return SQL("p.is_execution_project AND p.active")
+
+    def _query(self):
+        return SQL(
+            "SELECT %s FROM %s WHERE %s",
+            self._select(), self._from(), self._where(),
+        )
+
+    def init(self):
+        table = SQL.identifier(self._table)
+        self.env.cr.execute(SQL("DROP MATERIALIZED VIEW IF EXISTS %s CASCADE", table))
+        self.env.cr.execute(SQL("CREATE MATERIALIZED VIEW %s AS (%s)", table, self._query()))
+        # A unique index is required to refresh the view concurrently
+        self.env.cr.execute(SQL(
+            "CREATE UNIQUE INDEX %s ON %s (id)",
+            SQL.identifier('%s_id_index' % self._table), table,
+        ))
+        for column in ('execution_state', 'execution_sector_id',
+                       'execution_project_type_id', 'execution_funding_source_id'):
+            self.env.cr.execute(SQL(
+                "CREATE INDEX %s ON %s (%s)",
+                SQL.identifier('%s_%s_index' % (self._table, column)), table, SQL.identifier(column),
+            ))
+        # The next cron run refreshes the view against the current sources
+        self.env['ir.config_parameter'].sudo().set_param(
+            'executionpm_core.project_report_refresh_signature', False)
+
+    # -------------------------------------------------------------------------
+    # REFRESH
+    # -------------------------------------------------------------------------
+    @api.model
+    def _get_refresh_sources(self):
+        """Models whose changes (``write_date`` or row count) make the view stale."""
+        return ['project.project']
+
+    @api.model
+    def _get_refresh_signature(self):
+        """
+        Return the last ``write_date`` and the row count of every refresh
+        source, as a string. Deletions change the row counts.
+        """
+        sources = [self.env[model_name] for model_name in self._get_refresh_sources()]
+        for model in sources:
+            model.flush_model()
+        self.env.cr.execute(SQL(
+            "SELECT %s",
+            SQL(", ").join(
+                SQL("(SELECT MAX(write_date) FROM %(table)s), (SELECT COUNT(*) FROM %(table)s)",
+                    table=SQL.identifier(model._table))
+                for model in sources
+            ),
+        ))
+        return str(self.env.cr.fetchone())
+
+    @api.model
+    def _cron_refresh_report(self):
+        """Refresh the view only when one of its source tables changed since the last refresh."""
+        signature = self._get_refresh_signature()
+        if signature == self.env['ir.config_parameter'].sudo().get_param(
+                'executionpm_core.project_report_refresh_signature'):
+            return
+        self._refresh_report(signature)
+
+    @api.model
+    def _refresh_report(self, signature=None):
+        """Recompute the view without blocking concurrent dashboard reads."""
+        signature = signature or self._get_refresh_signature()
+        self.env.cr.execute(SQL(
+            "REFRESH MATERIALIZED VIEW CONCURRENTLY %s", SQL.identifier(self._table)))
+        self.env['ir.config_parameter'].sudo().set_param(
+            'executionpm_core.project_report_refresh_signature', signature)
+        self.invalidate_model()
+        _logger.info("Execution portfolio analysis refreshed")
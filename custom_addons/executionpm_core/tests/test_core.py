@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+from odoo import fields
+from odoo.tests.common import TransactionCase
+from odoo.exceptions import UserError
+
+from odoo.addons.executionpm_core.tools import get_precommit_queue, pop_precommit_queue
+
+
+class TestProjectReport(TransactionCase):
+
+    def test_01_refresh_after_delete(self):
+        """Deleting a project makes the portfolio view stale"""
+        Report = self.env['execution.project.report']
+        project = self.env['project.project'].create({
+            'name': 'Report Project',
+            'is_execution_project': True,
+        })
+        Report._cron_refresh_report()
+        self.assertTrue(Report.search([('project_id', '=', project.id)]))
+
+        project_id = project.id
+        project.unlink()
+        Report._cron_refresh_report()
+        self.assertFalse(Report.search([('project_id', '=', project_id)]))
+
+
+class TestPrecommitQueue(TransactionCase):
+
+    def test_01_queue_flushed_once(self):
+        """A transaction queue is created once and flushed before the commit"""
+        flushed = []
+
+        def flush():
+            flushed.append(pop_precommit_queue(self.env, 'executionpm.test_queue'))
+
+        get_precommit_queue(self.env, 'executionpm.test_queue', flush).update([1, 2])
+        get_precommit_queue(self.env, 'executionpm.test_queue', flush).add(3)
+        self.env.cr.precommit.run()
+        self.assertEqual(flushed, [{1, 2, 3}])
+        self.assertIsNone(pop_precommit_queue(self.env, 'executionpm.test_queue'))
+
+
+class TestConfigurationCounters(TransactionCase):
+
+    def _create_project(self, **vals):
+        return self.env['project.project'].create(dict({
+            'name': 'Counter Project',
+            'is_execution_project': True,
+        }, **vals))
+
+    def test_01_sector_project_count(self):
+        """Sector counters include the projects of the sub-sectors"""
+        Sector = self.env['execution.sector']
+        parent = Sector.create({'name': 'Region', 'code': 'TST-REG'})
+        child = Sector.create({'name': 'District', 'code': 'TST-DIS', 'parent_id': parent.id})
+        self._create_project(execution_sector_id=parent.id)
+        self._create_project(execution_sector_id=child.id)
+        self._create_project(execution_sector_id=child.id)
+
+        (parent | child).invalidate_recordset(['project_count'])
+        self.assertEqual(parent.project_count, 3)
+        self.assertEqual(child.project_count, 2)
+
+    def test_02_funding_source_amount_in_two_currencies(self):
+        """Budgets in another currency are converted to the funding source currency"""
+        company_currency = self.env.company.currency_id
+        other_currency = self.env.ref('base.EUR')
+        if other_currency == company_currency:
+            other_currency = self.env.ref('base.USD')
+        other_currency.active = True
+        self.env['res.currency.rate'].create({
+            'currency_id': other_currency.id,
+            'company_id': self.env.company.id,
+            'name': fields.Date.context_today(self.env['res.currency.rate']),
+            'rate': 2.0,
+        })
+        source = self.env['execution.funding.source'].create({
+            'name': 'Test Donor',
+            'code': 'TST-DONOR',
+            'currency_id': company_currency.id,
+        })
+        self._create_project(
+            execution_funding_source_id=source.id,
+            execution_currency_id=company_currency.id,
+            execution_budget=1000.0,
+        )
+        self._create_project(
+            execution_funding_source_id=source.id,
+            execution_currency_id=other_currency.id,
+            execution_budget=1000.0,
+        )
+
+        source.invalidate_recordset(['total_funded_amount'])
+        self.assertAlmostEqual(source.total_funded_amount, 1500.0)
+
+
+class TestExecutionRoles(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestExecutionRoles, cls).setUpClass()
+        cls.users = cls.env['res.users'].create([{
+            'name': 'Role User %s' % index,
+            'login': 'executionpm_role_user_%s' % index,
+        } for index in range(2)])
+
+    def test_01_implied_roles_are_checked(self):
+        """An administrator shows the roles implied by the admin group as checked"""
+        admin = self.users[0]
+        admin.group_executionpm_admin = True
+        self.users.invalidate_recordset()
+        self.assertTrue(admin.group_executionpm_admin)
+        self.assertTrue(admin.group_executionpm_pmo)
+        self.assertTrue(admin.group_executionpm_control_office)
+        self.assertTrue(admin.group_executionpm_authority)
+        self.assertFalse(admin.group_executionpm_contractor)
+        self.assertFalse(self.users[1].group_executionpm_admin)
+
+    def test_02_bulk_role_assignment(self):
+        """The role wizard grants and revokes a role for several users at once"""
+        Wizard = self.env['execution.role.assignment.wizard'].with_context(
+            active_model='res.users', active_ids=self.users.ids,
+        )
+        Wizard.create({'role': 'group_executionpm_contractor', 'operation': 'add'}).action_apply()
+        self.users.invalidate_recordset()
+        self.assertEqual(self.users.mapped('group_executionpm_contractor'), [True, True])
+
+        Wizard.create({'role': 'group_executionpm_contractor', 'operation': 'remove'}).action_apply()
+        self.users.invalidate_recordset()
+        self.assertEqual(self.users.mapped('group_executionpm_contractor'), [False, False])
+
+        with self.assertRaises(UserError):
+            self.env['execution.role.assignment.wizard'].create({
+                'role': 'group_executionpm_contractor',
+            }).action_apply()
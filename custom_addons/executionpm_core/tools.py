@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+Transaction-scoped work queues.
+
+Records touched during a transaction are collected in a queue stored in
+``cr.precommit.data``, and the work is done once for all of them just
+before the commit.
+"""
+
+
+def get_precommit_queue(env, key, flush, factory=set):
+    """
+    Return the ``key`` queue of the current transaction.
+
+    The first call creates the queue with ``factory`` and schedules ``flush``
+    before the commit. ``flush`` takes the queue with
+    :func:`pop_precommit_queue`, it may also be called earlier.
+    """
+    precommit = env.cr.precommit
+    queue = precommit.data.get(key)
+    if queue is None:
+        queue = precommit.data[key] = factory()
+        precommit.add(lambda: _run_precommit_flush(env, flush))
+    return queue
+
+
+def pop_precommit_queue(env, key, default=None):
+    """Remove and return the ``key`` queue of the current transaction."""
+    return env.cr.precommit.data.pop(key, default)
+
+
+def _run_precommit_flush(env, flush):
+    flush()
+    # Precommit hooks run after the ORM flush of the commit
+    env.flush_all()
@@ -1,2 +1,3 @@
 # -*- coding: utf-8 -*-
 from . import execution_project_state_wizard
+from . import execution_role_assignment_wizard
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+
+class ExecutionRoleAssignmentWizard(models.TransientModel):
+    _name = 'execution.role.assignment.wizard'
+    _description = 'Execution PM Role Assignment Wizard'
+
+    user_ids = fields.Many2many(
+        'res.users',
+        string='Users',
+        default=lambda self: self._default_user_ids(),
+    )
+    role = fields.Selection([
+        ('group_executionpm_admin', 'Administrator'),
+        ('group_executionpm_pmo', 'PMO'),
+        ('group_executionpm_control_office', 'Control Office'),
+        ('group_executionpm_contractor', 'Contractor'),
+        ('group_executionpm_authority', 'Authority'),
+    ], string='Role', required=True, default='group_executionpm_contractor')
+    operation = fields.Selection([
+        ('add', 'Grant'),
+        ('remove', 'Revoke'),
+    ], string='Operation', required=True, default='add')
+
+    @api.model
+    def _default_user_ids(self):
+        if self.env.context.get('active_model') == 'res.users':
+            return self.env['res.users'].browse(self.env.context.get('active_ids', []))
+        return self.env['res.users']
+
+    def action_apply(self):
+        """Grant or revoke the role for all the selected users in a single write."""
+        self.ensure_one()
+        if not self.user_ids:
+            raise UserError(_("Please select the users to update."))
+        Users = self.env['res.users']
+        group = self.env.ref(Users._EXECUTIONPM_GROUP_FIELDS[self.role])
+        if self.operation == 'add':
+            Users._set_executionpm_group(group, self.user_ids, Users)
+        else:
+            Users._set_executionpm_group(group, Users, self.user_ids)
+        return {'type': 'ir.actions.act_window_close'}
@@ -1,3 +1,4 @@
 # -*- coding: utf-8 -*-
 from . import models
+from . import wizards
 from .hooks import post_init_hook
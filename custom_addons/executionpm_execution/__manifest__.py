@@ -17,6 +17,9 @@ Key Features:
 * Multi-step validation workflow
 * Validated progress updates project KPIs
 * Audit trail of all declarations
+* Cached project S-curves and portfolio S-curves by sector, type and funding source
+* Daily KPI snapshots of projects and tasks for trend charts
+* Earned value metrics (PV, EV, AC, SPI, CPI, EAC) per project and per lot
     """,
     'author': 'Your Company',
     'depends': [
@@ -33,10 +36,16 @@ Key Features:
         'views/progress_computation_views.xml',
         'views/project_task_views.xml',
         'views/project_project_views.xml',
+        'views/kpi_snapshot_views.xml',
+        'views/project_evm_views.xml',
         'views/dashboard_pmo_views.xml',
         'views/dashboard_contractor_views.xml',
         'views/menu_views.xml',
+        'wizards/portfolio_scurve_wizard_views.xml',
         'data/fix_dashboard_domains.xml',
+        'data/kpi_snapshot_cron.xml',
+        'data/evm_cron.xml',
+        'data/progress_refresh_cron.xml',
     ],
     'installable': True,
     'application': False,
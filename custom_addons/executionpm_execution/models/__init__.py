@@ -3,3 +3,8 @@ from . import execution_progress
 from . import execution_planning_task
 from . import progress_computation
 from . import project_task
+from . import project_scurve
+from . import progress_change_log
+from . import kpi_snapshot
+from . import execution_project_report
+from . import project_evm
@@ -77,6 +77,10 @@ class ExecutionPlanningTask(models.Model):
             else:
                 task.progress_status = 'not_started'
 
+    @api.model
+    def _get_tree_fields(self):
+        return super()._get_tree_fields() + ['validated_progress', 'progress_status']
+
     def action_view_declarations(self):
         """View progress declarations for this task."""
         self.ensure_one()
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError, UserError
+from odoo.tools import SQL
 
 
 class ExecutionProgress(models.Model):
@@ -41,6 +44,7 @@ class ExecutionProgress(models.Model):
         related='task_id.planning_id.project_id',
         store=True,
         readonly=True,
+        index=True,
     )
     
     # Progress Data
@@ -162,16 +166,49 @@ class ExecutionProgress(models.Model):
     @api.depends('task_id')
     def _compute_previous_percentage(self):
         """Get the last validated percentage for this task."""
+        latest_validated = self._get_latest_validated_declarations(self.task_id._origin.ids)
         for record in self:
-            if record.task_id:
-                last_validated = self.search([
-                    ('task_id', '=', record.task_id.id),
-                    ('state', '=', 'validated'),
-                    ('id', '!=', record.id if record.id else 0),
-                ], order='execution_date desc, id desc', limit=1)
-                record.previous_percentage = last_validated.declared_percentage if last_validated else 0.0
-            else:
-                record.previous_percentage = 0.0
+            # A declaration is never its own previous one: skip it if it is the latest
+            record.previous_percentage = next((
+                percentage
+                for declaration_id, percentage in latest_validated.get(record.task_id._origin.id, [])
+                if declaration_id != record.id
+            ), 0.0)
+
+    @api.model
+    def _get_latest_validated_declarations(self, task_ids, depth=2):
+        """
+        Return the ``depth`` most recent validated declarations of each task as
+        {task_id: [(declaration_id, declared_percentage), ...]}, newest first.
+
+        All tasks are served by a single windowed query, so recomputing many
+        declarations does not issue one search per record.
+        """
+        if not task_ids:
+            return {}
+        self.flush_model(['task_id', 'state', 'execution_date', 'declared_percentage'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT task_id, id, declared_percentage
+              FROM (
+                    SELECT task_id, id, declared_percentage,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY task_id
+                               ORDER BY execution_date DESC, id DESC
+                           ) AS position
+                      FROM execution_progress
+                     WHERE task_id = ANY(%s)
+                       AND state = 'validated'
+                   ) ranked
+             WHERE position <= %s
+          ORDER BY task_id, position
+            """,
+            list(task_ids), depth,
+        ))
+        result = defaultdict(list)
+        for task_id, declaration_id, percentage in self.env.cr.fetchall():
+            result[task_id].append((declaration_id, percentage or 0.0))
+        return result
 
     @api.depends('declared_percentage', 'previous_percentage')
     def _compute_incremental_percentage(self):
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class ExecutionProjectReport(models.Model):
+    """
+    Add the validated progress of the active planning to the portfolio analysis.
+    """
+    _inherit = 'execution.project.report'
+
+    computed_physical_progress = fields.Float(
+        string='Computed Physical Progress (%)',
+        digits=(5, 2),
+        readonly=True,
+        aggregator='avg',
+    )
+    active_planning_id = fields.Many2one(
+        comodel_name='execution.planning',
+        string='Active Planning',
+        readonly=True,
+    )
+
+    def _select(self):
+        return SQL(
+            "%s, p.active_planning_id, COALESCE(pl.overall_validated_progress, 0.0) AS computed_physical_progress",
+            super()._select(),
+        )
+
+    def _from(self):
+        return SQL(
+            "%s LEFT JOIN execution_planning pl ON pl.id = p.active_planning_id",
+            super()._from(),
+        )
+
+    @api.model
+    def _get_refresh_sources(self):
+        return super()._get_refresh_sources() + ['execution.planning']
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+KPI Snapshots
+
+Append-only daily time series of project and task KPIs. Snapshots are taken
+by a cron with one INSERT ... SELECT per level, so trend charts and
+"progress at date X" questions are index lookups instead of a replay of the
+chatter tracking values.
+
+Old rows are downsampled: after the retention period only the last snapshot
+of each month is kept.
+"""
+import logging
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+
+class ExecutionKpiSnapshot(models.Model):
+    """
+    Daily KPI snapshot of a project (task_id empty) or of a planning task.
+    """
+    _name = 'execution.kpi.snapshot'
+    _description = 'Execution KPI Snapshot'
+    _order = 'snapshot_date desc, id desc'
+    _rec_name = 'snapshot_date'
+
+    snapshot_date = fields.Date(
+        string='Date',
+        required=True,
+        readonly=True,
+    )
+    project_id = fields.Many2one(
+        comodel_name='project.project',
+        string='Project',
+        required=True,
+        readonly=True,
+        ondelete='cascade',
+    )
+    task_id = fields.Many2one(
+        comodel_name='execution.planning.task',
+        string='Task',
+        readonly=True,
+        ondelete='cascade',
+        index='btree_not_null',
+        help='Empty for project-level snapshots.',
+    )
+    physical_progress = fields.Float(
+        string='Physical Progress (%)',
+        digits=(5, 2),
+        readonly=True,
+        aggregator='avg',
+    )
+    financial_progress = fields.Float(
+        string='Financial Progress (%)',
+        digits=(5, 2),
+        readonly=True,
+        aggregator='avg',
+    )
+    delay_days = fields.Integer(
+        string='Delay (Days)',
+        readonly=True,
+        aggregator='max',
+    )
+    progress_deviation = fields.Float(
+        string='Progress Deviation (%)',
+        digits=(5, 2),
+        readonly=True,
+        aggregator='avg',
+    )
+
+    # Default retention of daily rows, before monthly downsampling
+    _DAILY_RETENTION_DAYS = 90
+
+    def init(self):
+        # One project row and one row per task and day
+        self.env.cr.execute(SQL(
+            """
+            CREATE INDEX IF NOT EXISTS execution_kpi_snapshot_project_date_index
+                ON execution_kpi_snapshot (project_id, snapshot_date);
+            CREATE UNIQUE INDEX IF NOT EXISTS execution_kpi_snapshot_project_unique
+                ON execution_kpi_snapshot (project_id, snapshot_date) WHERE task_id IS NULL;
+            CREATE UNIQUE INDEX IF NOT EXISTS execution_kpi_snapshot_task_unique
+                ON execution_kpi_snapshot (task_id, snapshot_date) WHERE task_id IS NOT NULL;
+            """
+        ))
+
+    # -------------------------------------------------------------------------
+    # SNAPSHOT COLUMNS (extended by other modules)
+    # -------------------------------------------------------------------------
+    @api.model
+    def _get_project_snapshot_columns(self):
+        """
+        Return {column: SQL expression} for project rows.
+        Expressions are evaluated against ``project_project p``.
+        """
+        return {
+            'project_id': SQL('p.id'),
+            'physical_progress': SQL('p.computed_physical_progress'),
+            'financial_progress': SQL('p.execution_financial_progress'),
+            'delay_days': SQL('p.execution_delay_days'),
+            'progress_deviation': SQL(
+                """COALESCE((
+                    SELECT SUM(t.progress_deviation * t.weight) / 100.0
+                      FROM execution_planning_task t
+                     WHERE t.planning_id = p.active_planning_id
+                ), 0.0)"""
+            ),
+        }
+
+    @api.model
+    def _get_task_snapshot_columns(self):
+        """
+        Return {column: SQL expression} for task rows.
+        Expressions are evaluated against ``execution_planning_task t`` joined
+        with its project ``project_project p``.
+        """
+        return {
+            'project_id': SQL('p.id'),
+            'task_id': SQL('t.id'),
+            'physical_progress': SQL('t.validated_progress'),
+            'delay_days': SQL('t.max_delay_days'),
+            'progress_deviation': SQL('t.progress_deviation'),
+        }
+
+    # -------------------------------------------------------------------------
+    # CRON
+    # -------------------------------------------------------------------------
+    @api.model
+    def _cron_take_snapshot(self):
+        """Snapshot running (or at risk) execution projects and their active planning tasks."""
+        self._take_snapshot(fields.Date.context_today(self))
+        self._downsample_snapshots()
+
+    @api.model
+    def _take_snapshot(self, snapshot_date):
+        """
+        Append the snapshots of ``snapshot_date`` with the current KPI values.
+        Uses two INSERT ... SELECT statements, whatever the portfolio size.
+        Rows already taken for that date are kept as they are.
+        """
+        self.env['project.project'].flush_model()
+        self.env['execution.planning.task'].flush_model()
+        self.flush_model()
+
+        project_count = self._insert_snapshot_rows(
+            snapshot_date, self._get_project_snapshot_columns(),
+            SQL("project_project p"),
+            SQL("(project_id, snapshot_date) WHERE task_id IS NULL"),
+        )
+        task_count = self._insert_snapshot_rows(
+            snapshot_date, self._get_task_snapshot_columns(),
+            SQL("project_project p JOIN execution_planning_task t ON t.planning_id = p.active_planning_id"),
+            SQL("(task_id, snapshot_date) WHERE task_id IS NOT NULL"),
+        )
+        self.invalidate_model()
+        _logger.info(
+            "KPI snapshot %s: %d projects, %d tasks", snapshot_date, project_count, task_count,
+        )
+
+    def _insert_snapshot_rows(self, snapshot_date, columns, from_clause, conflict_target):
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO execution_kpi_snapshot
+                   (snapshot_date, create_uid, create_date, write_uid, write_date, %(columns)s)
+            SELECT %(date)s, %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC',
+                   %(values)s
+              FROM %(from_clause)s
+             WHERE p.is_execution_project
+               AND p.active
+               AND p.execution_state IN ('running', 'at_risk')
+            ON CONFLICT %(conflict_target)s DO NOTHING
+            """,
+            columns=SQL(", ").join(SQL.identifier(column) for column in columns),
+            values=SQL(", ").join(columns.values()),
+            date=snapshot_date,
+            uid=self.env.uid,
+            from_clause=from_clause,
+            conflict_target=conflict_target,
+        ))
+        return self.env.cr.rowcount
+
+    @api.model
+    def _downsample_snapshots(self):
+        """Keep only the last snapshot of each month after the retention period."""
+        retention_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'executionpm_execution.kpi_snapshot_retention_days', self._DAILY_RETENTION_DAYS))
+        self.flush_model()
+        self.env.cr.execute(SQL(
+            """
+            DELETE FROM execution_kpi_snapshot s
+             USING (
+                SELECT id,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY project_id, task_id, DATE_TRUNC('month', snapshot_date)
+                           ORDER BY snapshot_date DESC
+                       ) AS rank
+                  FROM execution_kpi_snapshot
+                 WHERE snapshot_date < %(limit_date)s
+             ) old
+             WHERE s.id = old.id
+               AND old.rank > 1
+            """,
+            limit_date=fields.Date.subtract(fields.Date.context_today(self), days=retention_days),
+        ))
+        self.invalidate_model()
+
+    # -------------------------------------------------------------------------
+    # QUERIES
+    # -------------------------------------------------------------------------
+    @api.model
+    def _get_progress_at_date(self, projects, at_date):
+        """Return {project_id: physical_progress} from the last snapshot on or before ``at_date``."""
+        if not projects:
+            return {}
+        self.flush_model()
+        self.env.cr.execute(SQL(
+            """
+            SELECT DISTINCT ON (project_id) project_id, physical_progress
+              FROM execution_kpi_snapshot
+             WHERE project_id = ANY(%(project_ids)s)
+               AND task_id IS NULL
+               AND snapshot_date <= %(at_date)s
+             ORDER BY project_id, snapshot_date DESC
+            """,
+            project_ids=projects.ids,
+            at_date=at_date,
+        ))
+        return dict(self.env.cr.fetchall())
+
+
+class ProjectProjectKpiSnapshot(models.Model):
+    """
+    Read the progress history of a project from its KPI snapshots.
+    """
+    _inherit = 'project.project'
+
+    def action_view_progress_history(self):
+        """View the daily KPI snapshots of this project."""
+        self.ensure_one()
+        action = self.env['ir.actions.act_window']._for_xml_id(
+            'executionpm_execution.action_execution_kpi_snapshot')
+        action['domain'] = [('project_id', '=', self.id), ('task_id', '=', False)]
+        action['context'] = {'create': False, 'edit': False}
+        return action
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Progress Change Log
+
+Planning tasks whose declarations changed state since their progress was
+last propagated, one row per task. The log is fed by the declaration
+triggers and emptied by the propagation, so the project refresh button and
+the portfolio cron only recompute what is still pending.
+"""
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class ExecutionProgressChange(models.Model):
+    """
+    Pending progress change of a planning task.
+    """
+    _name = 'execution.progress.change'
+    _description = 'Pending Progress Change'
+    _order = 'id'
+    _log_access = False
+
+    task_id = fields.Many2one(
+        comodel_name='execution.planning.task',
+        string='Task',
+        required=True,
+        ondelete='cascade',
+    )
+    planning_id = fields.Many2one(
+        comodel_name='execution.planning',
+        string='Planning',
+        ondelete='cascade',
+        index=True,
+    )
+    change_date = fields.Datetime(string='Changed On', readonly=True)
+
+    _sql_constraints = [
+        ('task_unique', 'UNIQUE(task_id)',
+         'A task can only have one pending progress change.'),
+    ]
+
+    @api.model
+    def _log_tasks(self, task_ids):
+        """Record the tasks as changed; tasks already pending are kept as is."""
+        if not task_ids:
+            return
+        self.env['execution.planning.task'].flush_model(['planning_id'])
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO execution_progress_change (task_id, planning_id, change_date)
+            SELECT id, planning_id, NOW() AT TIME ZONE 'UTC'
+              FROM execution_planning_task
+             WHERE id = ANY(%(task_ids)s)
+            ON CONFLICT (task_id) DO NOTHING
+            """,
+            task_ids=list(task_ids),
+        ))
+
+    @api.model
+    def _clear_tasks(self, task_ids):
+        """Forget the changes of the tasks whose progress was propagated."""
+        if not task_ids:
+            return
+        self.env.cr.execute(SQL(
+            "DELETE FROM execution_progress_change WHERE task_id = ANY(%(task_ids)s)",
+            task_ids=list(task_ids),
+        ))
+        self.invalidate_model()
+
+    @api.model
+    def _get_pending_task_ids(self, plannings=None):
+        """Tasks with pending changes, of ``plannings`` or of the whole portfolio."""
+        if plannings is None:
+            self.env.cr.execute(SQL("SELECT task_id FROM execution_progress_change"))
+        else:
+            self.env.cr.execute(SQL(
+                "SELECT task_id FROM execution_progress_change WHERE planning_id = ANY(%(planning_ids)s)",
+                planning_ids=plannings.ids,
+            ))
+        return [row[0] for row in self.env.cr.fetchall()]
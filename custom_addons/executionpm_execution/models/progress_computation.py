@@ -8,10 +8,18 @@ Computes:
 - Planned vs actual curve data
 
 All computations use only validated execution data and are automatically triggered.
+Validations mark their tasks dirty; linked project tasks and project KPIs are
+then synchronized once, when the transaction is committed.
 """
 from odoo import api, fields, models, _
-from datetime import date, timedelta
+from odoo.tools import SQL
+from odoo.addons.executionpm_core.tools import get_precommit_queue, pop_precommit_queue
+from collections import defaultdict
+from datetime import date
 import json
+import logging
+
+_logger = logging.getLogger(__name__)
 
 
 class ExecutionPlanningTaskProgress(models.Model):
@@ -64,6 +72,39 @@ class ExecutionPlanningTaskProgress(models.Model):
         digits=(5, 4),
         help='This task\'s contribution to overall project progress.',
     )
+    subtree_progress = fields.Float(
+        string='Subtree Progress (%)',
+        compute='_compute_subtree_progress',
+        store=True,
+        recursive=True,
+        digits=(5, 2),
+        help='Validated progress of the task and its subtasks, weighted by physical weight.',
+    )
+
+    # -------------------------------------------------------------------------
+    # S-CURVE CACHE INVALIDATION
+    # -------------------------------------------------------------------------
+    _SCURVE_FIELDS = {'lot_id', 'date_start', 'date_end', 'weight'}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        tasks = super().create(vals_list)
+        self.env['execution.project.scurve']._invalidate_plannings(tasks.planning_id)
+        return tasks
+
+    def write(self, vals):
+        if not self._SCURVE_FIELDS.intersection(vals):
+            return super().write(vals)
+        plannings = self.planning_id
+        res = super().write(vals)
+        self.env['execution.project.scurve']._invalidate_plannings(plannings | self.planning_id)
+        return res
+
+    def unlink(self):
+        plannings = self.planning_id
+        res = super().unlink()
+        self.env['execution.project.scurve']._invalidate_plannings(plannings)
+        return res
 
     # -------------------------------------------------------------------------
     # COMPUTE: Validated Progress (Triggered by declaration state changes)
@@ -104,18 +145,67 @@ class ExecutionPlanningTaskProgress(models.Model):
                 task.validated_progress = 0.0
                 task.last_validated_date = False
 
-        # Sync progress to Odoo Project Tasks
-        for task in self:
-            if task.project_task_id:
-                # Sync to our custom field on the project task
-                vals = {'execution_progress': task.validated_progress}
-                if task.validated_progress >= 100:
-                    vals['state'] = '1_done'
-                elif task.validated_progress > 0:
-                    vals['state'] = '01_in_progress'
-                else:
-                    vals['state'] = '04_waiting_normal'
-                task.project_task_id.with_context(sync_in_progress=True).write(vals)
+    # -------------------------------------------------------------------------
+    # PROGRESS PROPAGATION (once per transaction)
+    # -------------------------------------------------------------------------
+    def _mark_progress_dirty(self):
+        """
+        Queue the tasks for progress propagation at the end of the transaction.
+        Validating several declarations of the same tasks or projects in one
+        transaction propagates their progress only once.
+
+        The tasks are also recorded in the progress change log until their
+        progress is propagated. With the ``defer_progress_propagation``
+        context key, they are only logged and left to the refresh button or
+        to the portfolio cron.
+        """
+        if not self:
+            return
+        self.env['execution.progress.change']._log_tasks(self.ids)
+        if self.env.context.get('defer_progress_propagation'):
+            return
+        get_precommit_queue(
+            self.env, 'executionpm.progress_dirty_task_ids', self._flush_progress_propagation,
+        ).update(self.ids)
+
+    @api.model
+    def _flush_progress_propagation(self):
+        """Propagate the progress of the tasks marked dirty in this transaction."""
+        dirty_ids = pop_precommit_queue(self.env, 'executionpm.progress_dirty_task_ids', set())
+        tasks = self.sudo().browse(dirty_ids).exists()
+        if tasks:
+            tasks._propagate_progress()
+        self.env['execution.progress.change']._clear_tasks(dirty_ids)
+
+    def _propagate_progress(self):
+        """
+        Recompute task -> planning -> project progress and sync the linked
+        project tasks. Extended by modules keeping other project KPIs.
+        """
+        # Stored computes of tasks, plannings and projects are recomputed here in batch
+        self.env.flush_all()
+        self._sync_project_task_progress()
+
+    def _sync_project_task_progress(self):
+        """Write validated progress on linked project tasks, one write per distinct value."""
+        to_write = defaultdict(lambda: self.env['project.task'])
+        for task in self.filtered('project_task_id'):
+            progress = task.validated_progress
+            if progress >= 100:
+                state = '1_done'
+            elif progress > 0:
+                state = '01_in_progress'
+            else:
+                state = '04_waiting_normal'
+            project_task = task.project_task_id
+            if project_task.execution_progress != progress or project_task.state != state:
+                to_write[progress, state] |= project_task
+
+        for (progress, state), project_tasks in to_write.items():
+            project_tasks.with_context(sync_in_progress=True).write({
+                'execution_progress': progress,
+                'state': state,
+            })
 
     # -------------------------------------------------------------------------
     # COMPUTE: Planned Progress to Date (Time-based)
@@ -141,6 +231,59 @@ class ExecutionPlanningTaskProgress(models.Model):
                 elapsed_days = (today - task.date_start).days
                 task.planned_progress_to_date = min(100.0, (elapsed_days / total_days) * 100)
 
+    # -------------------------------------------------------------------------
+    # TIME ADVANCE: Progress Deviation
+    # -------------------------------------------------------------------------
+    def init(self):
+        super().init()
+        # Tasks whose date window contains a given day, for the daily time advance
+        self.env.cr.execute(SQL(
+            """
+            CREATE INDEX IF NOT EXISTS execution_planning_task_window_index
+                ON execution_planning_task (date_end, date_start)
+            """
+        ))
+
+    @api.model
+    def _time_advance_progress_deviation(self, today, since=None):
+        """
+        Update the stored deviation of the tasks whose planned progress moved
+        between ``since`` (the previous run) and ``today``: only the tasks
+        whose date window overlaps that period, and whose value changes.
+        The planned progress is computed as in _compute_planned_progress_to_date.
+
+        :return: ids of the updated tasks
+        """
+        self.flush_model(['date_start', 'date_end', 'validated_progress', 'progress_deviation'])
+        planned = SQL(
+            """CASE
+                WHEN t.date_start IS NULL OR t.date_end IS NULL OR %(today)s < t.date_start THEN 0.0
+                WHEN %(today)s >= t.date_end THEN 100.0
+                ELSE LEAST(100.0, (%(today)s - t.date_start) * 100.0 / GREATEST(t.date_end - t.date_start, 1))
+            END""",
+            today=today,
+        )
+        deviation = SQL("ROUND((COALESCE(t.validated_progress, 0) - %s)::numeric, 2)", planned)
+        if since:
+            window = SQL("t.date_end > %(since)s AND t.date_start < %(today)s", since=since, today=today)
+        else:
+            window = SQL("TRUE")
+        self.env.cr.execute(SQL(
+            """
+            UPDATE execution_planning_task t
+               SET progress_deviation = %(deviation)s
+             WHERE %(window)s
+               AND t.progress_deviation IS DISTINCT FROM %(deviation)s
+            RETURNING t.id
+            """,
+            deviation=deviation,
+            window=window,
+        ))
+        task_ids = [row[0] for row in self.env.cr.fetchall()]
+        self.invalidate_model(['progress_deviation'])
+        self.browse(task_ids).modified(['progress_deviation'])
+        return task_ids
+
     # -------------------------------------------------------------------------
     # COMPUTE: Progress Deviation
     # -------------------------------------------------------------------------
@@ -164,6 +307,18 @@ class ExecutionPlanningTaskProgress(models.Model):
         for task in self:
             task.weighted_contribution = (task.validated_progress / 100.0) * task.weight if task.weight else 0.0
 
+    @api.depends('validated_progress', 'weighted_contribution', 'subtree_weight', 'subtask_ids.subtree_progress', 'subtask_ids.subtree_weight')
+    def _compute_subtree_progress(self):
+        """Weighted progress of the subtree, from the rollups of the direct subtasks only."""
+        for task in self:
+            if not task.subtree_weight:
+                task.subtree_progress = task.validated_progress
+                continue
+            contribution = task.weighted_contribution + sum(
+                subtask.subtree_progress * subtask.subtree_weight / 100.0 for subtask in task.subtask_ids
+            )
+            task.subtree_progress = contribution * 100.0 / task.subtree_weight
+
 
 class ExecutionPlanningProgress(models.Model):
     """
@@ -250,12 +405,6 @@ class ProjectProjectProgress(models.Model):
         digits=(5, 2),
         help='Weighted average of validated task progress from approved planning.',
     )
-    active_planning_id = fields.Many2one(
-        comodel_name='execution.planning',
-        string='Active Planning',
-        compute='_compute_active_planning',
-        store=True,
-    )
     progress_last_updated = fields.Datetime(
         string='Progress Last Updated',
         compute='_compute_project_progress',
@@ -274,23 +423,6 @@ class ProjectProjectProgress(models.Model):
         help='JSON data for actual progress curve.',
     )
 
-    # -------------------------------------------------------------------------
-    # COMPUTE: Active Planning
-    # -------------------------------------------------------------------------
-    @api.depends('is_execution_project')
-    def _compute_active_planning(self):
-        """Find the active approved planning for each project."""
-        for project in self:
-            if project.is_execution_project:
-                planning = self.env['execution.planning'].search([
-                    ('project_id', '=', project.id),
-                    ('state', '=', 'approved'),
-                    ('active', '=', True),
-                ], limit=1, order='approved_date desc')
-                project.active_planning_id = planning.id if planning else False
-            else:
-                project.active_planning_id = False
-
     # -------------------------------------------------------------------------
     # COMPUTE: Project Global Progress (Weighted Average from Planning)
     # -------------------------------------------------------------------------
@@ -312,193 +444,98 @@ class ProjectProjectProgress(models.Model):
     # -------------------------------------------------------------------------
     # COMPUTE: S-Curve Data (Planned vs Actual)
     # -------------------------------------------------------------------------
-    @api.depends('active_planning_id', 'active_planning_id.lot_ids.task_ids')
+    @api.depends(
+        'active_planning_id',
+        'active_planning_id.lot_ids.task_ids',
+        'active_planning_id.lot_ids.task_ids.validated_progress',
+    )
     def _compute_curve_data(self):
         """
-        Generate planned vs actual curve data for charting.
+        Planned vs actual curve data for charting, read from the S-curve cache.
         Returns JSON data suitable for rendering S-curves.
         """
+        curves = self.env['execution.project.scurve']._get_project_curves(self)
         for project in self:
-            if not project.active_planning_id:
-                project.planned_curve_data = json.dumps([])
-                project.actual_curve_data = json.dumps([])
-                continue
-
-            planning = project.active_planning_id
-            tasks = planning.lot_ids.mapped('task_ids')
-            
-            if not tasks:
-                project.planned_curve_data = json.dumps([])
-                project.actual_curve_data = json.dumps([])
-                continue
-
-            # Get date range
-            start_dates = [t.date_start for t in tasks if t.date_start]
-            end_dates = [t.date_end for t in tasks if t.date_end]
-            
-            if not start_dates or not end_dates:
-                project.planned_curve_data = json.dumps([])
-                project.actual_curve_data = json.dumps([])
-                continue
-
-            project_start = min(start_dates)
-            project_end = max(end_dates)
-            
-            # Generate planned curve (cumulative weight by end date)
-            planned_curve = project._generate_planned_curve(tasks, project_start, project_end)
+            planned_curve, actual_curve = curves.get(project.id, ([], []))
             project.planned_curve_data = json.dumps(planned_curve)
-            
-            # Generate actual curve (cumulative validated progress by validation date)
-            actual_curve = project._generate_actual_curve(tasks, project_start)
             project.actual_curve_data = json.dumps(actual_curve)
 
-    def _generate_planned_curve(self, tasks, project_start, project_end):
-        """
-        Generate planned S-curve data.
-        Each point represents cumulative planned progress at a given date.
-        """
-        curve_data = []
-        total_days = (project_end - project_start).days + 1
-        
-        # Sample at weekly intervals for performance
-        interval_days = max(1, total_days // 52)  # Max 52 data points
-        
-        current_date = project_start
-        while current_date <= project_end:
-            # Calculate expected progress at this date
-            cumulative_planned = 0.0
-            
-            for task in tasks:
-                if not task.date_start or not task.date_end:
-                    continue
-                    
-                if current_date < task.date_start:
-                    # Task not started yet
-                    task_progress = 0.0
-                elif current_date >= task.date_end:
-                    # Task should be complete
-                    task_progress = 100.0
-                else:
-                    # Linear interpolation
-                    task_days = (task.date_end - task.date_start).days or 1
-                    elapsed = (current_date - task.date_start).days
-                    task_progress = (elapsed / task_days) * 100
-                
-                # Add weighted contribution
-                cumulative_planned += (task_progress / 100.0) * task.weight
-            
-            curve_data.append({
-                'date': current_date.isoformat(),
-                'progress': round(cumulative_planned, 2),
-            })
-            
-            current_date += timedelta(days=interval_days)
-        
-        # Ensure we include the end date
-        if curve_data and curve_data[-1]['date'] != project_end.isoformat():
-            curve_data.append({
-                'date': project_end.isoformat(),
-                'progress': 100.0,
-            })
-        
-        return curve_data
-
-    def _generate_actual_curve(self, tasks, project_start):
-        """
-        Generate actual S-curve data from validated declarations.
-        Each point represents cumulative actual progress at validation date.
-        """
-        # Get all validated declarations for these tasks
-        declarations = self.env['execution.progress'].search([
-            ('task_id', 'in', tasks.ids),
-            ('state', '=', 'validated'),
-        ], order='validated_date asc, id asc')
-        
-        if not declarations:
-            return []
-        
-        curve_data = []
-        task_progress_map = {task.id: 0.0 for task in tasks}
-        task_weight_map = {task.id: task.weight for task in tasks}
-        
-        # Start point
-        curve_data.append({
-            'date': project_start.isoformat(),
-            'progress': 0.0,
-        })
-        
-        # Process each declaration in chronological order
-        last_date = None
-        for decl in declarations:
-            validation_date = decl.validated_date or decl.execution_date
-            if not validation_date:
-                continue
-                
-            # Update task progress
-            task_progress_map[decl.task_id.id] = decl.declared_percentage
-            
-            # Calculate cumulative weighted progress
-            cumulative = sum(
-                (progress / 100.0) * task_weight_map.get(task_id, 0)
-                for task_id, progress in task_progress_map.items()
-            )
-            
-            # Only add point if date changed (avoid duplicate dates)
-            if validation_date != last_date:
-                curve_data.append({
-                    'date': validation_date.isoformat(),
-                    'progress': round(cumulative, 2),
-                })
-                last_date = validation_date
-            else:
-                # Update last point with new cumulative value
-                if curve_data:
-                    curve_data[-1]['progress'] = round(cumulative, 2)
-        
-        # Add current date point if has progress
-        today = date.today()
-        if curve_data and last_date and today > last_date:
-            curve_data.append({
-                'date': today.isoformat(),
-                'progress': curve_data[-1]['progress'],
-            })
-        
-        return curve_data
+    # -------------------------------------------------------------------------
+    # TIME ADVANCE
+    # -------------------------------------------------------------------------
+    @api.model
+    def _time_advance(self, today):
+        super()._time_advance(today)
+        params = self.env['ir.config_parameter'].sudo()
+        since = params.get_param('executionpm.time_advance_date')
+        task_ids = self.env['execution.planning.task']._time_advance_progress_deviation(
+            today, since and fields.Date.to_date(since))
+        params.set_param('executionpm.time_advance_date', fields.Date.to_string(today))
+        _logger.info("Time advance to %s: %s task deviations updated", today, len(task_ids))
 
     # -------------------------------------------------------------------------
     # ACTION: Refresh Progress Computation
     # -------------------------------------------------------------------------
     def action_refresh_progress(self):
         """
-        Manually trigger progress recomputation.
-        Useful for dashboard refresh buttons.
+        Recompute the progress of the tasks with pending changes, see
+        execution.progress.change. Nothing is recomputed when the progress
+        is up to date. Useful for dashboard refresh buttons.
         """
         self.ensure_one()
-        
-        # Recompute planning first
-        if self.active_planning_id:
-            tasks = self.active_planning_id.lot_ids.mapped('task_ids')
-            tasks._compute_validated_progress()
-            self.active_planning_id._compute_overall_progress()
-        
-        # Recompute project
-        self._compute_project_progress()
-        self._compute_curve_data()
-        
-        # Sync to legacy field
-        self.execution_physical_progress = self.computed_physical_progress
-        
+        if self.active_planning_id and not self.progress_last_updated:
+            # Never computed: every task of the planning is pending
+            self.env['execution.progress.change'].sudo()._log_tasks(self.active_planning_id.lot_ids.task_ids.ids)
+        refreshed = self._refresh_pending_progress(self.active_planning_id)
+        if refreshed:
+            title = _('Progress Updated')
+        else:
+            title = _('Progress Up to Date')
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
-                'title': _('Progress Updated'),
+                'title': title,
                 'message': _('Physical progress: %.2f%%') % self.computed_physical_progress,
                 'type': 'success',
                 'sticky': False,
             }
         }
 
+    @api.model
+    def _cron_refresh_pending_progress(self):
+        """Portfolio-wide refresh of the tasks with pending changes."""
+        self._refresh_pending_progress()
+
+    @api.model
+    def _refresh_pending_progress(self, plannings=None):
+        """
+        Recompute the validated progress of the pending tasks of ``plannings``
+        (default: the whole portfolio) and propagate it to their plannings and
+        projects.
+
+        :return: the refreshed tasks
+        """
+        Change = self.env['execution.progress.change'].sudo()
+        task_ids = Change._get_pending_task_ids(plannings)
+        tasks = self.env['execution.planning.task'].sudo().browse(task_ids).exists()
+        if not tasks:
+            Change._clear_tasks(task_ids)
+            return tasks
+
+        # Mark the declaration-based computes of the tasks and their dependents
+        tasks.modified(['progress_declaration_ids'])
+        tasks._propagate_progress()
+        self.env['execution.project.scurve']._invalidate_plannings(tasks.planning_id, planned=False)
+
+        # Sync to legacy field
+        projects = self.sudo().search([('active_planning_id', 'in', tasks.planning_id.ids)])
+        for project in projects:
+            if project.execution_physical_progress != project.computed_physical_progress:
+                project.execution_physical_progress = project.computed_physical_progress
+        Change._clear_tasks(task_ids)
+        return tasks
+
     def action_view_scurve(self):
         """
         Open S-Curve visualization.
@@ -517,25 +554,39 @@ class ProjectProjectProgress(models.Model):
 
 class ExecutionProgressTrigger(models.Model):
     """
-    Extend execution.progress to trigger recomputation on validation.
+    Extend execution.progress to trigger progress propagation on validation.
     """
     _inherit = 'execution.progress'
 
-    def action_validate(self):
-        """
-        Override to ensure progress fields are recomputed after validation.
-        """
-        result = super().action_validate()
-        
-        # Trigger recomputation on related records
-        # (The @api.depends should handle this, but we force it for reliability)
-        tasks = self.mapped('task_id')
-        if tasks:
-            # Invalidate cache to force recomputation
-            tasks.invalidate_recordset(['validated_progress', 'weighted_contribution'])
-            
-            # Trigger project-level recomputation
-            projects = tasks.mapped('planning_id.project_id')
-            projects.invalidate_recordset(['computed_physical_progress'])
-        
-        return result
+    _SCURVE_FIELDS = {'task_id', 'state', 'declared_percentage', 'validated_date', 'execution_date'}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        validated = records.filtered(lambda r: r.state == 'validated')
+        self.env['execution.project.scurve']._invalidate_plannings(
+            validated.planning_id, planned=False)
+        validated.task_id._mark_progress_dirty()
+        return records
+
+    def write(self, vals):
+        if not self._SCURVE_FIELDS.intersection(vals):
+            return super().write(vals)
+        validated = self.filtered(lambda r: r.state == 'validated')
+        res = super().write(vals)
+        validated |= self.filtered(lambda r: r.state == 'validated')
+        self.env['execution.project.scurve']._invalidate_plannings(
+            validated.planning_id, planned=False)
+        # A validation event: propagate task progress at the end of the transaction
+        if 'state' in vals:
+            validated.task_id._mark_progress_dirty()
+        return res
+
+    def unlink(self):
+        validated = self.filtered(lambda r: r.state == 'validated')
+        plannings = validated.planning_id
+        tasks = validated.task_id
+        res = super().unlink()
+        self.env['execution.project.scurve']._invalidate_plannings(plannings, planned=False)
+        tasks.exists()._mark_progress_dirty()
+        return res
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+Earned Value Management
+
+Stored EVM metrics of the execution projects and of the lots of their active
+planning, so portfolio rankings by SPI or CPI are a sorted index scan.
+
+- Budget at completion (BAC): project budget, split between lots by weight.
+- Planned value (PV): BAC x planned progress at the computation date, from
+  the same linear task curves as the planned S-curve.
+- Earned value (EV): BAC x validated weighted progress.
+- Actual cost (AC): project spent amount, split between lots by earned value.
+  Extended by modules knowing the real cost per lot (posted bills).
+- SPI = EV / PV, CPI = EV / AC, EAC = BAC / CPI. An index without
+  denominator (project not started, nothing spent) is stored as NULL, so it
+  neither ranks as the worst performer nor weighs on the averages.
+
+Metrics are computed in batch, with one aggregate query per batch of
+projects: once per transaction for the projects touched by a validation,
+and nightly for the whole portfolio since the planned value moves with time.
+"""
+import logging
+from collections import defaultdict
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+from odoo.addons.executionpm_core.tools import get_precommit_queue, pop_precommit_queue
+
+_logger = logging.getLogger(__name__)
+
+_EVM_FIELDS = [
+    'evm_budget', 'evm_planned_value', 'evm_earned_value', 'evm_actual_cost',
+    'evm_spi', 'evm_cpi', 'evm_eac', 'evm_date',
+]
+
+# Projects per aggregate query and rows per UPDATE statement
+_EVM_BATCH_SIZE = 1000
+
+
+def _evm_indexes(budget, planned_value, earned_value, actual_cost):
+    """Return (spi, cpi, eac); an index without denominator is None."""
+    spi = round(earned_value / planned_value, 4) if planned_value else None
+    cpi = round(earned_value / actual_cost, 4) if actual_cost else None
+    eac = budget / cpi if cpi else budget
+    return spi, cpi, eac
+
+
+class ExecutionEvmMixin(models.AbstractModel):
+    """
+    Stored EVM metrics, shared by projects and lots.
+    """
+    _name = 'execution.evm.mixin'
+    _description = 'Earned Value Metrics'
+
+    evm_currency_id = fields.Many2one(
+        comodel_name='res.currency',
+        string='EVM Currency',
+        compute='_compute_evm_currency_id',
+    )
+    evm_budget = fields.Monetary(
+        string='Budget at Completion',
+        currency_field='evm_currency_id',
+        readonly=True,
+        copy=False,
+    )
+    evm_planned_value = fields.Monetary(
+        string='Planned Value (PV)',
+        currency_field='evm_currency_id',
+        readonly=True,
+        copy=False,
+    )
+    evm_earned_value = fields.Monetary(
+        string='Earned Value (EV)',
+        currency_field='evm_currency_id',
+        readonly=True,
+        copy=False,
+    )
+    evm_actual_cost = fields.Monetary(
+        string='Actual Cost (AC)',
+        currency_field='evm_currency_id',
+        readonly=True,
+        copy=False,
+    )
+    evm_spi = fields.Float(
+        string='SPI',
+        digits=(6, 4),
+        readonly=True,
+        copy=False,
+        index=True,
+        aggregator='avg',
+        help='Schedule performance index: earned value / planned value. Below 1 is behind schedule. '
+             'Empty without planned value.',
+    )
+    evm_cpi = fields.Float(
+        string='CPI',
+        digits=(6, 4),
+        readonly=True,
+        copy=False,
+        index=True,
+        aggregator='avg',
+        help='Cost performance index: earned value / actual cost. Below 1 is over budget. '
+             'Empty without actual cost.',
+    )
+    evm_eac = fields.Monetary(
+        string='Estimate at Completion (EAC)',
+        currency_field='evm_currency_id',
+        readonly=True,
+        copy=False,
+        help='Budget at completion / CPI.',
+    )
+    evm_date = fields.Date(string='EVM Date', readonly=True, copy=False)
+
+    def _compute_evm_currency_id(self):
+        self.evm_currency_id = self.env.company.currency_id
+
+    @api.model
+    def _write_evm(self, rows):
+        """Write ``(id, budget, pv, ev, ac, spi, cpi, eac, date)`` rows."""
+        for index in range(0, len(rows), _EVM_BATCH_SIZE):
+            self.env.cr.execute(SQL(
+                """
+                UPDATE %(table)s r
+                   SET evm_budget = v.budget,
+                       evm_planned_value = v.planned_value,
+                       evm_earned_value = v.earned_value,
+                       evm_actual_cost = v.actual_cost,
+                       evm_spi = v.spi,
+                       evm_cpi = v.cpi,
+                       evm_eac = v.eac,
+                       evm_date = v.evm_date
+                  FROM (VALUES %(values)s) AS v(id, budget, planned_value, earned_value, actual_cost,
+                                                spi, cpi, eac, evm_date)
+                 WHERE r.id = v.id
+                """,
+                table=SQL.identifier(self._table),
+                values=SQL(", ").join(
+                    SQL("(%s, %s::numeric, %s::numeric, %s::numeric, %s::numeric, "
+                        "%s::numeric, %s::numeric, %s::numeric, %s::date)", *row)
+                    for row in rows[index:index + _EVM_BATCH_SIZE]
+                ),
+            ))
+        self.invalidate_model(_EVM_FIELDS)
+
+
+class ExecutionPlanningLotEvm(models.Model):
+    _name = 'execution.planning.lot'
+    _inherit = ['execution.planning.lot', 'execution.evm.mixin']
+
+    @api.depends('planning_id.project_id.execution_currency_id')
+    def _compute_evm_currency_id(self):
+        for lot in self:
+            lot.evm_currency_id = lot.planning_id.project_id.execution_currency_id or self.env.company.currency_id
+
+
+class ProjectProjectEvm(models.Model):
+    _name = 'project.project'
+    _inherit = ['project.project', 'execution.evm.mixin']
+
+    @api.depends('execution_currency_id')
+    def _compute_evm_currency_id(self):
+        for project in self:
+            project.evm_currency_id = project.execution_currency_id or self.env.company.currency_id
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'execution_budget', 'execution_spent_amount', 'execution_currency_id'}.intersection(vals):
+            self._mark_evm_dirty()
+        return res
+
+    # -------------------------------------------------------------------------
+    # SCHEDULING
+    # -------------------------------------------------------------------------
+    def _mark_evm_dirty(self):
+        """Queue the projects for an EVM update at the end of the transaction."""
+        if not self:
+            return
+        get_precommit_queue(self.env, 'executionpm.evm_dirty_project_ids', self._flush_evm).update(self.ids)
+
+    @api.model
+    def _flush_evm(self):
+        dirty_ids = pop_precommit_queue(self.env, 'executionpm.evm_dirty_project_ids', set())
+        self.sudo().browse(dirty_ids).exists()._compute_evm()
+
+    @api.model
+    def _cron_compute_evm(self):
+        """Nightly pass: the planned value of every running project moves with time."""
+        self.env.cr.execute(SQL(
+            "SELECT id FROM project_project WHERE active_planning_id IS NOT NULL OR evm_date IS NOT NULL"
+        ))
+        project_ids = [row[0] for row in self.env.cr.fetchall()]
+        self.browse(project_ids)._compute_evm()
+        _logger.info("EVM metrics computed for %s projects", len(project_ids))
+
+    # -------------------------------------------------------------------------
+    # COMPUTATION
+    # -------------------------------------------------------------------------
+    def _compute_evm(self, evm_date=None):
+        """
+        Compute and store the EVM metrics of the projects and of the lots of
+        their active planning, as of ``evm_date`` (default: today).
+        """
+        if not self:
+            return
+        evm_date = evm_date or fields.Date.context_today(self)
+        for index in range(0, len(self), _EVM_BATCH_SIZE):
+            self[index:index + _EVM_BATCH_SIZE]._compute_evm_batch(evm_date)
+
+    def _compute_evm_batch(self, evm_date):
+        self.flush_recordset(['execution_budget', 'execution_spent_amount', 'active_planning_id'])
+        self.env['execution.planning.task'].flush_model(
+            ['lot_id', 'planning_id', 'date_start', 'date_end', 'weight', 'validated_progress'])
+
+        # Planned and earned weight of each lot, in % of the project
+        self.env.cr.execute(SQL(
+            """
+            SELECT p.id, t.lot_id,
+                   SUM(COALESCE(t.weight, 0.0)),
+                   SUM(COALESCE(t.weight, 0.0) * CASE
+                       WHEN %(date)s < t.date_start THEN 0.0
+                       WHEN %(date)s >= t.date_end THEN 1.0
+                       ELSE (%(date)s - t.date_start)::float / GREATEST(t.date_end - t.date_start, 1)
+                   END),
+                   SUM(COALESCE(t.weight, 0.0) * COALESCE(t.validated_progress, 0.0) / 100.0)
+              FROM project_project p
+              JOIN execution_planning_task t ON t.planning_id = p.active_planning_id
+             WHERE p.id = ANY(%(project_ids)s)
+               AND t.date_start IS NOT NULL
+               AND t.date_end IS NOT NULL
+             GROUP BY p.id, t.lot_id
+            """,
+            date=evm_date,
+            project_ids=self.ids,
+        ))
+        lot_weights = defaultdict(dict)
+        for project_id, lot_id, weight, planned, earned in self.env.cr.fetchall():
+            lot_weights[project_id][lot_id] = (weight, planned, earned)
+
+        actual_costs = self._get_evm_actual_costs()
+        project_rows = []
+        lot_rows = []
+        for project in self:
+            budget = project.execution_budget or 0.0
+            lots = lot_weights.get(project.id, {})
+            planned_value = budget * sum(planned for __, planned, __ in lots.values()) / 100.0
+            earned_value = budget * sum(earned for __, __, earned in lots.values()) / 100.0
+            actual_cost, lot_costs = actual_costs.get(project.id, (0.0, None))
+            project_rows.append((
+                project.id, budget, planned_value, earned_value, actual_cost,
+                *_evm_indexes(budget, planned_value, earned_value, actual_cost), evm_date,
+            ))
+
+            for lot_id, (weight, planned, earned) in lots.items():
+                lot_budget = budget * weight / 100.0
+                lot_planned = budget * planned / 100.0
+                lot_earned = budget * earned / 100.0
+                if lot_costs is not None:
+                    lot_cost = lot_costs.get(lot_id, 0.0)
+                elif earned_value:
+                    lot_cost = actual_cost * lot_earned / earned_value
+                else:
+                    lot_cost = 0.0
+                lot_rows.append((
+                    lot_id, lot_budget, lot_planned, lot_earned, lot_cost,
+                    *_evm_indexes(lot_budget, lot_planned, lot_earned, lot_cost), evm_date,
+                ))
+
+        self._write_evm(project_rows)
+        self.env['execution.planning.lot']._write_evm(lot_rows)
+
+    def _get_evm_actual_costs(self):
+        """
+        Return {project_id: (actual cost, {lot_id: actual cost} or None)}.
+        Without a cost per lot, the project cost is split by earned value.
+        """
+        return {project.id: (project.execution_spent_amount or 0.0, None) for project in self}
+
+
+class ExecutionPlanningTaskEvm(models.Model):
+    _inherit = 'execution.planning.task'
+
+    def _propagate_progress(self):
+        super()._propagate_progress()
+        # Validation event: the earned value of the projects changed
+        self.env['project.project'].search([
+            ('active_planning_id', 'in', self.planning_id.ids),
+        ])._compute_evm()
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+"""
+S-Curve Engine
+
+Planned and actual S-curve series are computed once per planning and kept in
+a cache table. The cache is only invalidated when planning tasks or validated
+declarations change, so opening a project form does not recompute the curves.
+
+- Planned curve: prefix sums over task start/end events, O(tasks + days).
+- Actual curve: running total of weighted progress, O(declarations).
+- Portfolio curves: budget-weighted merge of the cached project series,
+  without reading any planning task.
+"""
+import json
+from collections import defaultdict
+from datetime import date
+from itertools import accumulate
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class ExecutionProjectScurve(models.Model):
+    """
+    Cached S-curve series of the active planning of a project.
+    """
+    _name = 'execution.project.scurve'
+    _description = 'Project S-Curve Cache'
+    _order = 'project_id'
+
+    project_id = fields.Many2one(
+        comodel_name='project.project',
+        string='Project',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    planning_id = fields.Many2one(
+        comodel_name='execution.planning',
+        string='Planning',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    planned_data = fields.Text(
+        string='Planned Series',
+        help='JSON planned curve. Empty when the cache must be rebuilt.',
+    )
+    actual_data = fields.Text(
+        string='Actual Series',
+        help='JSON actual curve, without the current date point. '
+             'Empty when the cache must be rebuilt.',
+    )
+    computed_date = fields.Datetime(
+        string='Computed On',
+        readonly=True,
+    )
+
+    _sql_constraints = [
+        ('project_unique', 'UNIQUE(project_id)',
+         'A project can only have one cached S-curve.'),
+    ]
+
+    # -------------------------------------------------------------------------
+    # CACHE ACCESS
+    # -------------------------------------------------------------------------
+    @api.model
+    def _get_project_curves(self, projects):
+        """
+        Return {project_id: (planned_curve, actual_curve)} for the given projects.
+        Missing or invalidated series are rebuilt in batch before returning.
+        """
+        projects = projects.filtered('active_planning_id')
+        if not projects:
+            return {}
+
+        cache = {entry.project_id.id: entry for entry in self.sudo().search([
+            ('project_id', 'in', projects.ids),
+        ])}
+        stale = projects.filtered(lambda p: (
+            p.id not in cache
+            or cache[p.id].planning_id != p.active_planning_id
+            or not cache[p.id].planned_data
+            or not cache[p.id].actual_data
+        ))
+        if stale:
+            self._rebuild_curves(stale, cache)
+
+        today = date.today()
+        curves = {}
+        for project in projects:
+            entry = cache[project.id]
+            actual = json.loads(entry.actual_data)
+            # The "today" point is added on read so the cache stays valid across days
+            if len(actual) > 1 and today > date.fromisoformat(actual[-1]['date']):
+                actual.append({
+                    'date': today.isoformat(),
+                    'progress': actual[-1]['progress'],
+                })
+            curves[project.id] = (json.loads(entry.planned_data), actual)
+        return curves
+
+    @api.model
+    def _rebuild_curves(self, projects, cache):
+        """
+        Recompute the series of ``projects`` and store them in ``cache``.
+
+        The cache rows are upserted in one statement, so concurrent reads
+        rebuilding the same project do not fail on the project unique
+        constraint.
+        """
+        plannings = projects.active_planning_id
+        tasks_by_planning = self._fetch_planning_tasks(plannings.ids)
+        declarations_by_planning = self._fetch_validated_declarations(plannings.ids)
+
+        now = fields.Datetime.now()
+        values = []
+        for project in projects:
+            planning_id = project.active_planning_id.id
+            tasks = tasks_by_planning.get(planning_id, [])
+            planned = self._build_planned_curve(tasks)
+            if planned:
+                weights = {task_id: weight for task_id, __, __, weight in tasks}
+                project_start = min(date_start for __, date_start, __, __ in tasks)
+                actual = self._build_actual_curve(
+                    weights, project_start, declarations_by_planning.get(planning_id, []),
+                )
+            else:
+                actual = []
+            values.append(SQL(
+                "(%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                project.id, planning_id, json.dumps(planned), json.dumps(actual), now,
+                self.env.uid, now, self.env.uid, now,
+            ))
+
+        self.flush_model()
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO execution_project_scurve
+                   (project_id, planning_id, planned_data, actual_data, computed_date,
+                    create_uid, create_date, write_uid, write_date)
+            VALUES %s
+            ON CONFLICT (project_id) DO UPDATE
+               SET planning_id = EXCLUDED.planning_id,
+                   planned_data = EXCLUDED.planned_data,
+                   actual_data = EXCLUDED.actual_data,
+                   computed_date = EXCLUDED.computed_date,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+            RETURNING project_id, id
+            """,
+            SQL(", ").join(values),
+        ))
+        rows = self.env.cr.fetchall()
+        self.invalidate_model()
+        for project_id, entry_id in rows:
+            cache[project_id] = self.sudo().browse(entry_id)
+
+    @api.model
+    def _invalidate_plannings(self, plannings, planned=True):
+        """
+        Drop the cached series of the given plannings.
+        Declarations only affect the actual curve, tasks affect both.
+        """
+        if not plannings:
+            return
+        vals = {'actual_data': False}
+        if planned:
+            vals['planned_data'] = False
+        self.sudo().search([('planning_id', 'in', plannings.ids)]).write(vals)
+
+    # -------------------------------------------------------------------------
+    # PORTFOLIO AGGREGATION
+    # -------------------------------------------------------------------------
+    _PORTFOLIO_GROUPBY = (
+        'execution_sector_id',
+        'execution_project_type_id',
+        'execution_funding_source_id',
+    )
+
+    @api.model
+    def _get_portfolio_curves(self, projects, groupby=False):
+        """
+        Merge the cached series of ``projects`` weighted by their execution budget.
+
+        :param groupby: False for a single portfolio curve, or one of
+            ``_PORTFOLIO_GROUPBY``. Projects of a child sector also count in
+            every parent sector.
+        :return: {group_id: (planned_curve, actual_curve)}, the group id is
+            False when ``groupby`` is not set.
+        """
+        if groupby and groupby not in self._PORTFOLIO_GROUPBY:
+            raise ValueError("Unsupported portfolio grouping: %s" % groupby)
+
+        curves = self._get_project_curves(projects)
+        groups = defaultdict(list)
+        for project in projects:
+            if project.id not in curves:
+                continue
+            if not groupby:
+                keys = [False]
+            elif groupby == 'execution_sector_id':
+                parent_path = project.execution_sector_id.parent_path or ''
+                keys = [int(sector_id) for sector_id in parent_path.split('/') if sector_id]
+            else:
+                keys = project[groupby].ids
+            for key in keys:
+                groups[key].append((project.execution_budget, curves[project.id]))
+
+        return {
+            key: (
+                self._merge_curves([(weight, planned) for weight, (planned, __) in members]),
+                self._merge_curves([(weight, actual) for weight, (__, actual) in members]),
+            )
+            for key, members in groups.items()
+        }
+
+    @api.model
+    def _merge_curves(self, weighted_curves):
+        """
+        Weighted average of piecewise-linear curves given as (weight, points).
+
+        Each segment between two points adds a constant slope over its days,
+        so the merge uses the same prefix sums as the planned curve engine.
+        A curve is 0 before its first point and keeps its last value after.
+        Curves are weighted equally when no budget is set.
+        """
+        weighted_curves = [(weight, points) for weight, points in weighted_curves if points]
+        if not weighted_curves:
+            return []
+        total_weight = sum(weight for weight, __ in weighted_curves)
+        if total_weight <= 0:
+            weighted_curves = [(1.0, points) for __, points in weighted_curves]
+            total_weight = len(weighted_curves)
+
+        dated_curves = [
+            (weight / total_weight, [(date.fromisoformat(point['date']), point['progress'])
+                                     for point in points])
+            for weight, points in weighted_curves
+        ]
+        portfolio_start = min(points[0][0] for __, points in dated_curves)
+        portfolio_end = max(points[-1][0] for __, points in dated_curves)
+        total_days = (portfolio_end - portfolio_start).days + 1
+
+        slope_delta = [0.0] * (total_days + 1)
+        step_delta = [0.0] * (total_days + 1)
+        for weight, points in dated_curves:
+            previous_offset, previous_value = None, 0.0
+            for point_date, progress in points:
+                offset = (point_date - portfolio_start).days
+                value = progress * weight
+                if previous_offset is None or offset <= previous_offset:
+                    step_delta[offset] += value - previous_value
+                else:
+                    rate = (value - previous_value) / (offset - previous_offset)
+                    slope_delta[previous_offset] += rate
+                    slope_delta[offset] -= rate
+                previous_offset, previous_value = offset, value
+
+        slopes = accumulate(slope_delta)
+        ramps = [0.0, *accumulate(slopes)]
+        steps = list(accumulate(step_delta))
+
+        interval_days = max(1, total_days // 52)
+        offsets = list(range(0, total_days, interval_days))
+        if offsets[-1] != total_days - 1:
+            offsets.append(total_days - 1)
+        return [{
+            'date': fields.Date.add(portfolio_start, days=offset).isoformat(),
+            'progress': round(ramps[offset] + steps[offset], 2),
+        } for offset in offsets]
+
+    # -------------------------------------------------------------------------
+    # DATA FETCHING
+    # -------------------------------------------------------------------------
+    @api.model
+    def _fetch_planning_tasks(self, planning_ids):
+        """Return {planning_id: [(task_id, date_start, date_end, weight)]}."""
+        self.env['execution.planning.task'].flush_model(
+            ['planning_id', 'date_start', 'date_end', 'weight'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT planning_id, id, date_start, date_end, weight
+              FROM execution_planning_task
+             WHERE planning_id = ANY(%(planning_ids)s)
+               AND date_start IS NOT NULL
+               AND date_end IS NOT NULL
+            """,
+            planning_ids=planning_ids,
+        ))
+        result = defaultdict(list)
+        for planning_id, task_id, date_start, date_end, weight in self.env.cr.fetchall():
+            result[planning_id].append((task_id, date_start, date_end, float(weight or 0.0)))
+        return result
+
+    @api.model
+    def _fetch_validated_declarations(self, planning_ids):
+        """Return {planning_id: [(task_id, percentage, date)]} in validation order."""
+        self.env['execution.progress'].flush_model(
+            ['task_id', 'planning_id', 'state', 'declared_percentage',
+             'validated_date', 'execution_date'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT planning_id, task_id, declared_percentage,
+                   COALESCE(validated_date, execution_date)
+              FROM execution_progress
+             WHERE planning_id = ANY(%(planning_ids)s)
+               AND state = 'validated'
+             ORDER BY validated_date, id
+            """,
+            planning_ids=planning_ids,
+        ))
+        result = defaultdict(list)
+        for planning_id, task_id, percentage, validation_date in self.env.cr.fetchall():
+            result[planning_id].append((task_id, float(percentage or 0.0), validation_date))
+        return result
+
+    # -------------------------------------------------------------------------
+    # CURVE ENGINE
+    # -------------------------------------------------------------------------
+    @api.model
+    def _build_planned_curve(self, tasks):
+        """
+        Planned S-curve from (task_id, date_start, date_end, weight) tuples.
+
+        Each task adds weight/duration per day between its start and end date,
+        so the curve is the double prefix sum of the per-day slope changes.
+        Tasks without duration are added as a step on their start date.
+        """
+        if not tasks:
+            return []
+
+        project_start = min(task[1] for task in tasks)
+        project_end = max(task[2] for task in tasks)
+        total_days = (project_end - project_start).days + 1
+
+        slope_delta = [0.0] * (total_days + 1)
+        step_delta = [0.0] * (total_days + 1)
+        for __, date_start, date_end, weight in tasks:
+            offset = (date_start - project_start).days
+            duration = (date_end - date_start).days
+            if duration > 0:
+                slope_delta[offset] += weight / duration
+                slope_delta[offset + duration] -= weight / duration
+            elif offset <= total_days:
+                step_delta[offset] += weight
+
+        # progress[d] = sum of the slopes of the days before d + steps up to d
+        slopes = accumulate(slope_delta)
+        ramps = [0.0, *accumulate(slopes)]
+        steps = list(accumulate(step_delta))
+
+        # Sample at weekly intervals for performance (max 52 data points)
+        interval_days = max(1, total_days // 52)
+        curve_data = [{
+            'date': fields.Date.add(project_start, days=offset).isoformat(),
+            'progress': round(ramps[offset] + steps[offset], 2),
+        } for offset in range(0, total_days, interval_days)]
+
+        # Ensure we include the end date
+        if curve_data[-1]['date'] != project_end.isoformat():
+            curve_data.append({
+                'date': project_end.isoformat(),
+                'progress': 100.0,
+            })
+        return curve_data
+
+    @api.model
+    def _build_actual_curve(self, weights, project_start, declarations):
+        """
+        Actual S-curve from validated declarations, in validation order.
+        The weighted total is maintained incrementally instead of re-summed.
+        """
+        if not declarations:
+            return []
+
+        curve_data = [{
+            'date': project_start.isoformat(),
+            'progress': 0.0,
+        }]
+        task_progress = defaultdict(float)
+        cumulative = 0.0
+        last_date = None
+        for task_id, percentage, validation_date in declarations:
+            if not validation_date:
+                continue
+
+            cumulative += (percentage - task_progress[task_id]) / 100.0 * weights.get(task_id, 0.0)
+            task_progress[task_id] = percentage
+
+            # Only add point if date changed (avoid duplicate dates)
+            if validation_date != last_date:
+                curve_data.append({
+                    'date': validation_date.isoformat(),
+                    'progress': round(cumulative, 2),
+                })
+                last_date = validation_date
+            else:
+                curve_data[-1]['progress'] = round(cumulative, 2)
+        return curve_data
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from datetime import date
+
 from odoo.tests.common import TransactionCase
 from odoo.exceptions import ValidationError, UserError
 
@@ -101,3 +103,281 @@ class TestExecutionDeclaration(TransactionCase):
         # Try to change comment
         with self.assertRaises(UserError):
             decl.write({'comment': 'Sneaky edit'})
+
+    def test_04_previous_percentage_batch(self):
+        """Previous percentage is the latest other validated declaration of the task"""
+        Progress = self.env['execution.progress']
+        first, second = Progress.create([{
+            'task_id': self.task.id,
+            'declared_percentage': percentage,
+            'comment': 'Batch %s' % percentage,
+        } for percentage in (20.0, 40.0)])
+        first.write({'state': 'under_review'})
+        first.action_validate()
+        second.write({'state': 'under_review'})
+        second.action_validate()
+
+        drafts = Progress.create([{
+            'task_id': self.task.id,
+            'declared_percentage': 60.0,
+            'comment': 'Draft %s' % index,
+        } for index in range(3)])
+        self.assertEqual(drafts.mapped('previous_percentage'), [40.0, 40.0, 40.0])
+        self.assertEqual(drafts.mapped('incremental_percentage'), [20.0, 20.0, 20.0])
+
+        # The latest validated declaration is not its own predecessor
+        (second | drafts)._compute_previous_percentage()
+        self.assertEqual(second.previous_percentage, 20.0)
+        self.assertEqual(drafts.mapped('previous_percentage'), [40.0, 40.0, 40.0])
+
+
+class TestScurveEngine(TransactionCase):
+
+    def test_01_planned_curve(self):
+        """Planned curve interpolates each task linearly between its dates"""
+        Scurve = self.env['execution.project.scurve']
+        tasks = [
+            (1, date(2025, 1, 1), date(2025, 1, 11), 50.0),
+            (2, date(2025, 1, 6), date(2025, 1, 16), 30.0),
+            (3, date(2025, 1, 16), date(2025, 1, 16), 20.0),
+        ]
+        curve = {point['date']: point['progress'] for point in Scurve._build_planned_curve(tasks)}
+        self.assertEqual(curve['2025-01-01'], 0.0)
+        self.assertEqual(curve['2025-01-06'], 25.0)
+        self.assertEqual(curve['2025-01-11'], 65.0)
+        self.assertEqual(curve['2025-01-16'], 100.0)
+
+    def test_02_actual_curve(self):
+        """Actual curve keeps a running weighted total per validation date"""
+        Scurve = self.env['execution.project.scurve']
+        curve = Scurve._build_actual_curve({1: 50.0, 2: 50.0}, date(2025, 1, 1), [
+            (1, 40.0, date(2025, 1, 10)),
+            (2, 20.0, date(2025, 1, 10)),
+            (1, 100.0, date(2025, 1, 20)),
+        ])
+        self.assertEqual(curve, [
+            {'date': '2025-01-01', 'progress': 0.0},
+            {'date': '2025-01-10', 'progress': 30.0},
+            {'date': '2025-01-20', 'progress': 60.0},
+        ])
+
+    def test_03_portfolio_merge(self):
+        """Portfolio curve is the budget-weighted average of project curves"""
+        Scurve = self.env['execution.project.scurve']
+        curve = Scurve._merge_curves([
+            (3000.0, [{'date': '2025-01-01', 'progress': 0.0},
+                      {'date': '2025-01-11', 'progress': 100.0}]),
+            (1000.0, [{'date': '2025-01-06', 'progress': 0.0},
+                      {'date': '2025-01-16', 'progress': 100.0}]),
+        ])
+        curve = {point['date']: point['progress'] for point in curve}
+        self.assertEqual(curve['2025-01-06'], 37.5)
+        self.assertEqual(curve['2025-01-11'], 87.5)
+        self.assertEqual(curve['2025-01-16'], 100.0)
+
+    def test_04_cache_upsert(self):
+        """Rebuilding a project already in the cache updates its row"""
+        Scurve = self.env['execution.project.scurve']
+        project = self.env['project.project'].create({
+            'name': 'S-Curve Project',
+            'is_execution_project': True,
+        })
+        planning = self.env['execution.planning'].create({
+            'name': 'S-Curve Planning',
+            'project_id': project.id,
+        })
+        lot = self.env['execution.planning.lot'].create({
+            'name': 'Lot A',
+            'planning_id': planning.id,
+            'start_date': date(2025, 1, 1),
+            'end_date': date(2025, 1, 11),
+        })
+        self.env['execution.planning.task'].create({
+            'name': 'Task A',
+            'lot_id': lot.id,
+            'date_start': date(2025, 1, 1),
+            'date_end': date(2025, 1, 11),
+            'weight': 100.0,
+        })
+        planning.action_submit()
+        planning.action_approve()
+
+        planned, __ = Scurve._get_project_curves(project)[project.id]
+        self.assertEqual(planned[-1], {'date': '2025-01-11', 'progress': 100.0})
+        entry = Scurve.sudo().search([('project_id', '=', project.id)])
+        self.assertEqual(len(entry), 1)
+
+        # A concurrent reader that did not see the row yet rebuilds it too
+        cache = {}
+        Scurve._rebuild_curves(project, cache)
+        self.assertEqual(cache[project.id], entry)
+        self.assertEqual(Scurve.sudo().search_count([('project_id', '=', project.id)]), 1)
+
+
+class TestEarnedValue(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestEarnedValue, cls).setUpClass()
+        cls.project = cls.env['project.project'].create({
+            'name': 'EVM Project',
+            'is_execution_project': True,
+            'execution_budget': 1000.0,
+            'execution_spent_amount': 100.0,
+        })
+        cls.planning = cls.env['execution.planning'].create({
+            'name': 'EVM Planning',
+            'project_id': cls.project.id,
+        })
+        cls.lot = cls.env['execution.planning.lot'].create({
+            'name': 'Lot A',
+            'planning_id': cls.planning.id,
+            'start_date': date(2025, 1, 1),
+            'end_date': date(2025, 1, 21),
+        })
+        cls.tasks = cls.env['execution.planning.task'].create([{
+            'name': 'Task %s' % index,
+            'lot_id': cls.lot.id,
+            'date_start': date_start,
+            'date_end': date_end,
+            'weight': 50.0,
+        } for index, (date_start, date_end) in enumerate([
+            (date(2025, 1, 1), date(2025, 1, 11)),
+            (date(2025, 1, 11), date(2025, 1, 21)),
+        ])])
+        cls.planning.action_submit()
+        cls.planning.action_approve()
+
+    def test_01_project_and_lot_metrics(self):
+        """PV follows the planned curve, EV the validated progress, AC the spent amount"""
+        declaration = self.env['execution.progress'].create({
+            'task_id': self.tasks[0].id,
+            'declared_percentage': 40.0,
+            'comment': 'EVM',
+        })
+        declaration.write({'state': 'under_review'})
+        declaration.action_validate()
+        self.env.flush_all()
+
+        self.project._compute_evm(date(2025, 1, 6))
+        self.assertAlmostEqual(self.project.evm_budget, 1000.0)
+        self.assertAlmostEqual(self.project.evm_planned_value, 250.0)
+        self.assertAlmostEqual(self.project.evm_earned_value, 200.0)
+        self.assertAlmostEqual(self.project.evm_actual_cost, 100.0)
+        self.assertAlmostEqual(self.project.evm_spi, 0.8)
+        self.assertAlmostEqual(self.project.evm_cpi, 2.0)
+        self.assertAlmostEqual(self.project.evm_eac, 500.0)
+
+        # A single lot carries the whole project
+        self.assertAlmostEqual(self.lot.evm_planned_value, 250.0)
+        self.assertAlmostEqual(self.lot.evm_actual_cost, 100.0)
+        self.assertEqual(self.lot.evm_date, date(2025, 1, 6))
+
+        # Rankings read the stored indexes
+        self.assertIn(self.project, self.env['project.project'].search(
+            [('evm_spi', '<', 1.0)], order='evm_spi'))
+
+        # Before the start there is no planned value: SPI is empty, not 0
+        self.project._compute_evm(date(2024, 12, 1))
+        self.env.flush_all()
+        self.env.cr.execute("SELECT evm_spi, evm_cpi FROM project_project WHERE id = %s", [self.project.id])
+        self.assertEqual(self.env.cr.fetchone(), (None, 2.0))
+        self.assertNotIn(self.project, self.env['project.project'].search(
+            [('evm_spi', '!=', False)], order='evm_spi'))
+
+
+class TestTimeAdvance(TransactionCase):
+
+    def test_01_time_advance(self):
+        """The daily time advance updates the date-dependent stored fields"""
+        project = self.env['project.project'].create({
+            'name': 'Time Advance Project',
+            'is_execution_project': True,
+            'execution_actual_start': date(2025, 1, 1),
+            'execution_planned_start': date(2025, 1, 1),
+            'execution_planned_end': date(2025, 1, 10),
+        })
+        planning = self.env['execution.planning'].create({
+            'name': 'Time Advance Planning',
+            'project_id': project.id,
+        })
+        lot = self.env['execution.planning.lot'].create({
+            'name': 'Lot A',
+            'planning_id': planning.id,
+            'start_date': date(2025, 1, 1),
+            'end_date': date(2025, 1, 11),
+        })
+        task = self.env['execution.planning.task'].create({
+            'name': 'Task A',
+            'lot_id': lot.id,
+            'date_start': date(2025, 1, 1),
+            'date_end': date(2025, 1, 11),
+            'weight': 100.0,
+        })
+        self.env.flush_all()
+        self.env['ir.config_parameter'].sudo().set_param('executionpm.time_advance_date', False)
+
+        Project = self.env['project.project']
+        Project._time_advance(date(2025, 1, 6))
+        self.assertEqual(project.execution_duration_actual, 5)
+        self.assertEqual(project.execution_delay_days, 0)
+        self.assertAlmostEqual(task.progress_deviation, -50.0)
+
+        # Only the period since the previous run is scanned
+        Project._time_advance(date(2025, 1, 20))
+        self.assertEqual(project.execution_duration_actual, 19)
+        self.assertEqual(project.execution_delay_days, 10)
+        self.assertAlmostEqual(task.progress_deviation, -100.0)
+        self.assertFalse(self.env['execution.planning.task']._time_advance_progress_deviation(
+            date(2025, 1, 20), date(2025, 1, 20)))
+
+
+class TestProgressRefresh(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestProgressRefresh, cls).setUpClass()
+        cls.project = cls.env['project.project'].create({
+            'name': 'Refresh Project',
+            'is_execution_project': True,
+        })
+        cls.planning = cls.env['execution.planning'].create({
+            'name': 'Refresh Planning',
+            'project_id': cls.project.id,
+        })
+        cls.lot = cls.env['execution.planning.lot'].create({
+            'name': 'Lot A',
+            'planning_id': cls.planning.id,
+            'start_date': date(2025, 1, 1),
+            'end_date': date(2025, 1, 11),
+        })
+        cls.task = cls.env['execution.planning.task'].create({
+            'name': 'Task A',
+            'lot_id': cls.lot.id,
+            'date_start': date(2025, 1, 1),
+            'date_end': date(2025, 1, 11),
+            'weight': 100.0,
+        })
+        cls.planning.action_submit()
+        cls.planning.action_approve()
+
+    def test_01_refresh_pending_only(self):
+        """Refresh recomputes the logged tasks, and nothing when none is pending"""
+        Change = self.env['execution.progress.change']
+        declaration = self.env['execution.progress'].create({
+            'task_id': self.task.id,
+            'declared_percentage': 40.0,
+            'comment': 'Deferred',
+        })
+        declaration.write({'state': 'under_review'})
+        declaration.with_context(defer_progress_propagation=True).action_validate()
+        self.assertEqual(Change._get_pending_task_ids(self.planning), [self.task.id])
+
+        action = self.project.action_refresh_progress()
+        self.assertEqual(action['params']['title'], 'Progress Updated')
+        self.assertAlmostEqual(self.project.computed_physical_progress, 40.0)
+        self.assertAlmostEqual(self.project.execution_physical_progress, 40.0)
+        self.assertFalse(Change._get_pending_task_ids(self.planning))
+
+        action = self.project.action_refresh_progress()
+        self.assertEqual(action['params']['title'], 'Progress Up to Date')
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo import api, fields, models
+
+
+class ExecutionPortfolioScurveWizard(models.TransientModel):
+    """
+    Planned vs actual S-curve of a group of execution projects.
+    Curves are merged from the cached project series, weighted by budget.
+    """
+    _name = 'execution.portfolio.scurve.wizard'
+    _description = 'Portfolio S-Curve'
+
+    scope = fields.Selection([
+        ('national', 'All Projects'),
+        ('sector', 'Sector'),
+        ('project_type', 'Project Type'),
+        ('funding_source', 'Funding Source'),
+    ], string='Scope', required=True, default='national')
+    sector_id = fields.Many2one(
+        comodel_name='execution.sector',
+        string='Sector',
+        help='Projects of the child sectors are included.',
+    )
+    project_type_id = fields.Many2one(
+        comodel_name='execution.project.type',
+        string='Project Type',
+    )
+    funding_source_id = fields.Many2one(
+        comodel_name='execution.funding.source',
+        string='Funding Source',
+    )
+
+    project_count = fields.Integer(
+        string='Projects',
+        compute='_compute_curve_data',
+    )
+    planned_curve_data = fields.Text(
+        string='Planned S-Curve Data',
+        compute='_compute_curve_data',
+    )
+    actual_curve_data = fields.Text(
+        string='Actual S-Curve Data',
+        compute='_compute_curve_data',
+    )
+
+    def _get_project_domain(self):
+        self.ensure_one()
+        domain = [('is_execution_project', '=', True), ('active_planning_id', '!=', False)]
+        if self.scope == 'sector' and self.sector_id:
+            domain.append(('execution_sector_id', 'child_of', self.sector_id.id))
+        elif self.scope == 'project_type' and self.project_type_id:
+            domain.append(('execution_project_type_id', '=', self.project_type_id.id))
+        elif self.scope == 'funding_source' and self.funding_source_id:
+            domain.append(('execution_funding_source_id', '=', self.funding_source_id.id))
+        return domain
+
+    @api.depends('scope', 'sector_id', 'project_type_id', 'funding_source_id')
+    def _compute_curve_data(self):
+        Scurve = self.env['execution.project.scurve']
+        for wizard in self:
+            projects = self.env['project.project'].search(wizard._get_project_domain())
+            planned_curve, actual_curve = Scurve._get_portfolio_curves(projects).get(False, ([], []))
+            wizard.project_count = len(projects)
+            wizard.planned_curve_data = json.dumps(planned_curve)
+            wizard.actual_curve_data = json.dumps(actual_curve)
@@ -54,4 +54,12 @@ class AccountMove(models.Model):
                         "Please ensure the progress declaration is validated before posting this financial record."
                     ) % (move.execution_progress_id.name, move.execution_progress_id.state))
         
-        return super(AccountMove, self).action_post()
+        res = super(AccountMove, self).action_post()
+        self.execution_project_id._mark_evm_dirty()
+        return res
+
+    def button_draft(self):
+        res = super(AccountMove, self).button_draft()
+        # Reset bills no longer count in the actual cost of their project
+        self.execution_project_id._mark_evm_dirty()
+        return res
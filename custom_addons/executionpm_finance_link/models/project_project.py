@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+
+from odoo import models
+from odoo.tools import SQL
+
+
+class ProjectProject(models.Model):
+    _inherit = 'project.project'
+
+    def _get_evm_actual_costs(self):
+        """
+        Actual cost from the posted vendor bills linked to progress declarations,
+        per lot of the declared task. Projects without linked bills keep the
+        spent amount.
+        """
+        costs = super()._get_evm_actual_costs()
+        self.env['account.move'].flush_model(
+            ['execution_project_id', 'execution_progress_id', 'state', 'move_type', 'amount_total_signed'])
+        self.env['execution.progress'].flush_model(['task_id'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT m.execution_project_id, t.lot_id, -SUM(m.amount_total_signed)
+              FROM account_move m
+              JOIN execution_progress d ON d.id = m.execution_progress_id
+              JOIN execution_planning_task t ON t.id = d.task_id
+             WHERE m.execution_project_id = ANY(%(project_ids)s)
+               AND m.state = 'posted'
+               AND m.move_type IN ('in_invoice', 'in_refund')
+             GROUP BY m.execution_project_id, t.lot_id
+            """,
+            project_ids=self.ids,
+        ))
+        lot_costs = defaultdict(dict)
+        for project_id, lot_id, amount in self.env.cr.fetchall():
+            lot_costs[project_id][lot_id] = amount or 0.0
+        for project_id, amounts in lot_costs.items():
+            costs[project_id] = (sum(amounts.values()), amounts)
+        return costs
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'Execution PM Planning',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.1.0',
     'category': 'Project',
     'summary': 'Detailed execution planning for infrastructure projects',
     'description': """
@@ -29,9 +29,12 @@ Key Features:
         'views/execution_planning_views.xml',
         'views/execution_planning_lot_views.xml',
         'views/execution_planning_task_views.xml',
+        'views/execution_planning_baseline_views.xml',
         'views/project_project_views.xml',
         'views/project_task_views.xml',
         'views/menu_views.xml',
+        'wizards/planning_import_wizard_views.xml',
+        'wizards/planning_diff_wizard_views.xml',
     ],
     'installable': True,
     'application': False,
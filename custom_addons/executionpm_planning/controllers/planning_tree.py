@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo import fields
+from odoo.http import Controller, request, route
+from odoo.tools import date_utils
+
+
+class PlanningTreeController(Controller):
+    """
+    Lazy JSON feed of a planning for the Gantt: lots first, then one page of
+    tasks per expanded node. Responses carry an ETag computed from the last
+    changes of the planning, so unchanged nodes are answered with 304 Not
+    Modified without being built.
+    """
+
+    @route('/executionpm/planning/<int:planning_id>/tree', type='http', auth='user', methods=['GET'])
+    def planning_tree(self, planning_id, date_from=None, date_to=None, **kwargs):
+        planning = self._get_planning(planning_id)
+        return self._json_response(
+            planning, '_get_tree_lots',
+            date_from=self._parse_date(date_from),
+            date_to=self._parse_date(date_to),
+        )
+
+    @route('/executionpm/planning/<int:planning_id>/lot/<int:lot_id>/tasks', type='http', auth='user', methods=['GET'])
+    def planning_tree_tasks(self, planning_id, lot_id, parent_id=None, offset=0, limit=None,
+                            date_from=None, date_to=None, **kwargs):
+        planning = self._get_planning(planning_id)
+        return self._json_response(
+            planning, '_get_tree_tasks',
+            lot_id=lot_id,
+            parent_task_id=int(parent_id) if parent_id else None,
+            offset=int(offset or 0),
+            limit=int(limit) if limit else None,
+            date_from=self._parse_date(date_from),
+            date_to=self._parse_date(date_to),
+        )
+
+    def _get_planning(self, planning_id):
+        planning = request.env['execution.planning'].browse(planning_id).exists()
+        if not planning:
+            raise request.not_found()
+        planning.check_access('read')
+        return planning
+
+    def _parse_date(self, value):
+        return fields.Date.to_date(value) if value else None
+
+    def _json_response(self, planning, method, **kwargs):
+        """
+        Answer with ``planning.<method>(**kwargs)`` as JSON. The ETag is
+        checked before the data is built.
+        """
+        digest = planning._get_tree_etag(method, sorted(kwargs.items()))
+        headers = [('ETag', '"%s"' % digest), ('Cache-Control', 'private, no-cache')]
+        if request.httprequest.if_none_match.contains(digest):
+            return request.make_response('', headers=headers, status=304)
+        data = getattr(planning, method)(**kwargs)
+        body = json.dumps(data, default=date_utils.json_default, separators=(',', ':'))
+        return request.make_response(body, headers=headers + [('Content-Type', 'application/json')])
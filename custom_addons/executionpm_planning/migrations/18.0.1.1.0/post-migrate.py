@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+from odoo.tools import SQL
+
+
+def migrate(cr, version):
+    # Replaced by the partial unique index on approved active plannings
+    cr.execute(SQL(
+        "ALTER TABLE execution_planning DROP CONSTRAINT IF EXISTS execution_planning_project_unique_active_planning"
+    ))
+    cr.execute(SQL(
+        "DELETE FROM ir_model_constraint WHERE name = 'execution_planning_project_unique_active_planning'"
+    ))
+    cr.execute(SQL(
+        """
+        DELETE FROM ir_model_data
+         WHERE module = 'executionpm_planning'
+           AND model = 'ir.model.constraint'
+           AND name = 'constraint_execution_planning_project_unique_active_planning'
+        """
+    ))
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['project.project']._recompute_active_planning_all()
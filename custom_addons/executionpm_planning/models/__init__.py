@@ -2,5 +2,11 @@
 from . import execution_planning
 from . import execution_planning_lot
 from . import execution_planning_task
+from . import execution_planning_dependency
+from . import execution_planning_cpm
+from . import execution_planning_tree
+from . import execution_planning_baseline
 from . import project_project
 from . import project_task
+from . import execution_planning_import
+from . import execution_planning_diff
@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
+
+from odoo.addons.executionpm_core.tools import get_precommit_queue, pop_precommit_queue
 
 class ExecutionPlanning(models.Model):
     """
@@ -81,23 +86,79 @@ class ExecutionPlanning(models.Model):
     approved_date = fields.Date(string='Approval Date', readonly=True, copy=False)
     rejection_reason = fields.Text(string='Rejection Reason', copy=False)
 
-    # Constraints
-    _sql_constraints = [
-        ('project_unique_active_planning', 
-         'UNIQUE(project_id, active)', 
-         'Only one active planning document is allowed per project! Archive old versions first.')
-    ]
-    
     active = fields.Boolean(default=True)
 
+    def init(self):
+        # One approved active planning per project: the active planning of
+        # the project. Revisions and archived versions are not restricted.
+        self.env.cr.execute(SQL(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS execution_planning_project_approved_unique
+                ON execution_planning (project_id) WHERE state = 'approved' AND active
+            """
+        ))
+
     @api.constrains('lot_ids', 'lot_ids.task_ids', 'lot_ids.task_ids.weight')
     def _check_total_weight(self):
+        if self.env.context.get('defer_planning_checks'):
+            self._defer_planning_checks('planning', self.ids)
+            return
         for record in self:
             if record.total_physical_weight > 100.001:  # Allow minimal float margin
-                raise ValidationError(_(
-                    "Total Physical Weight cannot surpass 100%%. Current total: %.2f%%.\n"
-                    "Please adjust the weights of your tasks to stay within the 100%% limit."
-                ) % record.total_physical_weight)
+                self._raise_total_weight_error(record.total_physical_weight)
+
+    def _raise_total_weight_error(self, total_weight):
+        raise ValidationError(_(
+            "Total Physical Weight cannot surpass 100%%. Current total: %.2f%%.\n"
+            "Please adjust the weights of your tasks to stay within the 100%% limit."
+        ) % total_weight)
+
+    def _check_total_weight_sql(self):
+        """Aggregate version of _check_total_weight: one query for all plannings."""
+        if not self:
+            return
+        self.env.cr.execute(SQL(
+            """
+            SELECT SUM(t.weight)
+              FROM execution_planning_lot l
+              JOIN execution_planning_task t ON t.lot_id = l.id
+             WHERE l.planning_id = ANY(%(planning_ids)s)
+             GROUP BY l.planning_id
+            HAVING SUM(t.weight) > 100.001
+             LIMIT 1
+            """,
+            planning_ids=self.ids,
+        ))
+        row = self.env.cr.fetchone()
+        if row:
+            self._raise_total_weight_error(float(row[0]))
+
+    # -------------------------------------------------------------------------
+    # DEFERRED CONSTRAINTS
+    # -------------------------------------------------------------------------
+    # With the context key ``defer_planning_checks``, the weight and date
+    # constraints of plannings, lots and tasks only collect the touched
+    # records. The checks then run once, with aggregate queries, when
+    # _flush_planning_checks is called or at the latest before the commit.
+
+    @api.model
+    def _defer_planning_checks(self, check, ids):
+        """Queue ``ids`` for the ``check`` ('planning', 'lot' or 'task') of the deferred validation."""
+        get_precommit_queue(
+            self.env, 'executionpm.planning_checks', self._flush_planning_checks,
+            factory=lambda: defaultdict(set),
+        )[check].update(ids)
+
+    @api.model
+    def _flush_planning_checks(self):
+        """Run the deferred planning constraints on the records touched so far."""
+        pending = pop_precommit_queue(self.env, 'executionpm.planning_checks')
+        if not pending:
+            return
+        self.env.flush_all()
+        self.env['execution.planning.task'].browse(pending['task'])._check_task_dates_sql()
+        self.env['execution.planning.lot'].browse(pending['lot'])._check_lot_dates_sql()
+        self.browse(pending['planning'])._check_total_weight_sql()
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -106,6 +167,14 @@ class ExecutionPlanning(models.Model):
                 vals['name'] = self.env['ir.sequence'].next_by_code('execution.planning') or _('New')
         return super().create(vals_list)
 
+    def write(self, vals):
+        # Lots and tasks edited through the planning are checked once, not per line
+        if 'lot_ids' not in vals or self.env.context.get('defer_planning_checks'):
+            return super().write(vals)
+        res = super(ExecutionPlanning, self.with_context(defer_planning_checks=True)).write(vals)
+        self._flush_planning_checks()
+        return res
+
     @api.depends('lot_ids.task_ids', 'lot_ids.task_ids.weight')
     def _compute_task_stats(self):
         for record in self:
@@ -143,6 +212,14 @@ class ExecutionPlanning(models.Model):
         if self.state != 'submitted':
             raise ValidationError(_("Only submitted planning can be approved."))
             
+        # The previous approved planning is superseded. PMO users cannot
+        # write approved plannings, so it is archived as superuser.
+        self.sudo().search([
+            ('project_id', '=', self.project_id.id),
+            ('state', '=', 'approved'),
+            ('id', '!=', self.id),
+        ]).action_archive()
+
         # Synchronize tasks to Odoo Project Tasks FIRST
         # We must do this before setting state to 'approved' because
         # once approved, record rules make planning tasks read-only for PMO.
@@ -180,12 +257,23 @@ class ExecutionPlanning(models.Model):
         """
         Create or update Odoo project.task records for each planning task.
         Handles hierarchy (parent/subtasks).
+
+        The sync is diff-based: missing project tasks are created in a single
+        create, only project tasks whose values changed are written, and the
+        hierarchy is applied with one write per parent.
         """
         self.ensure_one()
-        ProjectTask = self.env['project.task']
+        ProjectTask = self.env['project.task'].with_context(
+            sync_in_progress=True,
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_create_nosubscribe=True,
+        )
         all_tasks = self.lot_ids.mapped('task_ids')
-        
+
         # Pass 1: Create/Update tasks (base fields)
+        to_create = self.env['execution.planning.task']
+        create_vals_list = []
         for task in all_tasks:
             vals = {
                 'name': task.name,
@@ -194,18 +282,36 @@ class ExecutionPlanning(models.Model):
                 'date_deadline': task.date_end,
                 'sequence': task.sequence,
                 'execution_planning_task_id': task.id,
-                'state': '04_waiting_normal',
             }
-            
+
             if task.project_task_id:
-                task.project_task_id.write(vals)
+                # The status of existing tasks follows validated progress, it is not reset
+                project_task = task.project_task_id.with_env(ProjectTask.env)
+                if self._project_task_needs_update(project_task, vals):
+                    project_task.write(vals)
             else:
-                new_task = ProjectTask.create(vals)
-                task.project_task_id = new_task.id
+                to_create |= task
+                create_vals_list.append(dict(vals, state='04_waiting_normal'))
+
+        if create_vals_list:
+            for task, project_task in zip(to_create, ProjectTask.create(create_vals_list)):
+                task.project_task_id = project_task
 
-        # Pass 2: Setup Hierarchy
+        # Pass 2: Setup Hierarchy, grouped by parent
+        children_by_parent = defaultdict(lambda: ProjectTask)
         for task in all_tasks:
-            if task.parent_task_id and task.parent_task_id.project_task_id:
-                task.project_task_id.parent_id = task.parent_task_id.project_task_id.id
-            else:
-                task.project_task_id.parent_id = False
+            parent = task.parent_task_id.project_task_id
+            if task.project_task_id.parent_id != parent:
+                children_by_parent[parent] |= task.project_task_id
+        for parent, children in children_by_parent.items():
+            children.write({'parent_id': parent.id})
+
+    @api.model
+    def _project_task_needs_update(self, project_task, vals):
+        """Whether writing ``vals`` would change any value of ``project_task``."""
+        for fname, value in vals.items():
+            field = project_task._fields[fname]
+            new_value = field.convert_to_record(field.convert_to_cache(value, project_task), project_task)
+            if project_task[fname] != new_value:
+                return True
+        return False
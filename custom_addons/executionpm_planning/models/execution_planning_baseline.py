@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Planning Baselines
+
+A baseline freezes the task dates and weights of a planning in one row: the
+task columns are packed as integer arrays and compressed, so a revision of a
+10k-task planning costs a few dozen kilobytes instead of a copy of every
+task record.
+
+The variance report compares the current tasks of the project against a
+baseline in a single pass over both sides, see execution.planning.diff.
+"""
+import base64
+import struct
+import sys
+import zlib
+from array import array
+from datetime import date
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+# Snapshot layout: header (version, task count), then the id, start, end and
+# weight (in thousandths of %) columns as int32 arrays, then the lot names and
+# task names separated by NUL characters. The whole payload is zlib compressed.
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct('<BI')
+
+
+def _pack_column(values):
+    column = array('i', values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+
+def _unpack_column(payload, offset, count):
+    column = array('i')
+    column.frombytes(payload[offset:offset + 4 * count])
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column
+
+
+class ExecutionPlanningBaseline(models.Model):
+    """
+    Frozen copy of the task dates and weights of a planning.
+    """
+    _name = 'execution.planning.baseline'
+    _description = 'Planning Baseline'
+    _order = 'create_date desc, id desc'
+
+    name = fields.Char(string='Baseline', required=True)
+    planning_id = fields.Many2one(
+        comodel_name='execution.planning',
+        string='Planning Reference',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    project_id = fields.Many2one(
+        comodel_name='project.project',
+        string='Project',
+        related='planning_id.project_id',
+        store=True,
+        readonly=True,
+        index=True,
+    )
+    task_count = fields.Integer(string='Tasks', readonly=True)
+    total_weight = fields.Float(string='Total Weight (%)', digits=(6, 3), readonly=True)
+    start_date = fields.Date(string='Start Date', readonly=True)
+    end_date = fields.Date(string='End Date', readonly=True)
+    snapshot = fields.Binary(string='Snapshot', attachment=False, readonly=True, copy=False)
+
+    # -------------------------------------------------------------------------
+    # CAPTURE
+    # -------------------------------------------------------------------------
+    @api.model
+    def _capture(self, planning, name):
+        """Create a baseline of the current tasks of ``planning``."""
+        planning.ensure_one()
+        rows = self.env['execution.planning.diff']._get_planning_rows(planning)
+        return self.create({
+            'name': name,
+            'planning_id': planning.id,
+            'task_count': len(rows),
+            'total_weight': sum(row[3] or 0.0 for row in rows),
+            'start_date': min((row[1] for row in rows), default=False),
+            'end_date': max((row[2] for row in rows), default=False),
+            'snapshot': base64.b64encode(self._pack_snapshot(rows)),
+        })
+
+    @api.model
+    def _pack_snapshot(self, rows):
+        """Pack ``(id, date_start, date_end, weight, lot name, task name)`` rows."""
+        payload = [
+            _SNAPSHOT_HEADER.pack(_SNAPSHOT_VERSION, len(rows)),
+            _pack_column(row[0] for row in rows),
+            _pack_column(row[1].toordinal() for row in rows),
+            _pack_column(row[2].toordinal() for row in rows),
+            _pack_column(round((row[3] or 0.0) * 1000) for row in rows),
+            '\0'.join([row[4] for row in rows] + [row[5] for row in rows]).encode(),
+        ]
+        return zlib.compress(b''.join(payload))
+
+    def _unpack_snapshot(self):
+        """
+        Return the baseline tasks as a list of
+        ``(id, date_start, date_end, weight, lot name, task name)``.
+        """
+        self.ensure_one()
+        if not self.snapshot:
+            return []
+        payload = zlib.decompress(base64.b64decode(self.snapshot))
+        version, count = _SNAPSHOT_HEADER.unpack_from(payload)
+        if version != _SNAPSHOT_VERSION:
+            raise UserError(_("Unsupported baseline format (version %s).") % version)
+        offset = _SNAPSHOT_HEADER.size
+        columns = []
+        for _column in range(4):
+            columns.append(_unpack_column(payload, offset, count))
+            offset += 4 * count
+        texts = payload[offset:].decode().split('\0') if count else []
+        task_ids, starts, ends, weights = columns
+        return [
+            (
+                task_ids[index],
+                date.fromordinal(starts[index]),
+                date.fromordinal(ends[index]),
+                weights[index] / 1000.0,
+                texts[index],
+                texts[count + index],
+            )
+            for index in range(count)
+        ]
+
+    # -------------------------------------------------------------------------
+    # VARIANCE
+    # -------------------------------------------------------------------------
+    def _get_variance(self, planning=None):
+        """
+        Compare ``planning`` (default: the active planning of the project, or
+        the baselined planning) with the baseline, in one pass.
+
+        Tasks are matched as in the planning diff engine: by id within the
+        same planning, by lot and task name across plannings.
+
+        :return: list of dicts, one per task of either side
+        """
+        self.ensure_one()
+        planning = planning or self.project_id.active_planning_id or self.planning_id
+        Diff = self.env['execution.planning.diff']
+        return [
+            self._get_variance_line(baseline_row, current_row)
+            for baseline_row, current_row in Diff._match_rows(
+                self._unpack_snapshot(), Diff._get_planning_rows(planning), planning == self.planning_id,
+            )
+        ]
+
+    def _get_variance_line(self, baseline_row, current_row):
+        row = current_row or baseline_row
+        line = {
+            'task_id': current_row[0] if current_row else False,
+            'lot_name': row[4],
+            'task_name': row[5],
+            'baseline_start': baseline_row[1] if baseline_row else False,
+            'baseline_end': baseline_row[2] if baseline_row else False,
+            'baseline_weight': baseline_row[3] if baseline_row else 0.0,
+            'current_start': current_row[1] if current_row else False,
+            'current_end': current_row[2] if current_row else False,
+            'current_weight': (current_row[3] or 0.0) if current_row else 0.0,
+            'start_variance': 0,
+            'finish_variance': 0,
+        }
+        if not baseline_row:
+            line['status'] = 'added'
+        elif not current_row:
+            line['status'] = 'removed'
+        else:
+            line['start_variance'] = (current_row[1] - baseline_row[1]).days
+            line['finish_variance'] = (current_row[2] - baseline_row[2]).days
+            changed = (
+                line['start_variance'] or line['finish_variance'] or current_row[4] != baseline_row[4]
+                or abs(line['current_weight'] - line['baseline_weight']) >= 0.0005
+            )
+            line['status'] = 'changed' if changed else 'unchanged'
+        line['weight_variance'] = line['current_weight'] - line['baseline_weight']
+        return line
+
+    def action_view_variance(self):
+        """Open the variance of the current planning against this baseline."""
+        self.ensure_one()
+        Variance = self.env['execution.planning.baseline.variance']
+        Variance.search([('baseline_id', '=', self.id), ('create_uid', '=', self.env.uid)]).unlink()
+        Variance.create([
+            dict(line, baseline_id=self.id) for line in self._get_variance()
+        ])
+        action = self.env['ir.actions.act_window']._for_xml_id(
+            'executionpm_planning.action_execution_planning_baseline_variance')
+        action['domain'] = [('baseline_id', '=', self.id), ('create_uid', '=', self.env.uid)]
+        action['display_name'] = _('Variance against %s') % self.name
+        return action
+
+
+class ExecutionPlanningBaselineVariance(models.TransientModel):
+    """
+    Line of the variance report between a baseline and the current planning.
+    """
+    _name = 'execution.planning.baseline.variance'
+    _description = 'Planning Baseline Variance'
+    _order = 'lot_name, baseline_start, current_start, id'
+
+    baseline_id = fields.Many2one(
+        comodel_name='execution.planning.baseline',
+        string='Baseline',
+        required=True,
+        ondelete='cascade',
+    )
+    task_id = fields.Many2one(
+        comodel_name='execution.planning.task',
+        string='Task',
+        ondelete='set null',
+    )
+    lot_name = fields.Char(string='Lot / Package')
+    task_name = fields.Char(string='Task')
+    status = fields.Selection([
+        ('unchanged', 'Unchanged'),
+        ('changed', 'Changed'),
+        ('added', 'Added'),
+        ('removed', 'Removed'),
+    ], string='Status')
+    baseline_start = fields.Date(string='Baseline Start')
+    baseline_end = fields.Date(string='Baseline End')
+    current_start = fields.Date(string='Current Start')
+    current_end = fields.Date(string='Current End')
+    start_variance = fields.Integer(string='Start Variance (Days)', aggregator='max')
+    finish_variance = fields.Integer(string='Finish Variance (Days)', aggregator='max')
+    baseline_weight = fields.Float(string='Baseline Weight (%)', digits=(5, 3))
+    current_weight = fields.Float(string='Current Weight (%)', digits=(5, 3))
+    weight_variance = fields.Float(string='Weight Variance (%)', digits=(5, 3))
+
+
+class ExecutionPlanningBaselines(models.Model):
+    _inherit = 'execution.planning'
+
+    baseline_ids = fields.One2many(
+        comodel_name='execution.planning.baseline',
+        inverse_name='planning_id',
+        string='Baselines',
+    )
+
+    def action_capture_baseline(self):
+        """Freeze the current task dates and weights."""
+        self.ensure_one()
+        self.env['execution.planning.baseline']._capture(
+            self, _('%s - %s') % (self.name, fields.Date.context_today(self)))
+
+    def action_approve(self):
+        res = super().action_approve()
+        # The approved schedule is the reference of the variance reports
+        self.env['execution.planning.baseline']._capture(self, _('%s - Approved') % self.name)
+        return res
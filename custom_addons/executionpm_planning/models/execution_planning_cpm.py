@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+Critical Path Method
+
+Early and late dates, total float and critical tasks of a planning, from the
+task durations and the dependency links (FS/SS/FF/SF with lag).
+
+Dates are handled as day ordinals. The whole graph of the planning is loaded
+with two queries and ordered topologically once; only the tasks downstream
+(early dates) and upstream (late dates) of the changed tasks are recomputed,
+and only the rows whose values changed are written back.
+
+Tasks without predecessors are anchored on their planned start.
+"""
+from collections import defaultdict, deque
+from datetime import date
+
+from odoo import api, fields, models, _
+from odoo.exceptions import ValidationError
+from odoo.tools import SQL
+
+from odoo.addons.executionpm_core.tools import get_precommit_queue, pop_precommit_queue
+
+_CPM_FIELDS = ['early_start', 'early_finish', 'late_start', 'late_finish', 'total_float', 'is_critical']
+
+# Rows per UPDATE statement when writing the results
+_CPM_WRITE_BATCH = 5000
+
+
+def _successor_min_start(kind, lag, pred_start, pred_finish, succ_duration):
+    """Earliest start of the successor allowed by the link."""
+    if kind == 'fs':
+        return pred_finish + 1 + lag
+    if kind == 'ss':
+        return pred_start + lag
+    if kind == 'ff':
+        return pred_finish + lag - succ_duration + 1
+    return pred_start + lag - succ_duration + 1  # sf
+
+
+def _predecessor_max_finish(kind, lag, succ_start, succ_finish, pred_duration):
+    """Latest finish of the predecessor allowed by the link."""
+    if kind == 'fs':
+        return succ_start - 1 - lag
+    if kind == 'ss':
+        return succ_start - lag + pred_duration - 1
+    if kind == 'ff':
+        return succ_finish - lag
+    return succ_finish - lag + pred_duration - 1  # sf
+
+
+def _reachable(seeds, edges):
+    """Nodes reachable from ``seeds`` (included) through ``edges`` {node: [(node, ...)]}."""
+    seen = set(seeds)
+    stack = list(seeds)
+    while stack:
+        for link in edges.get(stack.pop(), ()):
+            if link[0] not in seen:
+                seen.add(link[0])
+                stack.append(link[0])
+    return seen
+
+
+class ExecutionPlanningTaskCpm(models.Model):
+    _inherit = 'execution.planning.task'
+
+    predecessor_link_ids = fields.One2many(
+        comodel_name='execution.planning.task.dependency',
+        inverse_name='successor_id',
+        string='Predecessors',
+    )
+    successor_link_ids = fields.One2many(
+        comodel_name='execution.planning.task.dependency',
+        inverse_name='predecessor_id',
+        string='Successors',
+    )
+    early_start = fields.Date(string='Early Start', readonly=True, copy=False)
+    early_finish = fields.Date(string='Early Finish', readonly=True, copy=False)
+    late_start = fields.Date(string='Late Start', readonly=True, copy=False)
+    late_finish = fields.Date(string='Late Finish', readonly=True, copy=False)
+    total_float = fields.Integer(
+        string='Total Float (Days)',
+        readonly=True,
+        copy=False,
+        help='Days this task can slip without delaying the end of the planning.',
+    )
+    is_critical = fields.Boolean(string='Critical', readonly=True, copy=False)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        tasks = super().create(vals_list)
+        tasks._mark_critical_path_dirty()
+        return tasks
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'date_start', 'date_end', 'lot_id'}.intersection(vals):
+            self._mark_critical_path_dirty()
+        return res
+
+    def unlink(self):
+        # Removing a task changes the whole backward pass: recompute the planning
+        plannings = self.planning_id
+        res = super().unlink()
+        plannings._mark_critical_path_dirty()
+        return res
+
+    def _mark_critical_path_dirty(self):
+        """Queue the tasks as changed for the critical path update of their planning."""
+        for planning, tasks in self.grouped('planning_id').items():
+            if planning:
+                planning._mark_critical_path_dirty(tasks.ids)
+
+
+class ExecutionPlanningCpm(models.Model):
+    _inherit = 'execution.planning'
+
+    critical_path_end_date = fields.Date(
+        string='Critical Path End',
+        readonly=True,
+        copy=False,
+        help='Earliest finish of the planning given the task dependencies.',
+    )
+
+    def action_compute_critical_path(self):
+        for planning in self:
+            planning._compute_critical_path()
+
+    def _mark_critical_path_dirty(self, task_ids=None):
+        """
+        Queue an update of the critical path at the end of the transaction.
+        ``task_ids`` are the changed tasks; None recomputes the whole planning.
+        """
+        dirty = get_precommit_queue(
+            self.env, 'executionpm.critical_path_dirty', self._flush_critical_path, factory=dict,
+        )
+        for planning in self:
+            if task_ids is None or dirty.get(planning.id, set()) is None:
+                dirty[planning.id] = None
+            else:
+                dirty.setdefault(planning.id, set()).update(task_ids)
+
+    @api.model
+    def _flush_critical_path(self):
+        """Update the critical path of the plannings changed in this transaction."""
+        dirty = pop_precommit_queue(self.env, 'executionpm.critical_path_dirty', {})
+        for planning in self.sudo().browse(dirty).exists():
+            planning._compute_critical_path(dirty[planning.id])
+
+    def _compute_critical_path(self, seed_task_ids=None):
+        """
+        Update the CPM dates of the planning.
+
+        :param seed_task_ids: tasks whose dates, duration or links changed;
+            None recomputes every task
+        """
+        self.ensure_one()
+        self.env['execution.planning.task'].flush_model(['date_start', 'date_end', 'duration', 'lot_id', *_CPM_FIELDS])
+        self.env['execution.planning.task.dependency'].flush_model()
+
+        self.env.cr.execute(SQL(
+            """
+            SELECT id, date_start, duration, early_start, early_finish, late_start, late_finish,
+                   total_float, is_critical
+              FROM execution_planning_task
+             WHERE planning_id = %(planning_id)s
+            """,
+            planning_id=self.id,
+        ))
+        tasks = {}
+        stored = {}
+        for task_id, date_start, duration, *cpm_values in self.env.cr.fetchall():
+            tasks[task_id] = (date_start.toordinal(), max(duration or 1, 1))
+            stored[task_id] = tuple(cpm_values)
+        if not tasks:
+            self.critical_path_end_date = False
+            return
+
+        self.env.cr.execute(SQL(
+            """
+            SELECT predecessor_id, successor_id, dependency_type, lag_days
+              FROM execution_planning_task_dependency
+             WHERE planning_id = %(planning_id)s
+            """,
+            planning_id=self.id,
+        ))
+        predecessors = defaultdict(list)   # successor -> [(predecessor, type, lag)]
+        successors = defaultdict(list)     # predecessor -> [(successor, type, lag)]
+        for predecessor_id, successor_id, kind, lag in self.env.cr.fetchall():
+            predecessors[successor_id].append((predecessor_id, kind, lag or 0))
+            successors[predecessor_id].append((successor_id, kind, lag or 0))
+
+        order = self._topological_order(tasks, predecessors, successors)
+
+        # Tasks never computed, or a removed task: full recomputation
+        if seed_task_ids is None or any(values[0] is None for values in stored.values()):
+            forward = backward = set(tasks)
+        else:
+            seeds = [task_id for task_id in seed_task_ids if task_id in tasks]
+            forward = _reachable(seeds, successors)
+            backward = _reachable(seeds, predecessors)
+
+        # Forward pass: early dates
+        early = {
+            task_id: (values[0].toordinal(), values[1].toordinal())
+            for task_id, values in stored.items() if task_id not in forward
+        }
+        for task_id in order:
+            if task_id not in forward:
+                continue
+            planned_start, duration = tasks[task_id]
+            links = predecessors.get(task_id)
+            if links:
+                start = max(
+                    _successor_min_start(kind, lag, *early[pred_id], duration)
+                    for pred_id, kind, lag in links
+                )
+            else:
+                start = planned_start
+            early[task_id] = (start, start + duration - 1)
+
+        end = max(finish for _start, finish in early.values())
+        if self.critical_path_end_date != date.fromordinal(end):
+            # The end of the planning moved: every late date moves with it
+            backward = set(tasks)
+            self.critical_path_end_date = date.fromordinal(end)
+
+        # Backward pass: late dates
+        late = {
+            task_id: (values[2].toordinal(), values[3].toordinal())
+            for task_id, values in stored.items() if task_id not in backward
+        }
+        for task_id in reversed(order):
+            if task_id not in backward:
+                continue
+            duration = tasks[task_id][1]
+            links = successors.get(task_id)
+            if links:
+                finish = min(
+                    _predecessor_max_finish(kind, lag, *late[succ_id], duration)
+                    for succ_id, kind, lag in links
+                )
+            else:
+                finish = end
+            late[task_id] = (finish - duration + 1, finish)
+
+        changed = []
+        for task_id in forward | backward:
+            early_start, early_finish = early[task_id]
+            late_start, late_finish = late[task_id]
+            total_float = late_start - early_start
+            values = (
+                date.fromordinal(early_start), date.fromordinal(early_finish),
+                date.fromordinal(late_start), date.fromordinal(late_finish),
+                total_float, total_float <= 0,
+            )
+            if values != stored[task_id]:
+                changed.append((task_id, *values))
+        self._write_critical_path(changed)
+
+    @api.model
+    def _topological_order(self, tasks, predecessors, successors):
+        """Kahn ordering of the planning tasks; raise on circular dependencies."""
+        in_degree = {task_id: len(predecessors.get(task_id, ())) for task_id in tasks}
+        queue = deque(task_id for task_id, degree in in_degree.items() if not degree)
+        order = []
+        while queue:
+            task_id = queue.popleft()
+            order.append(task_id)
+            for succ_id, _kind, _lag in successors.get(task_id, ()):
+                in_degree[succ_id] -= 1
+                if not in_degree[succ_id]:
+                    queue.append(succ_id)
+        if len(order) < len(tasks):
+            cycle = self.env['execution.planning.task'].browse(
+                [task_id for task_id, degree in in_degree.items() if degree]
+            )
+            raise ValidationError(_(
+                "Circular dependency between the tasks: %s"
+            ) % ', '.join(cycle[:10].mapped('name')))
+        return order
+
+    @api.model
+    def _write_critical_path(self, rows):
+        """Write ``(id, early_start, early_finish, late_start, late_finish, float, critical)`` rows."""
+        if not rows:
+            return
+        for index in range(0, len(rows), _CPM_WRITE_BATCH):
+            self.env.cr.execute(SQL(
+                """
+                UPDATE execution_planning_task t
+                   SET early_start = v.early_start,
+                       early_finish = v.early_finish,
+                       late_start = v.late_start,
+                       late_finish = v.late_finish,
+                       total_float = v.total_float,
+                       is_critical = v.is_critical,
+                       write_date = NOW() AT TIME ZONE 'UTC'
+                  FROM (VALUES %(values)s) AS v(id, early_start, early_finish, late_start, late_finish,
+                                                total_float, is_critical)
+                 WHERE t.id = v.id
+                """,
+                values=SQL(", ").join(
+                    SQL("(%s, %s::date, %s::date, %s::date, %s::date, %s, %s)", *row)
+                    for row in rows[index:index + _CPM_WRITE_BATCH]
+                ),
+            ))
+        self.env['execution.planning.task'].invalidate_model(_CPM_FIELDS + ['write_date'])
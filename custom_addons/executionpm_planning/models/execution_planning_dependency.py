@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+from odoo.exceptions import ValidationError
+
+
+class ExecutionPlanningTaskDependency(models.Model):
+    """
+    Scheduling link between two tasks of the same planning.
+    """
+    _name = 'execution.planning.task.dependency'
+    _description = 'Planning Task Dependency'
+    _order = 'successor_id, predecessor_id'
+
+    predecessor_id = fields.Many2one(
+        comodel_name='execution.planning.task',
+        string='Predecessor',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    successor_id = fields.Many2one(
+        comodel_name='execution.planning.task',
+        string='Successor',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    planning_id = fields.Many2one(
+        comodel_name='execution.planning',
+        string='Planning Reference',
+        related='successor_id.planning_id',
+        store=True,
+        readonly=True,
+        index=True,
+    )
+    dependency_type = fields.Selection([
+        ('fs', 'Finish to Start'),
+        ('ss', 'Start to Start'),
+        ('ff', 'Finish to Finish'),
+        ('sf', 'Start to Finish'),
+    ], string='Type', required=True, default='fs')
+    lag_days = fields.Integer(
+        string='Lag (Days)',
+        default=0,
+        help='Delay between the two linked dates. A negative lag is a lead.',
+    )
+
+    _sql_constraints = [
+        ('dependency_unique', 'UNIQUE(predecessor_id, successor_id)',
+         'Two tasks can only be linked once.'),
+        ('dependency_not_self', 'CHECK(predecessor_id != successor_id)',
+         'A task cannot depend on itself.'),
+    ]
+
+    @api.constrains('predecessor_id', 'successor_id')
+    def _check_same_planning(self):
+        # Cycles are detected by the critical path engine, once per transaction
+        for dependency in self:
+            if dependency.predecessor_id.planning_id != dependency.successor_id.planning_id:
+                raise ValidationError(_(
+                    "Tasks '%s' and '%s' belong to different plannings and cannot be linked."
+                ) % (dependency.predecessor_id.name, dependency.successor_id.name))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        dependencies = super().create(vals_list)
+        dependencies._mark_critical_path_dirty()
+        return dependencies
+
+    def write(self, vals):
+        if not {'predecessor_id', 'successor_id', 'dependency_type', 'lag_days'}.intersection(vals):
+            return super().write(vals)
+        self._mark_critical_path_dirty()
+        res = super().write(vals)
+        self._mark_critical_path_dirty()
+        return res
+
+    def unlink(self):
+        self._mark_critical_path_dirty()
+        return super().unlink()
+
+    def _mark_critical_path_dirty(self):
+        (self.predecessor_id | self.successor_id)._mark_critical_path_dirty()
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Planning Diff
+
+Compares two versions of a schedule: two plannings, or a planning and one of
+its baselines. Both sides are flat lists of task rows
+``(id, date_start, date_end, weight, lot name, task name)``, the same shape
+as the baseline snapshots.
+
+Tasks are matched through dictionaries, never with nested loops: by id when
+both sides come from the same planning, otherwise by lot and task name, then
+by task name alone to detect tasks moved to another lot. Tasks sharing a
+name are paired in order.
+"""
+from collections import defaultdict, deque
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+
+_ROW_ID, _ROW_START, _ROW_END, _ROW_WEIGHT, _ROW_LOT, _ROW_NAME = range(6)
+
+
+class ExecutionPlanningDiff(models.AbstractModel):
+    _name = 'execution.planning.diff'
+    _description = 'Planning Diff Engine'
+
+    @api.model
+    def _get_planning_rows(self, planning):
+        """Current task rows of ``planning``, ordered by id."""
+        self.env['execution.planning.task'].flush_model(['name', 'lot_id', 'date_start', 'date_end', 'weight'])
+        self.env['execution.planning.lot'].flush_model(['name', 'planning_id'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT t.id, t.date_start, t.date_end, COALESCE(t.weight, 0.0), l.name, t.name
+              FROM execution_planning_task t
+              JOIN execution_planning_lot l ON l.id = t.lot_id
+             WHERE l.planning_id = %(planning_id)s
+             ORDER BY t.id
+            """,
+            planning_id=planning.id,
+        ))
+        return self.env.cr.fetchall()
+
+    @api.model
+    def _get_source_rows(self, source):
+        """Task rows of a planning or a baseline."""
+        if source._name == 'execution.planning.baseline':
+            return source._unpack_snapshot()
+        return self._get_planning_rows(source)
+
+    @api.model
+    def _get_source_planning(self, source):
+        return source.planning_id if source._name == 'execution.planning.baseline' else source
+
+    @api.model
+    def _match_rows(self, old_rows, new_rows, same_planning):
+        """
+        Pair the rows of both sides. Yield ``(old_row, new_row)``, with None
+        on the side where the task does not exist.
+        """
+        if same_planning:
+            def key(row):
+                return row[_ROW_ID]
+        else:
+            def key(row):
+                return row[_ROW_LOT], row[_ROW_NAME]
+
+        # Several tasks of a lot may share a name: each key holds its rows in order
+        new_by_key = defaultdict(deque)
+        for new_row in new_rows:
+            new_by_key[key(new_row)].append(new_row)
+        unmatched = []
+        for old_row in old_rows:
+            candidates = new_by_key.get(key(old_row))
+            if candidates:
+                yield old_row, candidates.popleft()
+            else:
+                unmatched.append(old_row)
+
+        # Across plannings, the same task name in another lot is a move
+        remaining = [new_row for candidates in new_by_key.values() for new_row in candidates]
+        new_by_name = defaultdict(deque)
+        if not same_planning:
+            for new_row in remaining:
+                new_by_name[new_row[_ROW_NAME]].append(new_row)
+        moved_ids = set()
+        for old_row in unmatched:
+            candidates = new_by_name.get(old_row[_ROW_NAME])
+            if candidates:
+                new_row = candidates.popleft()
+                moved_ids.add(new_row[_ROW_ID])
+                yield old_row, new_row
+            else:
+                yield old_row, None
+        for new_row in remaining:
+            if new_row[_ROW_ID] not in moved_ids:
+                yield None, new_row
+
+    @api.model
+    def _get_change(self, old_row, new_row):
+        """Describe the change of one task, or return None when it is unchanged."""
+        row = new_row or old_row
+        change = {
+            'task_id': new_row[_ROW_ID] if new_row else False,
+            'task_name': row[_ROW_NAME],
+            'old_lot_name': old_row[_ROW_LOT] if old_row else False,
+            'new_lot_name': new_row[_ROW_LOT] if new_row else False,
+            'old_start': old_row[_ROW_START] if old_row else False,
+            'new_start': new_row[_ROW_START] if new_row else False,
+            'old_end': old_row[_ROW_END] if old_row else False,
+            'new_end': new_row[_ROW_END] if new_row else False,
+            'old_weight': old_row[_ROW_WEIGHT] if old_row else 0.0,
+            'new_weight': new_row[_ROW_WEIGHT] if new_row else 0.0,
+            'start_shift': 0,
+            'finish_shift': 0,
+        }
+        change['weight_change'] = change['new_weight'] - change['old_weight']
+        if not old_row:
+            change['change_type'] = 'added'
+        elif not new_row:
+            change['change_type'] = 'removed'
+        else:
+            change['start_shift'] = (new_row[_ROW_START] - old_row[_ROW_START]).days
+            change['finish_shift'] = (new_row[_ROW_END] - old_row[_ROW_END]).days
+            if old_row[_ROW_LOT] != new_row[_ROW_LOT]:
+                change['change_type'] = 'moved'
+            elif change['start_shift'] or change['finish_shift'] or abs(change['weight_change']) >= 0.0005:
+                change['change_type'] = 'changed'
+            else:
+                return None
+        return change
+
+    @api.model
+    def _diff(self, old_source, new_source):
+        """
+        Changes from ``old_source`` to ``new_source`` (plannings or baselines).
+
+        :return: list of change dicts, unchanged tasks excluded
+        """
+        same_planning = self._get_source_planning(old_source) == self._get_source_planning(new_source)
+        changes = []
+        for old_row, new_row in self._match_rows(
+            self._get_source_rows(old_source), self._get_source_rows(new_source), same_planning,
+        ):
+            change = self._get_change(old_row, new_row)
+            if change:
+                changes.append(change)
+        return changes
+
+
+class ExecutionPlanningDiffApi(models.Model):
+    _inherit = 'execution.planning'
+
+    def get_revision_diff(self, baseline_id=None, planning_id=None):
+        """
+        External API: changes of this planning since a baseline (default: its
+        latest baseline) or compared with another planning.
+
+        :return: {'summary': {change type: count}, 'changes': [...]}
+        """
+        self.ensure_one()
+        old_source = self._get_diff_reference(baseline_id, planning_id)
+        changes = self.env['execution.planning.diff']._diff(old_source, self)
+        summary = dict.fromkeys(['added', 'removed', 'moved', 'changed'], 0)
+        for change in changes:
+            summary[change['change_type']] += 1
+        return {'summary': summary, 'changes': changes}
+
+    def _get_diff_reference(self, baseline_id=None, planning_id=None):
+        if planning_id:
+            reference = self.browse(planning_id)
+        elif baseline_id:
+            reference = self.env['execution.planning.baseline'].browse(baseline_id)
+        else:
+            reference = self.baseline_ids[:1]
+        if not reference.exists():
+            raise UserError(_("There is no baseline or planning to compare planning %s with.") % self.name)
+        reference.check_access('read')
+        return reference
+
+    def action_reset_draft(self):
+        # Keep the reviewed version, to show the revision to the reviewers
+        for planning in self.filtered(lambda p: p.state in ('rejected', 'submitted')):
+            self.env['execution.planning.baseline']._capture(
+                planning, _('%s - Before Revision %s') % (planning.name, fields.Date.context_today(planning)))
+        return super().action_reset_draft()
+
+    def action_review_changes(self):
+        """Open the changes of this planning since its latest baseline."""
+        self.ensure_one()
+        wizard = self.env['execution.planning.diff.wizard'].create({
+            'planning_id': self.id,
+            'baseline_id': self.baseline_ids[:1].id,
+        })
+        if wizard.baseline_id:
+            wizard.action_compute_diff()
+        return wizard._get_action()
@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+"""
+Schedule Importer
+
+Loads MS Project XML, Primavera XER and CSV schedules into a draft planning.
+
+Files are parsed incrementally: each parser is a generator of normalized rows,
+so only one row and a key -> id map are held in memory. Rows are validated in
+Python, then inserted in batches with the per-record planning constraints
+deferred; the constraints run once on the imported records at the end.
+"""
+import base64
+import csv
+import io
+import itertools
+import logging
+from datetime import date
+
+from lxml import etree
+
+from odoo import api, models, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+# CSV header aliases -> row key
+_CSV_COLUMNS = {
+    'id': 'key',
+    'code': 'key',
+    'wbs': 'key',
+    'parent': 'parent_key',
+    'parent_code': 'parent_key',
+    'lot': 'lot',
+    'name': 'name',
+    'task': 'name',
+    'start': 'date_start',
+    'date_start': 'date_start',
+    'end': 'date_end',
+    'finish': 'date_end',
+    'date_end': 'date_end',
+    'weight': 'weight',
+}
+
+
+class ExecutionPlanningImport(models.AbstractModel):
+    """
+    Server-side API to import a schedule file into a draft planning.
+
+    Row format shared by the parsers:
+    ``{'key', 'parent_key', 'lot', 'name', 'date_start', 'date_end', 'weight', 'line'}``
+    where ``lot`` is a lot name (False for the default lot) and ``weight`` is
+    None when the file does not provide it.
+    """
+    _name = 'execution.planning.import'
+    _description = 'Planning Schedule Importer'
+
+    # Tasks created per create() call
+    _IMPORT_BATCH_SIZE = 1000
+
+    @api.model
+    def _import_schedule(self, planning, fileobj, file_format='auto', filename=None):
+        """
+        Import the schedule read from the binary file object ``fileobj``.
+
+        :param planning: draft ``execution.planning`` receiving the lots and tasks
+        :param file_format: 'msproject', 'xer', 'csv' or 'auto'
+        :return: dict with the number of created lots and tasks
+        """
+        planning.ensure_one()
+        if planning.state != 'draft':
+            raise UserError(_("Schedules can only be imported into a draft planning."))
+        if file_format == 'auto':
+            file_format = self._detect_format(fileobj, filename)
+
+        parser = getattr(self, '_parse_%s' % file_format)
+        project = planning.project_id
+        context = dict(
+            defer_planning_checks=True,
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_create_nosubscribe=True,
+        )
+        Lot = self.env['execution.planning.lot'].with_context(**context)
+        Task = self.env['execution.planning.task'].with_context(**context)
+
+        lot_ids = {lot.name: lot.id for lot in planning.lot_ids}
+        lot_dates = {lot.id: [lot.start_date, lot.end_date] for lot in planning.lot_ids}
+        default_lot_name = _('Imported Tasks')
+        lot_bounds = {}     # lot id -> [start, end] of the imported tasks
+        task_lots = {}      # task key -> lot id, for every read row
+        task_ids = {}       # task key -> task id, for every created row
+        forward_parents = []  # (key, parent_key, line) of children read before their parent
+        batch = []
+        total_weight = planning.total_physical_weight
+        has_weights = False
+
+        for row in parser(fileobj):
+            self._check_import_row(row, project, task_lots)
+            lot_name = row['lot'] or default_lot_name
+            lot_id = lot_ids.get(lot_name)
+            if not lot_id:
+                lot_id = lot_ids[lot_name] = Lot.create({
+                    'name': lot_name,
+                    'sequence': len(lot_ids) * 10,
+                    'planning_id': planning.id,
+                    'start_date': row['date_start'],
+                    'end_date': row['date_end'],
+                }).id
+            bounds = lot_bounds.setdefault(lot_id, lot_dates.get(lot_id) or [row['date_start'], row['date_end']])
+            bounds[0] = min(bounds[0], row['date_start'])
+            bounds[1] = max(bounds[1], row['date_end'])
+
+            parent_lot_id = task_lots.get(row['parent_key'])
+            if parent_lot_id and parent_lot_id != lot_id:
+                raise UserError(_(
+                    "Line %s: task '%s' and its parent must belong to the same lot."
+                ) % (row['line'], row['name']))
+            task_lots[row['key']] = lot_id
+            if row['parent_key'] and not parent_lot_id:
+                forward_parents.append((row['key'], row['parent_key'], row['line']))
+
+            if row['weight'] is not None:
+                has_weights = True
+                total_weight += row['weight']
+                if total_weight > 100.001:
+                    raise UserError(_(
+                        "Line %s: the total physical weight reaches %.2f%%, above 100%%."
+                    ) % (row['line'], total_weight))
+
+            batch.append((row['key'], row['parent_key'], {
+                'name': row['name'],
+                'sequence': len(task_lots),
+                'lot_id': lot_id,
+                'date_start': row['date_start'],
+                'date_end': row['date_end'],
+                'weight': row['weight'] or 0.0,
+            }))
+            if len(batch) >= self._IMPORT_BATCH_SIZE:
+                self._create_import_batch(Task, batch, task_ids)
+                batch = []
+        if batch:
+            self._create_import_batch(Task, batch, task_ids)
+        if not task_ids:
+            raise UserError(_("The file does not contain any task."))
+
+        self._link_forward_parents(Task, forward_parents, task_ids, task_lots)
+        for lot_id, (date_start, date_end) in lot_bounds.items():
+            Lot.browse(lot_id).write({'start_date': date_start, 'end_date': date_end})
+        tasks = Task.browse(task_ids.values())
+        if not has_weights:
+            self._distribute_import_weights(tasks, 100.0 - planning.total_physical_weight)
+
+        # Deferred constraints, once for the whole import
+        self.env['execution.planning']._flush_planning_checks()
+
+        _logger.info(
+            "Imported %d tasks in %d lots into planning %s", len(task_ids), len(lot_bounds), planning.name,
+        )
+        return {'lot_count': len(lot_bounds), 'task_count': len(task_ids)}
+
+    # -------------------------------------------------------------------------
+    # BULK INSERT
+    # -------------------------------------------------------------------------
+    @api.model
+    def _create_import_batch(self, Task, batch, task_ids):
+        """
+        Create a batch of ``(key, parent_key, vals)``, parents first: rows
+        whose parent is in the batch wait for the next create, so each outline
+        level of the batch costs one create() call.
+        """
+        while batch:
+            waiting_keys = {key for key, _parent_key, _vals in batch}
+            ready = [item for item in batch if item[1] not in waiting_keys]
+            if not ready:
+                raise UserError(_("The task hierarchy of the file contains a cycle."))
+            batch = [item for item in batch if item[1] in waiting_keys]
+            for _key, parent_key, vals in ready:
+                if parent_key in task_ids:
+                    vals['parent_task_id'] = task_ids[parent_key]
+            tasks = Task.create([vals for _key, _parent_key, vals in ready])
+            task_ids.update(zip((key for key, _parent_key, _vals in ready), tasks.ids))
+        # Keep the cache bounded on large files
+        self.env.flush_all()
+        self.env.invalidate_all()
+
+    @api.model
+    def _link_forward_parents(self, Task, forward_parents, task_ids, task_lots):
+        """Set the parent of tasks listed before their parent, one write per parent."""
+        children_by_parent = {}
+        for key, parent_key, line in forward_parents:
+            if parent_key not in task_ids:
+                raise UserError(_(
+                    "Line %s: parent task '%s' does not exist in the file."
+                ) % (line, parent_key))
+            if task_lots[parent_key] != task_lots[key]:
+                raise UserError(_(
+                    "Line %s: a task and its parent must belong to the same lot."
+                ) % line)
+            children_by_parent.setdefault(task_ids[parent_key], []).append(task_ids[key])
+        for parent_id, child_ids in children_by_parent.items():
+            Task.browse(child_ids).write({'parent_task_id': parent_id})
+
+    @api.model
+    def _distribute_import_weights(self, tasks, total_weight):
+        """
+        Spread ``total_weight`` over the imported leaf tasks, proportionally to
+        their duration. The rounding remainder goes to the longest task so the
+        weights add up exactly.
+        """
+        if total_weight <= 0:
+            return
+        self.env.flush_all()
+        self.env.cr.execute(SQL(
+            """
+            WITH leaf AS (
+                SELECT t.id, t.duration
+                  FROM execution_planning_task t
+                 WHERE t.id = ANY(%(task_ids)s)
+                   AND NOT EXISTS (
+                       SELECT 1 FROM execution_planning_task c WHERE c.parent_task_id = t.id
+                   )
+            ), share AS (
+                SELECT id,
+                       ROUND(duration * %(total)s / NULLIF(SUM(duration) OVER (), 0), 3) AS weight,
+                       ROW_NUMBER() OVER (ORDER BY duration DESC, id) AS rank
+                  FROM leaf
+            )
+            UPDATE execution_planning_task t
+               SET weight = s.weight + CASE
+                       WHEN s.rank = 1 THEN %(total)s - (SELECT SUM(weight) FROM share)
+                       ELSE 0
+                   END
+              FROM share s
+             WHERE t.id = s.id
+            """,
+            task_ids=tasks.ids,
+            total=round(total_weight, 3),
+        ))
+        tasks.invalidate_recordset(['weight'])
+        tasks.modified(['weight'])
+
+    # -------------------------------------------------------------------------
+    # VALIDATION
+    # -------------------------------------------------------------------------
+    @api.model
+    def _check_import_row(self, row, project, task_lots):
+        """Validate a parsed row in memory, before anything is inserted."""
+        line = row['line']
+        if not row['name']:
+            raise UserError(_("Line %s: the task name is missing.") % line)
+        if not row['key']:
+            raise UserError(_("Line %s: task '%s' has no identifier.") % (line, row['name']))
+        if row['key'] in task_lots:
+            raise UserError(_("Line %s: task identifier '%s' is used twice.") % (line, row['key']))
+        if not row['date_start'] or not row['date_end']:
+            raise UserError(_("Line %s: task '%s' has no planned dates.") % (line, row['name']))
+        if row['date_start'] > row['date_end']:
+            raise UserError(_(
+                "Task '%s': Planned start date (%s) must be before planned end date (%s)."
+            ) % (row['name'], row['date_start'], row['date_end']))
+        if project.execution_planned_start and row['date_start'] < project.execution_planned_start:
+            raise UserError(_(
+                "Task '%s': Start date (%s) cannot be before project planned start date (%s)."
+            ) % (row['name'], row['date_start'], project.execution_planned_start))
+        if project.execution_planned_end and row['date_end'] > project.execution_planned_end:
+            raise UserError(_(
+                "Task '%s': End date (%s) cannot be after project planned end date (%s)."
+            ) % (row['name'], row['date_end'], project.execution_planned_end))
+        if row['weight'] is not None and not 0 <= row['weight'] <= 100:
+            raise UserError(_(
+                "Line %s: the weight of task '%s' must be between 0 and 100."
+            ) % (line, row['name']))
+
+    # -------------------------------------------------------------------------
+    # PARSERS
+    # -------------------------------------------------------------------------
+    @api.model
+    def _detect_format(self, fileobj, filename=None):
+        extension = (filename or '').rpartition('.')[2].lower()
+        if extension in ('xml', 'xer', 'csv'):
+            return 'msproject' if extension == 'xml' else extension
+        head = fileobj.read(64)
+        fileobj.seek(0)
+        if head.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'<'):
+            return 'msproject'
+        if head.startswith(b'ERMHDR'):
+            return 'xer'
+        return 'csv'
+
+    @api.model
+    def _parse_date(self, value, line):
+        if not value:
+            return False
+        try:
+            # MS Project and XER datetimes start with the ISO date
+            return date.fromisoformat(value.strip()[:10])
+        except ValueError:
+            raise UserError(_("Line %s: invalid date '%s'.") % (line, value))
+
+    @api.model
+    def _parse_weight(self, value, line):
+        if value is None or not value.strip():
+            return None
+        try:
+            return float(value.strip().replace(',', '.'))
+        except ValueError:
+            raise UserError(_("Line %s: invalid weight '%s'.") % (line, value))
+
+    @api.model
+    def _parse_msproject(self, fileobj):
+        """
+        MS Project XML (``<Project><Tasks><Task>``). Outline level 1 summary
+        tasks become lots; deeper levels keep their hierarchy through
+        ``parent_task_id``.
+        """
+        lot_name = False
+        ancestors = []  # [(outline level, key)] of the open summary tasks
+        try:
+            for _event, element in etree.iterparse(
+                fileobj, events=('end',), tag='{*}Task',
+                resolve_entities=False, no_network=True, huge_tree=True,
+            ):
+                values = {
+                    etree.QName(child).localname: child.text
+                    for child in element if isinstance(child.tag, str)
+                }
+                line = element.sourceline
+                # Release the parsed tasks
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+                level = int(values.get('OutlineLevel') or 0)
+                if level == 0 or values.get('IsNull') == '1':
+                    continue
+                if level == 1:
+                    ancestors = []
+                    lot_name = values.get('Summary') == '1' and values.get('Name')
+                    if lot_name:
+                        continue
+                while ancestors and ancestors[-1][0] >= level:
+                    ancestors.pop()
+                key = values.get('UID')
+                yield {
+                    'key': key,
+                    'parent_key': ancestors[-1][1] if ancestors else False,
+                    'lot': lot_name,
+                    'name': values.get('Name'),
+                    'date_start': self._parse_date(values.get('Start'), line),
+                    'date_end': self._parse_date(values.get('Finish'), line),
+                    'weight': None,
+                    'line': line,
+                }
+                ancestors.append((level, key))
+        except etree.XMLSyntaxError as e:
+            raise UserError(_("Invalid MS Project XML file: %s") % e)
+
+    @api.model
+    def _parse_xer(self, fileobj):
+        """
+        Primavera XER (tab separated ``%T`` table, ``%F`` fields, ``%R`` rows).
+        Tasks are grouped into lots by their top-level WBS node.
+        """
+        wbs_nodes = {}  # wbs_id -> (parent_wbs_id, name, is_project_node)
+        wbs_lots = {}
+        table, columns = None, []
+        text = io.TextIOWrapper(fileobj, encoding='utf-8', errors='replace', newline='')
+        for line, raw_line in enumerate(text, 1):
+            parts = raw_line.rstrip('\r\n').split('\t')
+            if parts[0] == '%T':
+                table = parts[1] if len(parts) > 1 else None
+            elif parts[0] == '%F':
+                columns = parts[1:]
+            elif parts[0] == '%R' and table == 'PROJWBS':
+                record = dict(zip(columns, parts[1:]))
+                wbs_nodes[record.get('wbs_id')] = (
+                    record.get('parent_wbs_id'), record.get('wbs_name'), record.get('proj_node_flag') == 'Y',
+                )
+            elif parts[0] == '%R' and table == 'TASK':
+                record = dict(zip(columns, parts[1:]))
+                if record.get('task_type') == 'TT_WBS':
+                    continue
+                yield {
+                    'key': record.get('task_id'),
+                    'parent_key': False,
+                    'lot': self._get_xer_lot_name(wbs_nodes, wbs_lots, record.get('wbs_id')),
+                    'name': record.get('task_name'),
+                    'date_start': self._parse_date(
+                        record.get('target_start_date') or record.get('early_start_date'), line),
+                    'date_end': self._parse_date(
+                        record.get('target_end_date') or record.get('early_end_date'), line),
+                    'weight': None,
+                    'line': line,
+                }
+
+    @api.model
+    def _get_xer_lot_name(self, wbs_nodes, wbs_lots, wbs_id):
+        """Name of the WBS node right below the project node, memoized per node."""
+        if wbs_id not in wbs_lots:
+            node = wbs_nodes.get(wbs_id)
+            if not node or node[2]:
+                wbs_lots[wbs_id] = False
+            elif node[0] not in wbs_nodes or wbs_nodes[node[0]][2]:
+                wbs_lots[wbs_id] = node[1]
+            else:
+                wbs_lots[wbs_id] = self._get_xer_lot_name(wbs_nodes, wbs_lots, node[0])
+        return wbs_lots[wbs_id]
+
+    @api.model
+    def _parse_csv(self, fileobj):
+        """
+        CSV with a header line, comma or semicolon separated. Columns: name,
+        start, end (required), code, parent_code, lot, weight (optional).
+        """
+        text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', errors='replace', newline='')
+        header = text.readline()
+        delimiter = ';' if header.count(';') > header.count(',') else ','
+        reader = csv.reader(itertools.chain([header], text), delimiter=delimiter)
+        columns = [_CSV_COLUMNS.get(column.strip().lower()) for column in next(reader, [])]
+        missing = {'name', 'date_start', 'date_end'} - set(columns)
+        if missing:
+            raise UserError(_("The CSV file misses the columns: %s") % ', '.join(sorted(missing)))
+
+        for line, values in enumerate(reader, 2):
+            if not any(value.strip() for value in values):
+                continue
+            record = {column: value.strip() for column, value in zip(columns, values) if column}
+            yield {
+                'key': record.get('key') or str(line),
+                'parent_key': record.get('parent_key') or False,
+                'lot': record.get('lot') or False,
+                'name': record.get('name'),
+                'date_start': self._parse_date(record.get('date_start'), line),
+                'date_end': self._parse_date(record.get('date_end'), line),
+                'weight': self._parse_weight(record.get('weight'), line),
+                'line': line,
+            }
+
+
+class ExecutionPlanningImportApi(models.Model):
+    _inherit = 'execution.planning'
+
+    def action_import_schedule(self):
+        """Open the schedule import wizard."""
+        self.ensure_one()
+        return {
+            'name': _('Import Schedule'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'execution.planning.import.wizard',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {'default_planning_id': self.id},
+        }
+
+    def import_schedule(self, file_data, file_format='auto', filename=None):
+        """
+        External API: import a base64 encoded MS Project XML, XER or CSV
+        schedule into this draft planning.
+        """
+        self.ensure_one()
+        self.check_access('write')
+        fileobj = io.BytesIO(base64.b64decode(file_data))
+        return self.env['execution.planning.import']._import_schedule(self, fileobj, file_format, filename)
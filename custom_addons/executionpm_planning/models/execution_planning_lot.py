@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
 
 class ExecutionPlanningLot(models.Model):
     """
@@ -33,6 +34,9 @@ class ExecutionPlanningLot(models.Model):
 
     @api.constrains('start_date', 'end_date', 'planning_id')
     def _check_lot_dates(self):
+        if self.env.context.get('defer_planning_checks'):
+            self.env['execution.planning']._defer_planning_checks('lot', self.ids)
+            return
         for lot in self:
             if not lot.start_date or not lot.end_date:
                 continue
@@ -67,3 +71,77 @@ class ExecutionPlanningLot(models.Model):
                     raise ValidationError(_(
                         "Lot '%s': End date (%s) would exclude task '%s' which ends on %s."
                     ) % (lot.name, lot.end_date, task.name, task.date_end))
+
+    def _check_lot_dates_sql(self):
+        """
+        Aggregate version of _check_lot_dates: one query for all lots, using
+        the earliest and latest task of each lot instead of a scan per lot.
+        """
+        if not self:
+            return
+        self.env.cr.execute(SQL(
+            """
+            SELECT l.name, l.start_date, l.end_date,
+                   p.execution_planned_start, p.execution_planned_end,
+                   first_task.name, first_task.date_start,
+                   last_task.name, last_task.date_end
+              FROM execution_planning_lot l
+              JOIN execution_planning pl ON pl.id = l.planning_id
+              LEFT JOIN project_project p ON p.id = pl.project_id
+              LEFT JOIN LATERAL (
+                   SELECT t.name, t.date_start
+                     FROM execution_planning_task t
+                    WHERE t.lot_id = l.id
+                    ORDER BY t.date_start
+                    LIMIT 1
+              ) first_task ON TRUE
+              LEFT JOIN LATERAL (
+                   SELECT t.name, t.date_end
+                     FROM execution_planning_task t
+                    WHERE t.lot_id = l.id
+                    ORDER BY t.date_end DESC
+                    LIMIT 1
+              ) last_task ON TRUE
+             WHERE l.id = ANY(%(lot_ids)s)
+               AND (l.start_date > l.end_date
+                    OR l.start_date < p.execution_planned_start
+                    OR l.end_date > p.execution_planned_end
+                    OR first_task.date_start < l.start_date
+                    OR last_task.date_end > l.end_date)
+             ORDER BY l.id
+             LIMIT 1
+            """,
+            lot_ids=self.ids,
+        ))
+        row = self.env.cr.fetchone()
+        if not row:
+            return
+        (name, start_date, end_date, project_start, project_end,
+         first_task_name, first_task_start, last_task_name, last_task_end) = row
+        if start_date > end_date:
+            raise ValidationError(_(
+                "Lot '%s': Planned start date (%s) must be before planned end date (%s)."
+            ) % (name, start_date, end_date))
+        if project_start and start_date < project_start:
+            raise ValidationError(_(
+                "Lot '%s': Start date (%s) cannot be before project planned start date (%s)."
+            ) % (name, start_date, project_start))
+        if project_end and end_date > project_end:
+            raise ValidationError(_(
+                "Lot '%s': End date (%s) cannot be after project planned end date (%s)."
+            ) % (name, end_date, project_end))
+        if first_task_start and first_task_start < start_date:
+            raise ValidationError(_(
+                "Lot '%s': Start date (%s) would exclude task '%s' which starts on %s."
+            ) % (name, start_date, first_task_name, first_task_start))
+        raise ValidationError(_(
+            "Lot '%s': End date (%s) would exclude task '%s' which ends on %s."
+        ) % (name, end_date, last_task_name, last_task_end))
+
+    def write(self, vals):
+        # Tasks edited through the lot are checked once, not per line
+        if 'task_ids' not in vals or self.env.context.get('defer_planning_checks'):
+            return super().write(vals)
+        res = super(ExecutionPlanningLot, self.with_context(defer_planning_checks=True)).write(vals)
+        self.env['execution.planning']._flush_planning_checks()
+        return res
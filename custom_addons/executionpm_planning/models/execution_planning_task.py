@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
 
 class ExecutionPlanningTask(models.Model):
     """
@@ -9,6 +10,8 @@ class ExecutionPlanningTask(models.Model):
     _name = 'execution.planning.task'
     _description = 'Planning Task'
     _order = 'lot_id, sequence, date_start'
+    _parent_store = True
+    _parent_name = 'parent_task_id'
 
     name = fields.Char(string='Task Description', required=True)
     sequence = fields.Integer(string='Sequence', default=10)
@@ -45,6 +48,7 @@ class ExecutionPlanningTask(models.Model):
         inverse_name='parent_task_id',
         string='Subtasks',
     )
+    parent_path = fields.Char(index=True)
 
     project_task_id = fields.Many2one(
         comodel_name='project.task',
@@ -69,6 +73,28 @@ class ExecutionPlanningTask(models.Model):
         help='Contribution of this task to the overall 100% project progress.'
     )
 
+    # Subtree rollups, the task included. Only the ancestors of a changed task
+    # are recomputed, each from its direct subtasks.
+    subtree_weight = fields.Float(
+        string='Subtree Weight (%)',
+        compute='_compute_subtree_rollups',
+        store=True,
+        recursive=True,
+        digits=(5, 3),
+    )
+    subtree_date_start = fields.Date(
+        string='Subtree Start',
+        compute='_compute_subtree_rollups',
+        store=True,
+        recursive=True,
+    )
+    subtree_date_end = fields.Date(
+        string='Subtree End',
+        compute='_compute_subtree_rollups',
+        store=True,
+        recursive=True,
+    )
+
     @api.depends('date_start', 'date_end')
     def _compute_duration(self):
         for record in self:
@@ -78,8 +104,33 @@ class ExecutionPlanningTask(models.Model):
             else:
                 record.duration = 0
 
+    @api.depends(
+        'weight', 'date_start', 'date_end',
+        'subtask_ids.subtree_weight', 'subtask_ids.subtree_date_start', 'subtask_ids.subtree_date_end',
+    )
+    def _compute_subtree_rollups(self):
+        for task in self:
+            subtasks = task.subtask_ids
+            task.subtree_weight = task.weight + sum(subtasks.mapped('subtree_weight'))
+            starts = [d for d in [task.date_start] + subtasks.mapped('subtree_date_start') if d]
+            ends = [d for d in [task.date_end] + subtasks.mapped('subtree_date_end') if d]
+            task.subtree_date_start = min(starts) if starts else False
+            task.subtree_date_end = max(ends) if ends else False
+
+    @api.constrains('parent_task_id')
+    def _check_parent_task_recursion(self):
+        if self._has_cycle():
+            raise ValidationError(_("A task cannot be a subtask of itself or of its own subtasks."))
+
+    @api.constrains('weight', 'lot_id')
+    def _check_planning_weight(self):
+        self.planning_id._check_total_weight()
+
     @api.constrains('date_start', 'date_end', 'lot_id')
     def _check_task_dates(self):
+        if self.env.context.get('defer_planning_checks'):
+            self.env['execution.planning']._defer_planning_checks('task', self.ids)
+            return
         for task in self:
             if not task.date_start or not task.date_end:
                 continue
@@ -115,3 +166,51 @@ class ExecutionPlanningTask(models.Model):
                     raise ValidationError(_(
                         "Task '%s': End date (%s) cannot be after lot end date (%s)."
                     ) % (task.name, task.date_end, task.lot_id.end_date))
+
+    def _check_task_dates_sql(self):
+        """Aggregate version of _check_task_dates: one query for all tasks."""
+        if not self:
+            return
+        self.env.cr.execute(SQL(
+            """
+            SELECT t.name, t.date_start, t.date_end,
+                   p.execution_planned_start, p.execution_planned_end,
+                   l.start_date, l.end_date
+              FROM execution_planning_task t
+              JOIN execution_planning_lot l ON l.id = t.lot_id
+              JOIN execution_planning pl ON pl.id = l.planning_id
+              LEFT JOIN project_project p ON p.id = pl.project_id
+             WHERE t.id = ANY(%(task_ids)s)
+               AND (t.date_start > t.date_end
+                    OR t.date_start < p.execution_planned_start
+                    OR t.date_end > p.execution_planned_end
+                    OR t.date_start < l.start_date
+                    OR t.date_end > l.end_date)
+             ORDER BY t.id
+             LIMIT 1
+            """,
+            task_ids=self.ids,
+        ))
+        row = self.env.cr.fetchone()
+        if not row:
+            return
+        name, date_start, date_end, project_start, project_end, lot_start, lot_end = row
+        if date_start > date_end:
+            raise ValidationError(_(
+                "Task '%s': Planned start date (%s) must be before planned end date (%s)."
+            ) % (name, date_start, date_end))
+        if project_start and date_start < project_start:
+            raise ValidationError(_(
+                "Task '%s': Start date (%s) cannot be before project planned start date (%s)."
+            ) % (name, date_start, project_start))
+        if project_end and date_end > project_end:
+            raise ValidationError(_(
+                "Task '%s': End date (%s) cannot be after project planned end date (%s)."
+            ) % (name, date_end, project_end))
+        if date_start < lot_start:
+            raise ValidationError(_(
+                "Task '%s': Start date (%s) cannot be before lot start date (%s)."
+            ) % (name, date_start, lot_start))
+        raise ValidationError(_(
+            "Task '%s': End date (%s) cannot be after lot end date (%s)."
+        ) % (name, date_end, lot_end))
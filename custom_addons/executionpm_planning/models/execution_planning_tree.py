@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Planning Tree
+
+Data of the lazy planning tree served by the planning tree controller: the
+lots first, then one page of tasks per expanded lot or summary task, with
+only the fields the Gantt needs.
+"""
+import hashlib
+
+from odoo import api, models
+from odoo.tools import SQL
+
+
+class ExecutionPlanningTaskTree(models.Model):
+    _inherit = 'execution.planning.task'
+
+    @api.model
+    def _get_tree_fields(self):
+        """Task fields sent to the planning tree. Extended by other modules."""
+        return [
+            'name', 'sequence', 'lot_id', 'parent_task_id',
+            'date_start', 'date_end', 'duration', 'weight', 'is_critical',
+        ]
+
+    @api.model
+    def _get_tree_window_domain(self, date_from=None, date_to=None):
+        """Tasks overlapping the [date_from, date_to] window."""
+        domain = []
+        if date_from:
+            domain.append(('date_end', '>=', date_from))
+        if date_to:
+            domain.append(('date_start', '<=', date_to))
+        return domain
+
+
+class ExecutionPlanningTree(models.Model):
+    _inherit = 'execution.planning'
+
+    # Page size of the task nodes
+    _TREE_PAGE_LIMIT = 200
+    _TREE_MAX_PAGE_LIMIT = 1000
+
+    def _get_tree_etag(self, *params):
+        """
+        Fingerprint of the tree data of the planning and ``params``, from the
+        last write date and the row count of the planning, its lots and its
+        tasks. It is cheap to compute, so unchanged nodes are answered before
+        their data is built.
+        """
+        self.ensure_one()
+        self.flush_recordset(['write_date'])
+        self.env['execution.planning.lot'].flush_model(['planning_id', 'write_date'])
+        self.env['execution.planning.task'].flush_model(['planning_id', 'write_date'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT pl.write_date, l.last_write, l.count, t.last_write, t.count
+              FROM execution_planning pl,
+                   LATERAL (SELECT MAX(write_date), COUNT(*)
+                              FROM execution_planning_lot
+                             WHERE planning_id = pl.id) AS l(last_write, count),
+                   LATERAL (SELECT MAX(write_date), COUNT(*)
+                              FROM execution_planning_task
+                             WHERE planning_id = pl.id) AS t(last_write, count)
+             WHERE pl.id = %s
+            """,
+            self.id,
+        ))
+        state = (self.env.uid, params, self.env.cr.fetchone())
+        return hashlib.sha1(repr(state).encode()).hexdigest()
+
+    def _get_tree_lots(self, date_from=None, date_to=None):
+        """Lots of the planning, with their number of tasks in the date window."""
+        self.ensure_one()
+        Task = self.env['execution.planning.task']
+        task_counts = dict(Task._read_group(
+            [('planning_id', '=', self.id)] + Task._get_tree_window_domain(date_from, date_to),
+            ['lot_id'], ['__count'],
+        ))
+        lots = self.env['execution.planning.lot'].search_fetch(
+            [('planning_id', '=', self.id)], ['name', 'sequence', 'start_date', 'end_date'],
+        )
+        return {
+            'planning': {
+                'id': self.id,
+                'name': self.name,
+                'state': self.state,
+                'start_date': self.planning_start_date,
+                'end_date': self.planning_end_date,
+            },
+            'lots': [{
+                'id': lot.id,
+                'name': lot.name,
+                'sequence': lot.sequence,
+                'start_date': lot.start_date,
+                'end_date': lot.end_date,
+                'task_count': task_counts.get(lot, 0),
+            } for lot in lots],
+        }
+
+    def _get_tree_tasks(self, lot_id, parent_task_id=None, offset=0, limit=None, date_from=None, date_to=None):
+        """
+        One page of the tasks of a lot: its top-level tasks, or the subtasks
+        of ``parent_task_id``.
+        """
+        self.ensure_one()
+        limit = min(limit or self._TREE_PAGE_LIMIT, self._TREE_MAX_PAGE_LIMIT)
+        Task = self.env['execution.planning.task']
+        domain = [
+            ('planning_id', '=', self.id),
+            ('lot_id', '=', lot_id),
+            ('parent_task_id', '=', parent_task_id or False),
+        ] + Task._get_tree_window_domain(date_from, date_to)
+        field_names = Task._get_tree_fields()
+        tasks = Task.search_fetch(domain, field_names, offset=offset, limit=limit)
+        parents = {
+            parent.id for [parent] in Task._read_group(
+                [('parent_task_id', 'in', tasks.ids)], ['parent_task_id'],
+            )
+        }
+
+        records = []
+        for task in tasks:
+            record = {'id': task.id, 'has_children': task.id in parents}
+            for name in field_names:
+                value = task[name]
+                record[name] = value.id if isinstance(value, models.BaseModel) else value
+            records.append(record)
+        return {
+            'records': records,
+            'offset': offset,
+            'limit': limit,
+            'total': offset + len(tasks) if len(tasks) < limit else Task.search_count(domain),
+        }
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
 
 class ProjectProject(models.Model):
     _inherit = 'project.project'
@@ -16,6 +17,8 @@ class ProjectProject(models.Model):
         string='Active Planning',
         compute='_compute_active_planning',
         store=True,
+        index='btree_not_null',
+        help='Latest approved planning of the project, the reference schedule of its execution.',
     )
     
     planning_count = fields.Integer(compute='_compute_planning_count')
@@ -36,12 +39,62 @@ class ProjectProject(models.Model):
             'context': {'default_project_id': self.id},
         }
 
-    @api.depends('planning_ids.state')
+    @api.depends('planning_ids.state', 'planning_ids.active', 'planning_ids.approved_date')
     def _compute_active_planning(self):
+        """Latest approved and active planning of each project, in one query."""
+        project_ids = [project_id for project_id in self._origin.ids if project_id]
+        active_plannings = {}
+        if project_ids:
+            self.env['execution.planning'].flush_model(['project_id', 'state', 'active', 'approved_date'])
+            self.env.cr.execute(SQL(
+                """
+                SELECT DISTINCT ON (project_id) project_id, id
+                  FROM execution_planning
+                 WHERE project_id = ANY(%(project_ids)s)
+                   AND state = 'approved'
+                   AND active
+                 ORDER BY project_id, approved_date DESC NULLS LAST, id DESC
+                """,
+                project_ids=project_ids,
+            ))
+            active_plannings = dict(self.env.cr.fetchall())
         for project in self:
-            # Get the latest approved planning
-            approved = project.planning_ids.filtered(lambda p: p.state == 'approved')
-            project.active_planning_id = approved[:1] if approved else False
+            project.active_planning_id = active_plannings.get(project._origin.id, False)
+
+    @api.model
+    def _recompute_active_planning_all(self):
+        """
+        Recompute the active planning of every project with a single UPDATE,
+        e.g. after an upgrade. Only the projects whose pointer changed are
+        marked as modified.
+        """
+        self.env['execution.planning'].flush_model(['project_id', 'state', 'active', 'approved_date'])
+        self.flush_model(['active_planning_id'])
+        self.env.cr.execute(SQL(
+            """
+            UPDATE project_project p
+               SET active_planning_id = latest.planning_id
+              FROM (
+                   SELECT project.id AS project_id, (
+                          SELECT pl.id
+                            FROM execution_planning pl
+                           WHERE pl.project_id = project.id
+                             AND pl.state = 'approved'
+                             AND pl.active
+                           ORDER BY pl.approved_date DESC NULLS LAST, pl.id DESC
+                           LIMIT 1
+                   ) AS planning_id
+                     FROM project_project project
+              ) latest
+             WHERE p.id = latest.project_id
+               AND p.active_planning_id IS DISTINCT FROM latest.planning_id
+         RETURNING p.id
+            """
+        ))
+        projects = self.browse([row[0] for row in self.env.cr.fetchall()])
+        projects.invalidate_recordset(['active_planning_id'])
+        projects.modified(['active_planning_id'])
+        return projects
 
     def action_set_running(self):
         """Override to enforce planning requirement."""
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
+import io
+from datetime import timedelta
+
+from odoo import fields
 from odoo.tests.common import TransactionCase
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
 
 class TestExecutionPlanning(TransactionCase):
 
@@ -70,3 +74,414 @@ class TestExecutionPlanning(TransactionCase):
         self.assertEqual(planning.state, 'approved')
         self.assertEqual(planning.approved_by, self.env.user)
         self.assertTrue(planning.approved_date)
+
+    def _create_project(self):
+        # One active planning per project
+        return self.env['project.project'].create({
+            'name': 'Planning Test Project',
+            'is_execution_project': True,
+        })
+
+    def _create_dated_planning(self, task_count, project=None):
+        today = fields.Date.today()
+        planning = self.env['execution.planning'].create({
+            'name': 'Sync Planning',
+            'project_id': (project or self._create_project()).id,
+        })
+        lot = self.env['execution.planning.lot'].create({
+            'name': 'Lot 1',
+            'planning_id': planning.id,
+            'start_date': today,
+            'end_date': today + timedelta(days=task_count),
+        })
+        # Weights are stored with 3 digits: the last task takes the rounding remainder
+        weight = round(100.0 / task_count, 3)
+        weights = [weight] * (task_count - 1) + [round(100.0 - weight * (task_count - 1), 3)]
+        tasks = self.env['execution.planning.task'].create([{
+            'name': 'Task %s' % index,
+            'lot_id': lot.id,
+            'date_start': today + timedelta(days=index),
+            'date_end': today + timedelta(days=index + 1),
+            'weight': weights[index],
+        } for index in range(task_count)])
+        # Every second task is a subtask of the first one
+        tasks[1::2].write({'parent_task_id': tasks[0].id})
+        return planning, tasks
+
+    def test_03_project_task_sync(self):
+        """Planning tasks are synchronized to project tasks with their hierarchy"""
+        planning, tasks = self._create_dated_planning(6)
+        planning._sync_to_project_tasks()
+
+        project_tasks = tasks.project_task_id
+        self.assertEqual(len(project_tasks), 6)
+        self.assertEqual(project_tasks.execution_planning_task_id, tasks)
+        self.assertEqual(tasks[1::2].project_task_id.parent_id, tasks[0].project_task_id)
+        self.assertFalse(tasks[0::2].project_task_id.parent_id)
+
+        # A second sync only writes what changed
+        tasks[2].name = 'Renamed Task'
+        planning._sync_to_project_tasks()
+        self.assertEqual(tasks.project_task_id, project_tasks)
+        self.assertEqual(tasks[2].project_task_id.name, 'Renamed Task')
+
+    def test_04_project_task_sync_query_count(self):
+        """Sync query count stays flat as planning tasks are added"""
+        query_counts = []
+        for task_count in (20, 80):
+            planning, tasks = self._create_dated_planning(task_count)
+            self.env.flush_all()
+            query_start = self.env.cr.sql_log_count
+            planning._sync_to_project_tasks()
+            self.env.flush_all()
+            query_counts.append(self.env.cr.sql_log_count - query_start)
+        self.assertLessEqual(query_counts[1] - query_counts[0], 5)
+
+    def _import(self, content, file_format):
+        planning = self.env['execution.planning'].create({
+            'name': 'Imported Planning',
+            'project_id': self._create_project().id,
+        })
+        result = self.env['execution.planning.import']._import_schedule(
+            planning, io.BytesIO(content.encode()), file_format,
+        )
+        return planning, result
+
+    def test_05_import_csv(self):
+        """CSV import creates lots, the task hierarchy and keeps the given weights"""
+        planning, result = self._import(
+            "code;name;lot;parent_code;start;end;weight\n"
+            "1.1;Excavation;Civil Works;1;2025-01-10;2025-01-20;40\n"
+            "1;Earthworks;Civil Works;;2025-01-05;2025-02-10;0\n"
+            "2;Wiring;Electrical;;2025-02-01;2025-03-01;60\n",
+            'csv',
+        )
+        self.assertEqual(result, {'lot_count': 2, 'task_count': 3})
+        tasks = planning.lot_ids.task_ids
+        excavation = tasks.filtered(lambda t: t.name == 'Excavation')
+        self.assertEqual(excavation.parent_task_id.name, 'Earthworks')
+        civil = planning.lot_ids.filtered(lambda l: l.name == 'Civil Works')
+        self.assertEqual(civil.start_date, fields.Date.to_date('2025-01-05'))
+        self.assertEqual(civil.end_date, fields.Date.to_date('2025-02-10'))
+        self.assertAlmostEqual(planning.total_physical_weight, 100.0)
+
+        # Weights above 100% are rejected before anything is written
+        with self.assertRaises(UserError):
+            self._import(
+                "name,start,end,weight\n"
+                "A,2025-01-01,2025-01-02,70\n"
+                "B,2025-01-01,2025-01-02,70\n",
+                'csv',
+            )
+
+    def test_06_import_msproject(self):
+        """MS Project outline levels map to lots and subtasks, weights follow durations"""
+        planning, result = self._import(
+            '<?xml version="1.0"?>'
+            '<Project xmlns="http://schemas.microsoft.com/project"><Tasks>'
+            '<Task><UID>0</UID><Name>Project</Name><OutlineLevel>0</OutlineLevel><Summary>1</Summary></Task>'
+            '<Task><UID>1</UID><Name>Lot A</Name><OutlineLevel>1</OutlineLevel><Summary>1</Summary>'
+            '<Start>2025-01-01T08:00:00</Start><Finish>2025-01-30T17:00:00</Finish></Task>'
+            '<Task><UID>2</UID><Name>Phase</Name><OutlineLevel>2</OutlineLevel><Summary>1</Summary>'
+            '<Start>2025-01-01T08:00:00</Start><Finish>2025-01-30T17:00:00</Finish></Task>'
+            '<Task><UID>3</UID><Name>Step 1</Name><OutlineLevel>3</OutlineLevel><Summary>0</Summary>'
+            '<Start>2025-01-01T08:00:00</Start><Finish>2025-01-10T17:00:00</Finish></Task>'
+            '<Task><UID>4</UID><Name>Step 2</Name><OutlineLevel>3</OutlineLevel><Summary>0</Summary>'
+            '<Start>2025-01-11T08:00:00</Start><Finish>2025-01-30T17:00:00</Finish></Task>'
+            '</Tasks></Project>',
+            'msproject',
+        )
+        self.assertEqual(result, {'lot_count': 1, 'task_count': 3})
+        self.assertEqual(planning.lot_ids.name, 'Lot A')
+        tasks = planning.lot_ids.task_ids
+        phase = tasks.filtered(lambda t: t.name == 'Phase')
+        self.assertEqual(phase.subtask_ids.mapped('name'), ['Step 1', 'Step 2'])
+        self.assertEqual(phase.weight, 0.0)
+        self.assertAlmostEqual(sum(phase.subtask_ids.mapped('weight')), 100.0)
+        self.assertAlmostEqual(phase.subtask_ids[0].weight, 33.333)
+
+    def test_07_import_xer(self):
+        """XER tasks are grouped by their top-level WBS node"""
+        planning, result = self._import(
+            "ERMHDR\t19.12\n"
+            "%T\tPROJWBS\n"
+            "%F\twbs_id\tproj_node_flag\tparent_wbs_id\twbs_name\n"
+            "%R\t10\tY\t\tProject\n"
+            "%R\t11\tN\t10\tStructure\n"
+            "%R\t12\tN\t11\tFoundations\n"
+            "%T\tTASK\n"
+            "%F\ttask_id\twbs_id\ttask_name\ttask_type\ttarget_start_date\ttarget_end_date\n"
+            "%R\t100\t12\tPiles\tTT_Task\t2025-01-01 08:00\t2025-01-05 17:00\n"
+            "%R\t101\t11\tSlab\tTT_Task\t2025-01-06 08:00\t2025-01-10 17:00\n"
+            "%E\n",
+            'xer',
+        )
+        self.assertEqual(result, {'lot_count': 1, 'task_count': 2})
+        self.assertEqual(planning.lot_ids.name, 'Structure')
+        self.assertAlmostEqual(planning.total_physical_weight, 100.0)
+
+    def test_08_deferred_planning_checks(self):
+        """Deferred checks run once, with the messages of the immediate constraints"""
+        planning, tasks = self._create_dated_planning(4)
+        Planning = self.env['execution.planning']
+
+        # Intermediate states may break the rules until the checks run
+        deferred_tasks = tasks.with_context(defer_planning_checks=True)
+        deferred_tasks[0].weight = 80.0
+        deferred_tasks[1].date_start = deferred_tasks[1].date_end + timedelta(days=1)
+        deferred_tasks[1].date_start = deferred_tasks[1].date_end
+        deferred_tasks[0].weight = 25.0
+        Planning._flush_planning_checks()
+
+        deferred_tasks[2].weight = 60.0
+        with self.assertRaisesRegex(ValidationError, 'Total Physical Weight cannot surpass 100%'):
+            Planning._flush_planning_checks()
+        deferred_tasks[2].weight = 25.0
+
+        lot = planning.lot_ids
+        planning.with_context(defer_planning_checks=True).lot_ids.end_date = tasks[-1].date_end - timedelta(days=1)
+        with self.assertRaisesRegex(ValidationError, "Lot 'Lot 1': End date .* would exclude task 'Task 3'"):
+            Planning._flush_planning_checks()
+
+        # Nested edits through the planning are checked when the write ends
+        with self.assertRaisesRegex(ValidationError, "Task 'Task 0': Start date .* cannot be before lot start date"):
+            planning.write({'lot_ids': [(1, lot.id, {
+                'end_date': tasks[-1].date_end,
+                'task_ids': [(1, tasks[0].id, {'date_start': lot.start_date - timedelta(days=1)})],
+            })]})
+
+    def test_09_critical_path(self):
+        """CPM dates follow the links and are updated incrementally"""
+        planning, tasks = self._create_dated_planning(4)
+        Dependency = self.env['execution.planning.task.dependency']
+        # Task 0 -> Task 2 (FS, 1 day lag) -> Task 3 (SS); Task 1 is free
+        Dependency.create([
+            {'predecessor_id': tasks[0].id, 'successor_id': tasks[2].id, 'lag_days': 1},
+            {'predecessor_id': tasks[2].id, 'successor_id': tasks[3].id, 'dependency_type': 'ss'},
+        ])
+        self.env['execution.planning']._flush_critical_path()
+
+        today = tasks[0].date_start
+        self.assertEqual(tasks[2].early_start, today + timedelta(days=3))
+        self.assertEqual(tasks[3].early_start, today + timedelta(days=3))
+        self.assertEqual(planning.critical_path_end_date, today + timedelta(days=4))
+        self.assertEqual(tasks.mapped('is_critical'), [True, False, True, True])
+        self.assertEqual(tasks[1].total_float, 2)
+
+        # A longer first task pushes its successors and the planning end
+        tasks[0].date_end = today + timedelta(days=3)
+        self.env['execution.planning']._flush_critical_path()
+        self.assertEqual(tasks[2].early_start, today + timedelta(days=5))
+        self.assertEqual(tasks[3].early_finish, today + timedelta(days=6))
+        self.assertEqual(tasks[1].total_float, 4)
+
+        Dependency.create({'predecessor_id': tasks[3].id, 'successor_id': tasks[0].id})
+        with self.assertRaisesRegex(ValidationError, 'Circular dependency'):
+            self.env['execution.planning']._flush_critical_path()
+
+    def test_10_planning_tree(self):
+        """The planning tree serves lots, then pages of top-level tasks or subtasks"""
+        planning, tasks = self._create_dated_planning(6)
+        lot = planning.lot_ids
+
+        tree = planning._get_tree_lots()
+        self.assertEqual(tree['lots'][0]['id'], lot.id)
+        self.assertEqual(tree['lots'][0]['task_count'], 6)
+
+        page = planning._get_tree_tasks(lot.id, limit=2)
+        self.assertEqual(page['total'], 3)
+        self.assertEqual([record['id'] for record in page['records']], tasks[0:4:2].ids)
+        self.assertTrue(page['records'][0]['has_children'])
+        self.assertFalse(page['records'][1]['has_children'])
+
+        subtasks = planning._get_tree_tasks(lot.id, parent_task_id=tasks[0].id)
+        self.assertEqual([record['id'] for record in subtasks['records']], tasks[1::2].ids)
+        self.assertEqual(subtasks['records'][0]['parent_task_id'], tasks[0].id)
+
+        # Date window
+        window = planning._get_tree_tasks(lot.id, date_from=tasks[4].date_start)
+        self.assertEqual([record['id'] for record in window['records']], tasks[4].ids)
+
+        # The ETag only depends on the request and the last changes of the planning
+        etag = planning._get_tree_etag('_get_tree_lots', [])
+        self.assertEqual(planning._get_tree_etag('_get_tree_lots', []), etag)
+        self.assertNotEqual(planning._get_tree_etag('_get_tree_lots', [('date_from', tasks[4].date_start)]), etag)
+        tasks[5].unlink()
+        self.assertNotEqual(planning._get_tree_etag('_get_tree_lots', []), etag)
+
+    def test_11_subtree_rollups(self):
+        """Summary tasks roll up the weight and dates of their subtree"""
+        planning, tasks = self._create_dated_planning(6)
+        root, leaf = tasks[0], tasks[5]
+        self.assertEqual(
+            self.env['execution.planning.task'].search([('id', 'child_of', root.id)]),
+            root | tasks[1::2],
+        )
+        self.assertAlmostEqual(root.subtree_weight, 4 * 100.0 / 6, places=2)
+        self.assertEqual(root.subtree_date_start, root.date_start)
+        self.assertEqual(root.subtree_date_end, leaf.date_end)
+
+        # One level deeper: the change climbs up to the root
+        tasks[1].parent_task_id = tasks[3]
+        tasks[3].parent_task_id = leaf
+        leaf.weight = 0.0
+        self.assertAlmostEqual(root.subtree_weight, 3 * 100.0 / 6, places=2)
+        self.assertEqual(root.subtree_date_end, leaf.date_end)
+        self.assertIn(str(root.id), tasks[1].parent_path.split('/'))
+
+        with self.assertRaises(ValidationError):
+            root.parent_task_id = tasks[1]
+
+    def test_12_baseline_variance(self):
+        """Baselines restore the captured tasks and report the variance in one pass"""
+        planning, tasks = self._create_dated_planning(4)
+        planning.action_capture_baseline()
+        baseline = planning.baseline_ids
+        self.assertEqual(baseline.task_count, 4)
+        self.assertAlmostEqual(baseline.total_weight, 100.0)
+
+        snapshot = baseline._unpack_snapshot()
+        self.assertEqual([row[0] for row in snapshot], tasks.ids)
+        self.assertEqual(snapshot[2][1:4], (tasks[2].date_start, tasks[2].date_end, 25.0))
+        self.assertEqual(snapshot[2][4:], ('Lot 1', 'Task 2'))
+
+        tasks[2].date_end += timedelta(days=1)
+        tasks[3].unlink()
+        self.env['execution.planning.task'].create({
+            'name': 'New Task',
+            'lot_id': planning.lot_ids.id,
+            'date_start': tasks[0].date_start,
+            'date_end': tasks[0].date_end,
+        })
+        lines = {line['task_name']: line for line in baseline._get_variance(planning)}
+        self.assertEqual(lines['Task 0']['status'], 'unchanged')
+        self.assertEqual(lines['Task 2']['status'], 'changed')
+        self.assertEqual(lines['Task 2']['finish_variance'], 1)
+        self.assertEqual(lines['Task 3']['status'], 'removed')
+        self.assertEqual(lines['New Task']['status'], 'added')
+
+        action = baseline.action_view_variance()
+        variance = self.env['execution.planning.baseline.variance'].search(action['domain'])
+        self.assertEqual(len(variance), 5)
+
+    def test_12_baseline_variance_duplicate_names(self):
+        """Tasks sharing a name in a lot are matched in order across plannings"""
+        planning, tasks = self._create_dated_planning(4)
+        revision, revision_tasks = self._create_dated_planning(4)
+        (tasks[1:3] | revision_tasks[1:3]).write({'name': 'Excavation'})
+        planning.action_capture_baseline()
+
+        lines = planning.baseline_ids._get_variance(revision)
+        self.assertEqual(len(lines), 4)
+        self.assertEqual({line['status'] for line in lines}, {'unchanged'})
+        self.assertEqual(
+            [line['task_id'] for line in lines if line['task_name'] == 'Excavation'],
+            revision_tasks[1:3].ids,
+        )
+
+    def test_13_revision_diff(self):
+        """The revision diff reports added, removed, moved and changed tasks"""
+        planning, tasks = self._create_dated_planning(4)
+        planning.action_submit()
+        planning.action_reset_draft()
+        self.assertEqual(len(planning.baseline_ids), 1)
+
+        lot = planning.lot_ids
+        lot_2 = self.env['execution.planning.lot'].create({
+            'name': 'Lot 2',
+            'planning_id': planning.id,
+            'start_date': lot.start_date,
+            'end_date': lot.end_date,
+        })
+        tasks[1].date_start -= timedelta(days=1)
+        tasks[2].lot_id = lot_2
+        tasks[3].unlink()
+        self.env['execution.planning.task'].create({
+            'name': 'Task 4',
+            'lot_id': lot.id,
+            'date_start': lot.start_date,
+            'date_end': lot.start_date,
+        })
+
+        diff = planning.get_revision_diff()
+        self.assertEqual(diff['summary'], {'added': 1, 'removed': 1, 'moved': 1, 'changed': 1})
+        changes = {change['task_name']: change for change in diff['changes']}
+        self.assertEqual(changes['Task 1']['start_shift'], -1)
+        self.assertEqual(changes['Task 2']['new_lot_name'], 'Lot 2')
+        self.assertEqual(changes['Task 3']['change_type'], 'removed')
+        self.assertAlmostEqual(changes['Task 3']['weight_change'], -25.0)
+
+        # Across plannings, tasks are matched by lot and name, then by name
+        other_planning, _other_tasks = self._create_dated_planning(4)
+        changes = self.env['execution.planning.diff']._diff(other_planning, planning)
+        self.assertEqual(
+            sorted(change['change_type'] for change in changes),
+            ['added', 'changed', 'moved', 'removed'],
+        )
+
+    def test_13_revision_diff_duplicate_names(self):
+        """Tasks sharing a name in a lot are all part of the diff"""
+        planning, tasks = self._create_dated_planning(4)
+        revision, revision_tasks = self._create_dated_planning(4)
+        (tasks[1:3] | revision_tasks[1:3]).write({'name': 'Excavation'})
+        revision_tasks[2].date_end += timedelta(days=2)
+        revision_tasks[3].name = 'Excavation'
+
+        Diff = self.env['execution.planning.diff']
+        matches = list(Diff._match_rows(
+            Diff._get_planning_rows(planning), Diff._get_planning_rows(revision), False,
+        ))
+        self.assertEqual(len(matches), 5)
+        changes = Diff._diff(planning, revision)
+        self.assertEqual(sorted(
+            (change['change_type'], change['task_id']) for change in changes
+        ), [
+            ('added', revision_tasks[3].id),
+            ('changed', revision_tasks[2].id),
+            ('removed', False),
+        ])
+
+    def test_14_active_planning(self):
+        """The active planning is the latest approved one, revisions are allowed alongside"""
+        first, _tasks = self._create_dated_planning(2)
+        project = first.project_id
+        first.action_submit()
+        first.action_approve()
+        self.assertEqual(project.active_planning_id, first)
+
+        # A draft revision does not replace the approved planning
+        revision, _tasks = self._create_dated_planning(2, project=project)
+        self.assertEqual(project.active_planning_id, first)
+        revision.action_submit()
+        revision.action_approve()
+        self.assertEqual(project.active_planning_id, revision)
+        self.assertFalse(first.active)
+
+        # Portfolio recomputation in one query
+        self.env.cr.execute("UPDATE project_project SET active_planning_id = NULL WHERE id = %s", [project.id])
+        project.invalidate_recordset(['active_planning_id'])
+        self.assertEqual(self.env['project.project']._recompute_active_planning_all(), project)
+        self.assertEqual(project.active_planning_id, revision)
+
+    def test_14_approve_revision_as_pmo(self):
+        """A PMO user approves a revision that supersedes the approved planning"""
+        pmo_user = self.env['res.users'].create({
+            'name': 'PMO User',
+            'login': 'planning_pmo_user',
+            'groups_id': [(6, 0, [
+                self.env.ref('base.group_user').id,
+                self.env.ref('executionpm_core.group_executionpm_pmo').id,
+            ])],
+        })
+        first, _tasks = self._create_dated_planning(2)
+        project = first.project_id
+        first.action_submit()
+        first.action_approve()
+
+        revision, _tasks = self._create_dated_planning(2, project=project)
+        revision.action_submit()
+        revision.with_user(pmo_user).action_approve()
+        self.assertEqual(revision.state, 'approved')
+        self.assertEqual(revision.approved_by, pmo_user)
+        self.assertFalse(first.active)
+        self.assertEqual(project.active_planning_id, revision)
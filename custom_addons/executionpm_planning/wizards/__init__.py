@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+from . import planning_import_wizard
+from . import planning_diff_wizard
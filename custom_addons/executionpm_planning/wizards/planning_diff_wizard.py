@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, _
+from odoo.exceptions import UserError
+
+
+class ExecutionPlanningDiffWizard(models.TransientModel):
+    _name = 'execution.planning.diff.wizard'
+    _description = 'Planning Revision Review'
+
+    planning_id = fields.Many2one(
+        'execution.planning',
+        string='Planning',
+        required=True,
+        ondelete='cascade',
+    )
+    compare_to = fields.Selection([
+        ('baseline', 'Baseline'),
+        ('planning', 'Another Planning'),
+    ], string='Compare With', required=True, default='baseline')
+    baseline_id = fields.Many2one(
+        'execution.planning.baseline',
+        string='Baseline',
+        domain="[('project_id', '=', project_id)]",
+    )
+    other_planning_id = fields.Many2one(
+        'execution.planning',
+        string='Other Planning',
+        domain="[('project_id', '=', project_id), ('id', '!=', planning_id), ('active', 'in', (True, False))]",
+    )
+    project_id = fields.Many2one(related='planning_id.project_id')
+    line_ids = fields.One2many(
+        'execution.planning.diff.line',
+        'wizard_id',
+        string='Changes',
+        readonly=True,
+    )
+    added_count = fields.Integer(string='Added', readonly=True)
+    removed_count = fields.Integer(string='Removed', readonly=True)
+    moved_count = fields.Integer(string='Moved', readonly=True)
+    changed_count = fields.Integer(string='Changed', readonly=True)
+
+    def action_compute_diff(self):
+        self.ensure_one()
+        reference = self.baseline_id if self.compare_to == 'baseline' else self.other_planning_id
+        if not reference:
+            raise UserError(_("Please select what to compare the planning with."))
+
+        diff = self.planning_id.get_revision_diff(
+            baseline_id=self.baseline_id.id if self.compare_to == 'baseline' else None,
+            planning_id=self.other_planning_id.id if self.compare_to == 'planning' else None,
+        )
+        self.line_ids.unlink()
+        self.env['execution.planning.diff.line'].create([
+            dict(change, wizard_id=self.id) for change in diff['changes']
+        ])
+        self.write({'%s_count' % change_type: count for change_type, count in diff['summary'].items()})
+        return self._get_action()
+
+    def _get_action(self):
+        return {
+            'name': _('Review Changes'),
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+
+class ExecutionPlanningDiffLine(models.TransientModel):
+    _name = 'execution.planning.diff.line'
+    _description = 'Planning Revision Change'
+    _order = 'change_type, new_lot_name, old_lot_name, new_start, id'
+
+    wizard_id = fields.Many2one(
+        'execution.planning.diff.wizard',
+        string='Review',
+        required=True,
+        ondelete='cascade',
+    )
+    change_type = fields.Selection([
+        ('added', 'Added'),
+        ('removed', 'Removed'),
+        ('moved', 'Moved'),
+        ('changed', 'Changed'),
+    ], string='Change', required=True)
+    task_id = fields.Many2one('execution.planning.task', string='Task', ondelete='set null')
+    task_name = fields.Char(string='Task Name')
+    old_lot_name = fields.Char(string='Previous Lot')
+    new_lot_name = fields.Char(string='Lot')
+    old_start = fields.Date(string='Previous Start')
+    new_start = fields.Date(string='Start')
+    old_end = fields.Date(string='Previous End')
+    new_end = fields.Date(string='End')
+    start_shift = fields.Integer(string='Start Shift (Days)')
+    finish_shift = fields.Integer(string='Finish Shift (Days)')
+    old_weight = fields.Float(string='Previous Weight (%)', digits=(5, 3))
+    new_weight = fields.Float(string='Weight (%)', digits=(5, 3))
+    weight_change = fields.Float(string='Weight Change (%)', digits=(5, 3))
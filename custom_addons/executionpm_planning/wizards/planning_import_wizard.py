@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import base64
+import io
+
+from odoo import fields, models, _
+from odoo.exceptions import UserError
+
+
+class ExecutionPlanningImportWizard(models.TransientModel):
+    _name = 'execution.planning.import.wizard'
+    _description = 'Planning Schedule Import Wizard'
+
+    planning_id = fields.Many2one(
+        'execution.planning',
+        string='Planning',
+        required=True,
+        ondelete='cascade',
+    )
+    import_file = fields.Binary(string='Schedule File', required=True)
+    import_filename = fields.Char(string='File Name')
+    file_format = fields.Selection([
+        ('auto', 'Detect from File'),
+        ('msproject', 'MS Project XML'),
+        ('xer', 'Primavera XER'),
+        ('csv', 'CSV'),
+    ], string='Format', required=True, default='auto',
+        help='CSV columns: name, start, end, and optionally code, parent_code, lot, weight.\n'
+             'Without weights, the 100% is spread over the leaf tasks by duration.')
+
+    def action_import(self):
+        self.ensure_one()
+        if not self.import_file:
+            raise UserError(_("Please select a schedule file to import."))
+
+        fileobj = io.BytesIO(base64.b64decode(self.import_file))
+        result = self.env['execution.planning.import']._import_schedule(
+            self.planning_id, fileobj, self.file_format, self.import_filename,
+        )
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'success',
+                'message': _("%s tasks imported in %s lots.") % (result['task_count'], result['lot_count']),
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
@@ -17,6 +17,7 @@ Key Features:
 * Request Correction workflow
 * Timestamped, immutable validation decisions
 * Automatic KPI updates on validation
+* Bulk validation from the list view, large batches run in background
 * Complete audit trail
     """,
     'author': 'Your Company',
@@ -26,6 +27,7 @@ Key Features:
     'data': [
         'security/executionpm_validation_security.xml',
         'security/ir.model.access.csv',
+        'data/bulk_validation_cron.xml',
         'wizards/validation_wizard_views.xml',
         'views/execution_validation_views.xml',
         'views/execution_progress_views.xml',
@@ -13,12 +13,22 @@ class ExecutionPlanningTask(models.Model):
     pending_declaration_count = fields.Integer(
         string='Pending Declarations',
         compute='_compute_pending_stats',
+        store=True,
     )
 
     @api.depends('progress_declaration_ids.state')
     def _compute_pending_stats(self):
+        """Count the pending declarations of the whole batch in one query."""
+        counts = {
+            task.id: count
+            for task, count in self.env['execution.progress']._read_group(
+                [('task_id', 'in', self._origin.ids), ('state', 'in', ('submitted', 'under_review'))],
+                ['task_id'], ['__count'],
+            )
+        }
         for task in self:
-            declarations = task.progress_declaration_ids
-            task.pending_declaration_count = len(declarations.filtered(
-                lambda d: d.state in ('submitted', 'under_review')
-            ))
+            task.pending_declaration_count = counts.get(task._origin.id, 0)
+
+    def _propagate_progress(self):
+        super()._propagate_progress()
+        self.planning_id.project_id._update_execution_progress()
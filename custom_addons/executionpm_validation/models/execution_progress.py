@@ -1,7 +1,14 @@
 # -*- coding: utf-8 -*-
+import logging
+from collections import defaultdict
+
+from markupsafe import Markup
+
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
 
+_logger = logging.getLogger(__name__)
+
 
 class ExecutionProgress(models.Model):
     """
@@ -59,6 +66,21 @@ class ExecutionProgress(models.Model):
         help='Comments from validator requesting corrections',
     )
 
+    # Background bulk validation queue
+    validation_requested_by = fields.Many2one(
+        comodel_name='res.users',
+        string='Validation Queued By',
+        readonly=True,
+        copy=False,
+        index='btree_not_null',
+        help='Set while the declaration waits for validation in a background bulk job.',
+    )
+
+    # Selections up to this size are validated immediately by the bulk action
+    _BULK_VALIDATION_SYNC_LIMIT = 100
+    # Declarations validated per background job run
+    _BULK_VALIDATION_CHUNK_SIZE = 100
+
     @api.depends('validation_ids')
     def _compute_validation_count(self):
         for record in self:
@@ -100,50 +122,118 @@ class ExecutionProgress(models.Model):
     # -------------------------------------------------------------------------
     def action_validate(self):
         """
-        Formally validate the progress declaration.
-        Creates immutable validation record and updates KPIs.
+        Formally validate the progress declarations.
+        Creates immutable validation records and updates KPIs. Several
+        declarations are validated together: one validation create, one
+        write per task progress value and one chatter message per project.
         """
-        self.ensure_one()
-        
-        if self.state not in ('submitted', 'under_review'):
+        if not self:
+            return True
+
+        if any(record.state not in ('submitted', 'under_review') for record in self):
             raise UserError(_('Only submitted or under-review declarations can be validated.'))
-        
-        # Create immutable validation record
-        self.env['execution.validation'].create({
-            'progress_id': self.id,
+
+        # Create immutable validation records
+        self.env['execution.validation'].create([{
+            'progress_id': record.id,
             'decision': 'validated',
             'comment': _('Progress validated'),
-        })
-        
-        # Update task's actual progress
-        self.task_id.write({
-            'actual_progress': self.declared_percentage,
-        })
-        
+        } for record in self])
+
+        # Update tasks' actual progress (progressive, so the highest percentage wins)
+        task_progress = {}
+        for record in self:
+            task_progress[record.task_id] = max(
+                task_progress.get(record.task_id, 0.0), record.declared_percentage)
+        tasks_by_progress = defaultdict(lambda: self.env['execution.planning.task'])
+        for task, percentage in task_progress.items():
+            tasks_by_progress[percentage] |= task
+        for percentage, tasks in tasks_by_progress.items():
+            tasks.write({'actual_progress': percentage})
+
         # Update progress declaration state
         self.write({
             'state': 'validated',
             'validated_by': self.env.user.id,
             'validated_date': fields.Date.today(),
             'rejection_reason': False,
+            'validation_requested_by': False,
         })
-        
+
         # Post to project chatter
-        self.project_id.message_post(
-            body=_('✓ Progress VALIDATED for task "%s": %.2f%% (Validated by %s)') % (
-                self.task_id.name,
-                self.declared_percentage,
-                self.env.user.name,
-            ),
-            message_type='notification',
-            subtype_xmlid='mail.mt_note',
-        )
-        
+        for project, records in self.grouped('project_id').items():
+            lines = [
+                _('✓ Progress VALIDATED for task "%s": %.2f%% (Validated by %s)') % (
+                    record.task_id.name,
+                    record.declared_percentage,
+                    self.env.user.name,
+                )
+                for record in records
+            ]
+            project.message_post(
+                body=lines[0] if len(lines) == 1 else Markup('<br/>').join(lines),
+                message_type='notification',
+                subtype_xmlid='mail.mt_note',
+            )
+
         # Trigger project progress recalculation
         self._update_project_progress()
-        
+
         return True
 
+    def action_validate_bulk(self):
+        """
+        Validate the selected declarations from the list view.
+        Large selections are queued and validated in the background by chunks.
+        """
+        declarations = self.filtered(lambda r: r.state in ('submitted', 'under_review'))
+        if not declarations:
+            raise UserError(_('None of the selected declarations is submitted or under review.'))
+
+        if len(declarations) <= self._BULK_VALIDATION_SYNC_LIMIT:
+            declarations.action_validate()
+            message = _('%d declarations validated.') % len(declarations)
+        else:
+            declarations.write({'validation_requested_by': self.env.uid})
+            self.env.ref('executionpm_validation.ir_cron_bulk_validation').sudo()._trigger()
+            message = _('%d declarations queued. They will be validated in the background.') % len(declarations)
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Bulk Validation'),
+                'message': message,
+                'type': 'success',
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
+    @api.model
+    def _cron_process_bulk_validation(self):
+        """Validate one chunk of the queued declarations, as the user who queued them."""
+        queued = self.search([('validation_requested_by', '!=', False)], order='id')
+        chunk = queued[:self._BULK_VALIDATION_CHUNK_SIZE]
+        for user, records in chunk.grouped('validation_requested_by').items():
+            to_validate = records.filtered(lambda r: r.state in ('submitted', 'under_review'))
+            (records - to_validate).write({'validation_requested_by': False})
+            try:
+                with self.env.cr.savepoint():
+                    to_validate.with_user(user).action_validate()
+            except (UserError, ValidationError):
+                # Validate one by one so a single invalid declaration does not block the chunk
+                for record in to_validate:
+                    try:
+                        with self.env.cr.savepoint():
+                            record.with_user(user).action_validate()
+                    except (UserError, ValidationError) as error:
+                        _logger.warning("Bulk validation of %s failed: %s", record.name, error)
+                        record.write({'validation_requested_by': False})
+
+        self.env['ir.cron']._notify_progress(
+            done=len(chunk), remaining=len(queued) - len(chunk))
+
     def action_reject(self):
         """Open rejection wizard with mandatory comment."""
         self.ensure_one()
@@ -253,48 +343,9 @@ class ExecutionProgress(models.Model):
         )
 
     def _update_project_progress(self):
-        """Recalculate project overall progress based on validated task progress."""
-        for record in self:
-            project = record.project_id
-            if not project or not project.is_execution_project:
-                continue
-            
-            # Get all tasks from approved planning
-            planning = project.active_planning_id
-            if not planning:
-                continue
-            
-            tasks = planning.lot_ids.mapped('task_ids')
-            if not tasks:
-                continue
-            
-            # Calculate weighted progress
-            total_weight = sum(tasks.mapped('weight'))
-            if total_weight <= 0:
-                continue
-            
-            weighted_progress = sum(
-                task.actual_progress * task.weight / total_weight
-                for task in tasks
-            )
-            
-            project_vals = {
-                'execution_progress': weighted_progress,
-                'execution_physical_progress': weighted_progress,
-            }
-
-            # Automation Rule: Set Actual Start at first validated execution
-            validated_declarations = self.env['execution.progress'].search([
-                ('project_id', '=', project.id),
-                ('state', '=', 'validated')
-            ])
-            if validated_declarations:
-                # Set start date to the earliest execution date of validated declarations
-                if not project.execution_actual_start:
-                    project_vals['execution_actual_start'] = min(validated_declarations.mapped('execution_date'))
-                
-                # Automation Rule: Set Actual End when all tasks reach 100%
-                if weighted_progress >= 99.99: # Account for float precision
-                    project_vals['execution_actual_end'] = max(validated_declarations.mapped('execution_date'))
-            
-            project.write(project_vals)
+        """
+        Queue the recalculation of project overall progress.
+        Projects are updated once per transaction, see
+        ``project.project._update_execution_progress``.
+        """
+        self.task_id._mark_progress_dirty()
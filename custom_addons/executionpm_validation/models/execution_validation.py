@@ -158,6 +158,7 @@ class ExecutionValidation(models.Model):
         import hashlib
         import json
         
+        roles = {}
         for vals in vals_list:
             # Get progress declaration
             progress = self.env['execution.progress'].browse(vals.get('progress_id'))
@@ -169,7 +170,9 @@ class ExecutionValidation(models.Model):
             
             # Get validator role
             validator = self.env['res.users'].browse(vals.get('validator_id', self.env.user.id))
-            vals['validator_role'] = self._get_user_role(validator)
+            if validator not in roles:
+                roles[validator] = self._get_user_role(validator)
+            vals['validator_role'] = roles[validator]
             
             # Generate integrity hash
             hash_data = {
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools import SQL
 
 
 class ProjectProject(models.Model):
@@ -9,26 +12,91 @@ class ProjectProject(models.Model):
     """
     _inherit = 'project.project'
 
-    # Validation statistics
+    execution_progress_ids = fields.One2many(
+        comodel_name='execution.progress',
+        inverse_name='project_id',
+        string='Progress Declarations',
+    )
+
+    # Validation statistics, stored: maintained on declaration state transitions
     total_validations = fields.Integer(
         string='Total Validations',
         compute='_compute_validation_stats',
+        store=True,
     )
     pending_validations = fields.Integer(
         string='Pending Validations',
         compute='_compute_validation_stats',
+        store=True,
     )
 
-    @api.depends('planning_ids.lot_ids.task_ids.progress_declaration_ids.state')
+    @api.depends('execution_progress_ids.state')
     def _compute_validation_stats(self):
+        """Count the declarations of the whole batch by project and state, in one query."""
+        counts = defaultdict(int)
+        for project, state, count in self.env['execution.progress']._read_group(
+            [('project_id', 'in', self._origin.ids), ('state', 'in', ('validated', 'submitted', 'under_review'))],
+            ['project_id', 'state'], ['__count'],
+        ):
+            counts[project.id, state] += count
         for project in self:
-            declarations = self.env['execution.progress'].search([
-                ('project_id', '=', project.id)
-            ])
-            project.total_validations = len(declarations.filtered(lambda d: d.state == 'validated'))
-            project.pending_validations = len(declarations.filtered(
-                lambda d: d.state in ('submitted', 'under_review')
-            ))
+            project_id = project._origin.id
+            project.total_validations = counts[project_id, 'validated']
+            project.pending_validations = counts[project_id, 'submitted'] + counts[project_id, 'under_review']
+
+    def _update_execution_progress(self):
+        """
+        Recalculate project overall progress based on validated task progress.
+        Task weights and declaration dates of all projects are read in two queries.
+        """
+        projects = self.filtered(lambda p: p.is_execution_project and p.active_planning_id)
+        if not projects:
+            return
+
+        self.env['execution.planning.task'].flush_model(['planning_id', 'weight', 'actual_progress'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT planning_id, SUM(weight), SUM(actual_progress * weight)
+              FROM execution_planning_task
+             WHERE planning_id = ANY(%(planning_ids)s)
+             GROUP BY planning_id
+            """,
+            planning_ids=projects.active_planning_id.ids,
+        ))
+        planning_totals = {
+            planning_id: (total_weight or 0.0, weighted_sum or 0.0)
+            for planning_id, total_weight, weighted_sum in self.env.cr.fetchall()
+        }
+        execution_dates = {
+            project.id: (first_date, last_date)
+            for project, first_date, last_date in self.env['execution.progress']._read_group(
+                [('project_id', 'in', projects.ids), ('state', '=', 'validated')],
+                ['project_id'], ['execution_date:min', 'execution_date:max'],
+            )
+        }
+
+        for project in projects:
+            total_weight, weighted_sum = planning_totals.get(project.active_planning_id.id, (0.0, 0.0))
+            if total_weight <= 0:
+                continue
+
+            weighted_progress = weighted_sum / total_weight
+            project_vals = {
+                'execution_progress': weighted_progress,
+                'execution_physical_progress': weighted_progress,
+            }
+
+            # Automation Rule: Set Actual Start at first validated execution
+            if project.id in execution_dates:
+                first_date, last_date = execution_dates[project.id]
+                if not project.execution_actual_start:
+                    project_vals['execution_actual_start'] = first_date
+
+                # Automation Rule: Set Actual End when all tasks reach 100%
+                if weighted_progress >= 99.99:  # Account for float precision
+                    project_vals['execution_actual_end'] = last_date
+
+            project.write(project_vals)
 
     def action_view_pending_validations(self):
         """View declarations pending validation for this project."""
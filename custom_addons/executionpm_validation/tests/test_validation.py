@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from unittest.mock import patch
+
 from odoo.tests.common import TransactionCase
 from odoo.exceptions import UserError
 from odoo import fields
@@ -159,3 +161,98 @@ class TestExecutionValidationKPI(TransactionCase):
         # But generally it should reset to draft.
         decl.action_reset_draft()
         self.assertEqual(decl.state, 'draft')
+
+    def test_04_progress_propagation(self):
+        """Validations are propagated to project tasks and project once per transaction"""
+        for task, percentage in ((self.task1, 50.0), (self.task2, 100.0)):
+            decl = self.env['execution.progress'].create({
+                'task_id': task.id,
+                'declared_percentage': percentage,
+                'comment': 'Propagation %s' % task.name,
+            })
+            self.env['ir.attachment'].create({
+                'name': 'proof.jpg',
+                'datas': b'empty',
+                'res_model': 'execution.progress',
+                'res_id': decl.id,
+            })
+            decl.action_submit()
+            decl.action_start_review()
+            decl.action_validate()
+
+        dirty_ids = self.env.cr.precommit.data.get('executionpm.progress_dirty_task_ids')
+        self.assertEqual(dirty_ids, {self.task1.id, self.task2.id})
+
+        self.env.cr.precommit.run()
+        self.assertNotIn('executionpm.progress_dirty_task_ids', self.env.cr.precommit.data)
+        self.assertEqual(self.task1.project_task_id.execution_progress, 50.0)
+        self.assertEqual(self.task1.project_task_id.state, '01_in_progress')
+        self.assertEqual(self.task2.project_task_id.state, '1_done')
+        self.assertAlmostEqual(self.project.execution_progress, 70.0)
+        self.assertEqual(self.project.computed_physical_progress, 70.0)
+
+    def _create_submitted_declaration(self, task, percentage):
+        decl = self.env['execution.progress'].create({
+            'task_id': task.id,
+            'declared_percentage': percentage,
+            'comment': 'Bulk %s' % percentage,
+        })
+        self.env['ir.attachment'].create({
+            'name': 'proof.jpg',
+            'datas': b'empty',
+            'res_model': 'execution.progress',
+            'res_id': decl.id,
+        })
+        decl.action_submit()
+        return decl
+
+    def test_05_bulk_validation(self):
+        """Several declarations are validated together, large batches in background"""
+        decls = (
+            self._create_submitted_declaration(self.task1, 30.0)
+            | self._create_submitted_declaration(self.task1, 50.0)
+            | self._create_submitted_declaration(self.task2, 100.0)
+        )
+        decls.action_validate()
+
+        self.assertEqual(set(decls.mapped('state')), {'validated'})
+        self.assertEqual(len(decls.validation_ids), 3)
+        self.assertEqual(self.task1.actual_progress, 50.0)
+        self.assertEqual(self.task2.actual_progress, 100.0)
+
+    def test_06_bulk_validation_background(self):
+        """Selections above the synchronous limit are queued and validated by the cron"""
+        Progress = self.env['execution.progress']
+        decls = (
+            self._create_submitted_declaration(self.task1, 40.0)
+            | self._create_submitted_declaration(self.task2, 60.0)
+        )
+        with patch.object(type(Progress), '_BULK_VALIDATION_SYNC_LIMIT', 1):
+            decls.action_validate_bulk()
+        self.assertEqual(decls.validation_requested_by, self.env.user)
+        self.assertEqual(set(decls.mapped('state')), {'submitted'})
+
+        Progress._cron_process_bulk_validation()
+        self.assertEqual(set(decls.mapped('state')), {'validated'})
+        self.assertFalse(decls.validation_requested_by)
+
+    def test_07_validation_stats(self):
+        """Stored validation counters follow the declaration state transitions"""
+        decl1 = self._create_submitted_declaration(self.task1, 30.0)
+        decl2 = self._create_submitted_declaration(self.task2, 20.0)
+        self.assertEqual(self.project.pending_validations, 2)
+        self.assertEqual(self.project.total_validations, 0)
+        self.assertEqual(self.task1.pending_declaration_count, 1)
+
+        decl1.action_validate()
+        self.assertEqual(self.project.pending_validations, 1)
+        self.assertEqual(self.project.total_validations, 1)
+        self.assertEqual(self.task1.pending_declaration_count, 0)
+        self.assertEqual(self.task2.pending_declaration_count, 1)
+
+        # One grouped query for the counters of all the projects
+        self.env.flush_all()
+        self.project.invalidate_recordset(['total_validations', 'pending_validations'])
+        with self.assertQueryCount(1):
+            self.project._compute_validation_stats()
+        self.assertEqual(decl2.project_id.pending_validations, 1)